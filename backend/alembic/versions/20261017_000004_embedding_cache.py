@@ -0,0 +1,47 @@
+"""content-hash embedding cache
+
+Revision ID: 20261017_000004
+Revises: 20260219_000003
+Create Date: 2026-10-17 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+revision = "20261017_000004"
+down_revision = "20260219_000003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("embedding_model", sa.String(length=255), nullable=False),
+        sa.Column("dimension", sa.Integer(), nullable=False),
+        sa.Column("text_sha256", sa.String(length=64), nullable=False),
+        sa.Column("embedding", Vector(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("embedding_model", "dimension", "text_sha256"),
+    )
+    op.create_index("ix_embedding_cache_last_used_at", "embedding_cache", ["last_used_at"])
+
+    op.add_column(
+        "ingestion_job",
+        sa.Column("embedding_cache_hits", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "ingestion_job",
+        sa.Column("embedding_cache_misses", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ingestion_job", "embedding_cache_misses")
+    op.drop_column("ingestion_job", "embedding_cache_hits")
+
+    op.drop_index("ix_embedding_cache_last_used_at", table_name="embedding_cache")
+    op.drop_table("embedding_cache")
@@ -0,0 +1,51 @@
+"""sub-chunk embeddings for long sections
+
+Revision ID: 20261017_000005
+Revises: 20261017_000004
+Create Date: 2026-10-17 10:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+revision = "20261017_000005"
+down_revision = "20261017_000004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "documentation_section_chunk",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("section_id", sa.Uuid(), nullable=False),
+        sa.Column("documentation_id", sa.Uuid(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("start_offset", sa.Integer(), nullable=False),
+        sa.Column("end_offset", sa.Integer(), nullable=False),
+        sa.Column("embedding", Vector(1024), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["section_id"], ["documentation_section.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["documentation_id"], ["documentation.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("section_id", "chunk_index", name="uq_documentation_section_chunk_section_index"),
+    )
+    op.create_index(
+        "ix_documentation_section_chunk_section_id", "documentation_section_chunk", ["section_id"]
+    )
+    op.create_index(
+        "ix_documentation_section_chunk_documentation_id", "documentation_section_chunk", ["documentation_id"]
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_documentation_section_chunk_embedding "
+        "ON documentation_section_chunk USING hnsw (embedding vector_cosine_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_documentation_section_chunk_embedding")
+    op.drop_index("ix_documentation_section_chunk_documentation_id", table_name="documentation_section_chunk")
+    op.drop_index("ix_documentation_section_chunk_section_id", table_name="documentation_section_chunk")
+    op.drop_table("documentation_section_chunk")
@@ -0,0 +1,36 @@
+"""full-text search vector for documentation sections
+
+Revision ID: 20261017_000006
+Revises: 20261017_000005
+Create Date: 2026-10-17 11:00:00
+"""
+
+from alembic import op
+
+
+revision = "20261017_000006"
+down_revision = "20261017_000005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Weighted title (A) > summary (B) > content (C); config must match
+    # app.services.documentation.FTS_CONFIG.
+    op.execute(
+        "ALTER TABLE documentation_section ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(summary, '')), 'B') || "
+        "setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'C')"
+        ") STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_documentation_section_search_vector "
+        "ON documentation_section USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_documentation_section_search_vector")
+    op.execute("ALTER TABLE documentation_section DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,32 @@
+"""materialized documentation tree
+
+Revision ID: 20261017_000007
+Revises: 20261017_000006
+Create Date: 2026-10-17 12:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_000007"
+down_revision = "20261017_000006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are built lazily on the first tree request for sets ingested before this table existed.
+    op.create_table(
+        "documentation_tree",
+        sa.Column("documentation_id", sa.Uuid(), nullable=False),
+        sa.Column("version", sa.String(length=64), nullable=False),
+        sa.Column("roots_json", sa.Text(), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["documentation_id"], ["documentation.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("documentation_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("documentation_tree")
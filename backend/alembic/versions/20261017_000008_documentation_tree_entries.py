@@ -0,0 +1,43 @@
+"""per-node documentation tree entries for lazy tree reads
+
+Revision ID: 20261017_000008
+Revises: 20261017_000007
+Create Date: 2026-10-17 13:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_000008"
+down_revision = "20261017_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "documentation_tree_entry",
+        sa.Column("documentation_id", sa.Uuid(), nullable=False),
+        sa.Column("path", sa.Text(), nullable=False),
+        sa.Column("tree_parent_path", sa.Text(), nullable=True),
+        sa.Column("section_id", sa.Uuid(), nullable=False),
+        sa.Column("parent_id", sa.Uuid(), nullable=True),
+        sa.Column("title", sa.Text(), nullable=True),
+        sa.Column("level", sa.Integer(), nullable=True),
+        sa.Column("child_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["documentation_id"], ["documentation.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("documentation_id", "path"),
+    )
+    op.create_index(
+        "ix_documentation_tree_entry_parent",
+        "documentation_tree_entry",
+        ["documentation_id", "tree_parent_path", "path"],
+    )
+    # Stored trees predate the entries (and child counts); they are rebuilt on first request.
+    op.execute("DELETE FROM documentation_tree")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documentation_tree_entry_parent", table_name="documentation_tree_entry")
+    op.drop_table("documentation_tree_entry")
@@ -0,0 +1,33 @@
+"""page fingerprints for skipping unchanged pages on re-ingestion
+
+Revision ID: 20261017_000009
+Revises: 20261017_000008
+Create Date: 2026-10-17 14:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_000009"
+down_revision = "20261017_000008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "page_fingerprint",
+        sa.Column("documentation_id", sa.Uuid(), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("content_sha256", sa.String(length=64), nullable=False),
+        sa.Column("parser_version", sa.Integer(), nullable=False),
+        sa.Column("section_paths", sa.JSON(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["documentation_id"], ["documentation.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("documentation_id", "url"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("page_fingerprint")
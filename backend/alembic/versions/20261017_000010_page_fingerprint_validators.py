@@ -0,0 +1,27 @@
+"""cache validators and links on page fingerprints for conditional re-crawls
+
+Revision ID: 20261017_000010
+Revises: 20261017_000009
+Create Date: 2026-10-17 15:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_000010"
+down_revision = "20261017_000009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("page_fingerprint", sa.Column("etag", sa.Text(), nullable=True))
+    op.add_column("page_fingerprint", sa.Column("last_modified", sa.Text(), nullable=True))
+    op.add_column("page_fingerprint", sa.Column("links", sa.JSON(), nullable=False, server_default="[]"))
+
+
+def downgrade() -> None:
+    op.drop_column("page_fingerprint", "links")
+    op.drop_column("page_fingerprint", "last_modified")
+    op.drop_column("page_fingerprint", "etag")
@@ -0,0 +1,23 @@
+"""record the chunking settings each documentation set was embedded with
+
+Revision ID: 20261017_000011
+Revises: 20261017_000010
+Create Date: 2026-10-17 16:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261017_000011"
+down_revision = "20261017_000010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documentation", sa.Column("embedding_chunking", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documentation", "embedding_chunking")
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
+import logging
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlmodel import Session
 
 from app.api.dtos.common import ErrorResponse
@@ -14,19 +17,30 @@ from app.api.dtos.documentation import (
     SectionContentResponse,
     SectionListResponse,
 )
+from app.config import settings
 from app.db import get_session
 from app.models import Documentation
 from app.services.documentation import (
+    PaginationResult,
+    TotalMode,
     build_search_items,
     delete_documentation,
-    get_documentation_tree,
+    get_documentation_subtree,
+    get_documentation_tree_version,
     get_section_content,
+    get_stored_documentation_tree,
     has_embeddings,
     list_documentations,
     list_sections,
+    refresh_documentation_tree,
+    search_sections_hybrid,
     search_sections_keyword,
     search_sections_semantic,
 )
+from app.services.cursor import Cursor, InvalidCursorError, decode_cursor
+from app.services.search_cache import SearchResultCache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/documentation", tags=["documentation"])
 ERROR_RESPONSES = {
@@ -34,6 +48,35 @@ ERROR_RESPONSES = {
     404: {"model": ErrorResponse},
     500: {"model": ErrorResponse},
 }
+CURSOR_DESCRIPTION = "meta.next_cursor of the previous page; continues by keyset instead of offset"
+# Clients may cache the tree but must revalidate it (cheaply, via If-None-Match) on every use.
+TREE_CACHE_HEADERS = {"Cache-Control": "no-cache"}
+TOTAL_MODE_DESCRIPTION = (
+    "How meta.total is computed: exact (COUNT), estimate (query planner estimate) or none "
+    "(skipped; use meta.has_more). Defaults to PAGINATION_TOTAL_MODE."
+)
+
+
+def _pagination_meta(meta: PaginationResult) -> PaginationMeta:
+    return PaginationMeta(
+        total=meta.total,
+        limit=meta.limit,
+        offset=meta.offset,
+        total_kind=meta.total_kind,
+        has_more=meta.has_more,
+        next_cursor=meta.next_cursor,
+    )
+
+
+def _decode_cursor_param(cursor: str | None, offset: int) -> Cursor | None:
+    if cursor is None:
+        return None
+    if offset:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either cursor or offset, not both")
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
 @router.get(
@@ -45,12 +88,15 @@ ERROR_RESPONSES = {
 def list_documentations_endpoint(
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    total: TotalMode | None = Query(default=None, description=TOTAL_MODE_DESCRIPTION),
     session: Session = Depends(get_session),
 ) -> DocumentationListResponse:
-    items, meta = list_documentations(session=session, limit=limit, offset=offset)
+    items, meta = list_documentations(
+        session=session, limit=limit, offset=offset, total_mode=total or settings.pagination_total_mode
+    )
     return DocumentationListResponse(
         items=items,
-        meta=PaginationMeta(total=meta.total, limit=meta.limit, offset=meta.offset),
+        meta=_pagination_meta(meta),
     )
 
 
@@ -65,19 +111,26 @@ def list_documentation_sections_endpoint(
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
     start_path: str | None = Query(default=None),
+    total: TotalMode | None = Query(default=None, description=TOTAL_MODE_DESCRIPTION),
+    cursor: str | None = Query(default=None, description=CURSOR_DESCRIPTION),
     session: Session = Depends(get_session),
 ) -> SectionListResponse:
     documentation = session.get(Documentation, documentation_id)
     if documentation is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documentation not found")
 
-    items, meta = list_sections(
-        session=session,
-        documentation_id=documentation_id,
-        limit=limit,
-        offset=offset,
-        start_path=start_path,
-    )
+    try:
+        items, meta = list_sections(
+            session=session,
+            documentation_id=documentation_id,
+            limit=limit,
+            offset=offset,
+            start_path=start_path,
+            total_mode=total or settings.pagination_total_mode,
+            after=_decode_cursor_param(cursor, offset),
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     section_items = [
         {
             "id": section.id,
@@ -93,27 +146,59 @@ def list_documentation_sections_endpoint(
     ]
     return SectionListResponse(
         items=section_items,
-        meta=PaginationMeta(total=meta.total, limit=meta.limit, offset=meta.offset),
+        meta=_pagination_meta(meta),
     )
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get(
     "/{documentation_id}/tree",
     response_model=DocumentationTreeResponse,
-    responses=ERROR_RESPONSES,
+    responses={**ERROR_RESPONSES, 304: {"description": "Tree unchanged since the ETag in If-None-Match"}},
     operation_id="get_documentation_tree",
 )
 def get_documentation_tree_endpoint(
     documentation_id: uuid.UUID,
+    root_path: str | None = Query(
+        default=None, description="Return the children of this section instead of the tree roots"
+    ),
+    depth: int | None = Query(
+        default=None,
+        ge=1,
+        description="Levels to expand; deeper nodes are returned collapsed, with child_count but no children",
+    ),
+    if_none_match: str | None = Header(default=None),
     session: Session = Depends(get_session),
-) -> DocumentationTreeResponse:
-    documentation = session.get(Documentation, documentation_id)
-    if documentation is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documentation not found")
+) -> Response:
+    # The tree is serialized at ingest time; serve the stored JSON without rebuilding or re-validating it.
+    version = get_documentation_tree_version(session, documentation_id)
+    if version is None:
+        if session.get(Documentation, documentation_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documentation not found")
+        version = refresh_documentation_tree(session, documentation_id).version
+
+    # Every view of a tree shares the tree's version as its ETag.
+    headers = {"ETag": f'"{version}"', **TREE_CACHE_HEADERS}
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return DocumentationTreeResponse(
-        documentation_id=documentation_id,
-        roots=get_documentation_tree(session=session, documentation_id=documentation_id),
+    if root_path is None and depth is None:
+        roots_json = get_stored_documentation_tree(session, documentation_id).roots_json
+    else:
+        roots = get_documentation_subtree(session, documentation_id, root_path, depth)
+        if roots is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Section not found")
+        roots_json = json.dumps(roots, default=str, separators=(",", ":"))
+    return Response(
+        content=f'{{"documentation_id":"{documentation_id}","roots":{roots_json}}}',
+        media_type="application/json",
+        headers=headers,
     )
 
 
@@ -128,39 +213,97 @@ async def search_documentation_endpoint(
     q: str = Query(min_length=2),
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    mode: Literal["auto", "semantic", "keyword", "hybrid"] = Query(
+        default="auto",
+        description=(
+            "auto/semantic: vector search when embeddings exist; keyword: lexical only; "
+            "hybrid: vector and lexical results fused with reciprocal rank fusion"
+        ),
+    ),
+    ef_search: int | None = Query(
+        default=None,
+        ge=1,
+        le=1000,
+        description="HNSW candidate list size for this search (higher: better recall, slower)",
+    ),
+    iterative_scan: Literal["off", "strict_order", "relaxed_order"] | None = Query(
+        default=None,
+        description="pgvector iterative HNSW scan mode, so filtered searches keep scanning until the page is full",
+    ),
+    total: TotalMode | None = Query(default=None, description=TOTAL_MODE_DESCRIPTION),
+    cursor: str | None = Query(default=None, description=CURSOR_DESCRIPTION),
     session: Session = Depends(get_session),
 ) -> SearchResponse:
     documentation = session.get(Documentation, documentation_id)
     if documentation is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Documentation not found")
 
-    use_semantic = has_embeddings(session, documentation_id)
-
-    if use_semantic:
-        try:
-            rows, meta = await search_sections_semantic(
-                session=session, documentation_id=documentation_id, query=q, limit=limit, offset=offset
-            )
-            search_mode = "semantic"
-        except Exception:
-            import logging
-            logging.getLogger(__name__).exception("Semantic search failed, falling back to keyword")
-            # Fallback
-            rows, meta = search_sections_keyword(
-                session=session, documentation_id=documentation_id, query=q, limit=limit, offset=offset
-            )
+    after = _decode_cursor_param(cursor, offset)
+    total_mode = total or settings.pagination_total_mode
+    cache = SearchResultCache(
+        documentation_id,
+        mode,
+        q,
+        limit,
+        offset,
+        ef_search=ef_search,
+        iterative_scan=iterative_scan,
+        total_mode=total_mode,
+        cursor=cursor,
+    )
+    cached = cache.get()
+    if cached is not None:
+        return SearchResponse.model_validate(cached)
+
+    search_kwargs = {
+        "session": session,
+        "documentation_id": documentation_id,
+        "query": q,
+        "limit": limit,
+        "offset": offset,
+        "after": after,
+    }
+    degraded = False
+    try:
+        if mode == "keyword":
+            rows, meta = search_sections_keyword(total_mode=total_mode, **search_kwargs)
+            search_mode = "keyword"
+        elif has_embeddings(session, documentation_id):
+            try:
+                if mode == "hybrid":
+                    rows, meta = await search_sections_hybrid(
+                        ef_search=ef_search, iterative_scan=iterative_scan, **search_kwargs
+                    )
+                    search_mode = "hybrid"
+                else:
+                    rows, meta = await search_sections_semantic(
+                        ef_search=ef_search, iterative_scan=iterative_scan, total_mode=total_mode, **search_kwargs
+                    )
+                    search_mode = "semantic"
+            except InvalidCursorError:
+                raise
+            except Exception:
+                logger.exception("Vector search (mode=%s) failed, falling back to keyword", mode)
+                degraded = True
+                # Fallback; a vector-search cursor only carries over its position.
+                search_kwargs.update(offset=after.position if after else offset, after=None)
+                rows, meta = search_sections_keyword(total_mode=total_mode, **search_kwargs)
+                search_mode = "keyword_fallback"
+        else:
+            rows, meta = search_sections_keyword(total_mode=total_mode, **search_kwargs)
             search_mode = "keyword_fallback"
-    else:
-        rows, meta = search_sections_keyword(
-            session=session, documentation_id=documentation_id, query=q, limit=limit, offset=offset
-        )
-        search_mode = "keyword_fallback"
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    return SearchResponse(
+    response = SearchResponse(
         search_mode=search_mode,
         items=build_search_items(rows, q),
-        meta=PaginationMeta(total=meta.total, limit=meta.limit, offset=meta.offset),
+        meta=_pagination_meta(meta),
     )
+    # Don't pin a degraded (fallback-after-error) result for the cache TTL.
+    if not degraded:
+        cache.set(response.model_dump(mode="json"))
+    return response
 
 
 @router.get(
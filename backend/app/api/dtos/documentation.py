@@ -10,9 +10,12 @@ from app.models import IngestionStatus
 
 
 class PaginationMeta(BaseModel):
-    total: int
+    total: int | None = Field(description="Matching rows; null when total_kind is 'none'")
     limit: int
     offset: int
+    total_kind: Literal["exact", "estimate", "none"] = "exact"
+    has_more: bool = False
+    next_cursor: str | None = Field(default=None, description="Pass as cursor to fetch the next page")
 
 
 class DocumentationSummary(BaseModel):
@@ -68,6 +71,7 @@ class DocumentationTreeNode(BaseModel):
     parent_id: uuid.UUID | None
     title: str | None
     level: int | None
+    child_count: int = Field(default=0, description="Children in the full tree, also for collapsed nodes")
     children: list["DocumentationTreeNode"] = Field(default_factory=list)
 
 
@@ -86,6 +90,6 @@ class SearchItem(BaseModel):
 
 
 class SearchResponse(BaseModel):
-    search_mode: Literal["semantic", "keyword_fallback"] = "keyword_fallback"
+    search_mode: Literal["semantic", "keyword", "hybrid", "keyword_fallback"] = "keyword_fallback"
     items: list[SearchItem]
     meta: PaginationMeta
@@ -27,6 +27,8 @@ class IngestionStatusResponse(BaseModel):
     status: IngestionStatus
     progress_percent: int
     pages_processed: int
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
     stop_requested: bool
     error_message: str | None
 
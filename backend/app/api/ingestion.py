@@ -47,6 +47,8 @@ def get_ingestion_status_endpoint(job_id: uuid.UUID, session: Session = Depends(
         status=job.status,
         progress_percent=job.progress_percent,
         pages_processed=job.pages_processed,
+        embedding_cache_hits=job.embedding_cache_hits,
+        embedding_cache_misses=job.embedding_cache_misses,
         stop_requested=job.stop_requested,
         error_message=job.error_message,
     )
@@ -92,6 +94,8 @@ def list_ingestion_jobs_endpoint(
                 status=job.status,
                 progress_percent=job.progress_percent,
                 pages_processed=job.pages_processed,
+                embedding_cache_hits=job.embedding_cache_hits,
+                embedding_cache_misses=job.embedding_cache_misses,
                 stop_requested=job.stop_requested,
                 error_message=job.error_message,
             )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -14,17 +16,81 @@ class Settings(BaseSettings):
         default="postgresql+psycopg://user:password@db:5432/docmcp",
         alias="POSTGRES_CONNECTION_STRING",
     )
+    postgres_prepare_threshold: int = Field(default=2, alias="POSTGRES_PREPARE_THRESHOLD")
     mcp_server_token: str = Field(default="super-secret-token", alias="MCP_SERVER_TOKEN")
     mcp_rate_limit_window_seconds: int = Field(default=60, alias="MCP_RATE_LIMIT_WINDOW_SECONDS")
     mcp_rate_limit_max_requests: int = Field(default=120, alias="MCP_RATE_LIMIT_MAX_REQUESTS")
     store_raw_pages: bool = Field(default=False, alias="STORE_RAW_PAGES")
 
+    # Streaming ingestion: overlap crawl, parse/delta and embedding stages
+    ingestion_streaming: bool = Field(default=False, alias="INGESTION_STREAMING")
+    ingestion_queue_depth: int = Field(default=8, alias="INGESTION_QUEUE_DEPTH")
+    ingestion_parse_workers: int = Field(default=0, alias="INGESTION_PARSE_WORKERS")
+    ingestion_parse_chunk_pages: int = Field(default=64, alias="INGESTION_PARSE_CHUNK_PAGES")
+
+    # URL discovery: "bfs" follows links; "sitemap" reads sitemap.xml first and falls back to bfs
+    crawl_discovery_mode: Literal["bfs", "sitemap"] = Field(default="bfs", alias="CRAWL_DISCOVERY_MODE")
+
+    # Re-crawls: revalidate previously crawled pages with conditional requests, render only changed ones
+    crawl_revalidate: bool = Field(default=False, alias="CRAWL_REVALIDATE")
+    crawl_revalidate_concurrency: int = Field(default=16, alias="CRAWL_REVALIDATE_CONCURRENCY")
+
     # Embedding settings (Phase 8)
     embedding_model: str = Field(default="bedrock:amazon.titan-embed-text-v2:0", alias="EMBEDDING_MODEL")
     embedding_dimension: int = Field(default=1024, alias="EMBEDDING_DIMENSION")
     embedding_batch_size: int = Field(default=64, alias="EMBEDDING_BATCH_SIZE")
+    embedding_max_batch_tokens: int = Field(default=100_000, alias="EMBEDDING_MAX_BATCH_TOKENS")
     embedding_max_retries: int = Field(default=3, alias="EMBEDDING_MAX_RETRIES")
+    embedding_concurrency: int = Field(default=4, alias="EMBEDDING_CONCURRENCY")
+    embedding_backoff_base_seconds: float = Field(default=0.5, alias="EMBEDDING_BACKOFF_BASE_SECONDS")
+    embedding_backoff_max_seconds: float = Field(default=30.0, alias="EMBEDDING_BACKOFF_MAX_SECONDS")
     embedding_token_limit: int = Field(default=8192, alias="EMBEDDING_TOKEN_LIMIT")
+    embedding_cache_enabled: bool = Field(default=True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_ttl_days: int = Field(default=90, alias="EMBEDDING_CACHE_TTL_DAYS")
+    embedding_cache_max_entries: int = Field(default=500_000, alias="EMBEDDING_CACHE_MAX_ENTRIES")
+
+    # Sub-chunk embeddings: embed overlapping spans of long sections separately
+    embedding_chunking_enabled: bool = Field(default=False, alias="EMBEDDING_CHUNKING_ENABLED")
+    embedding_chunk_tokens: int = Field(default=400, alias="EMBEDDING_CHUNK_TOKENS")
+    embedding_chunk_overlap_tokens: int = Field(default=50, alias="EMBEDDING_CHUNK_OVERLAP_TOKENS")
+    search_chunk_aggregation: Literal["max", "sum"] = Field(default="max", alias="SEARCH_CHUNK_AGGREGATION")
+    search_chunk_candidates: int = Field(default=200, alias="SEARCH_CHUNK_CANDIDATES")
+
+    # Hybrid search: candidates taken from each of the keyword/semantic lists, and the RRF constant
+    search_hybrid_candidates: int = Field(default=100, alias="SEARCH_HYBRID_CANDIDATES")
+    search_rrf_k: int = Field(default=60, alias="SEARCH_RRF_K")
+
+    # Compact HNSW index (halfvec / binary quantized) for candidate retrieval, rescored on full vectors
+    search_vector_index: Literal["full", "halfvec", "binary"] = Field(default="full", alias="SEARCH_VECTOR_INDEX")
+    search_rescore_candidates: int = Field(default=200, alias="SEARCH_RESCORE_CANDIDATES")
+    # "documentation" adds a partial HNSW index per documentation set, managed by ingestion/deletion,
+    # up to SEARCH_VECTOR_INDEX_MAX_PARTIAL of them
+    search_vector_index_scope: Literal["global", "documentation"] = Field(
+        default="global", alias="SEARCH_VECTOR_INDEX_SCOPE"
+    )
+    search_vector_index_max_partial: int = Field(default=200, alias="SEARCH_VECTOR_INDEX_MAX_PARTIAL")
+
+    # pgvector HNSW scan defaults (per-request overridable); 0 / "default" keep the server's values
+    search_hnsw_ef_search: int = Field(default=0, alias="SEARCH_HNSW_EF_SEARCH")
+    search_hnsw_iterative_scan: Literal["default", "off", "strict_order", "relaxed_order"] = Field(
+        default="default", alias="SEARCH_HNSW_ITERATIVE_SCAN"
+    )
+
+    # How list/search responses compute meta.total by default: exact COUNT, planner estimate, or none
+    pagination_total_mode: Literal["exact", "estimate", "none"] = Field(default="exact", alias="PAGINATION_TOTAL_MODE")
+
+    # Search result cache (Redis), invalidated per documentation set by ingestion
+    search_cache_enabled: bool = Field(default=True, alias="SEARCH_CACHE_ENABLED")
+    search_cache_ttl_seconds: int = Field(default=300, alias="SEARCH_CACHE_TTL_SECONDS")
+
+    # Query embedding cache: in-process LRU with an optional shared Redis tier
+    query_embedding_cache_max_entries: int = Field(default=2048, alias="QUERY_EMBEDDING_CACHE_MAX_ENTRIES")
+    query_embedding_cache_max_bytes: int = Field(default=16 * 1024 * 1024, alias="QUERY_EMBEDDING_CACHE_MAX_BYTES")
+    query_embedding_cache_redis: bool = Field(default=False, alias="QUERY_EMBEDDING_CACHE_REDIS")
+    query_embedding_cache_redis_ttl_seconds: int = Field(
+        default=86_400, alias="QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS"
+    )
+
     aws_region: str = Field(default="us-east-1", alias="AWS_REGION")
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
 
@@ -1,14 +1,67 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterable, Sequence
 import logging
+from typing import Any
 
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import bindparam, event, make_url, text
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.types import UserDefinedType
 from sqlmodel import Session, SQLModel, create_engine
 
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(settings.postgres_connection_string, pool_pre_ping=True)
+
+def _engine_connect_args(url: str) -> dict[str, Any]:
+    if make_url(url).get_driver_name() != "psycopg":
+        return {}
+    # psycopg prepares a statement server-side once it has run this many times
+    # on a connection; a negative setting disables prepared statements (e.g. behind PgBouncer).
+    threshold = settings.postgres_prepare_threshold
+    return {"prepare_threshold": threshold if threshold >= 0 else None}
+
+
+engine = create_engine(
+    settings.postgres_connection_string,
+    pool_pre_ping=True,
+    connect_args=_engine_connect_args(settings.postgres_connection_string),
+)
+
+
+def _register_pgvector_adapters(dbapi_connection, connection_record) -> None:
+    """Let psycopg send numpy arrays as binary ``vector`` parameters."""
+    try:
+        from pgvector.psycopg import register_vector
+
+        register_vector(dbapi_connection)
+    except Exception:
+        logger.warning("pgvector adapters not registered; vector parameters will fail", exc_info=True)
+
+
+if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg":
+    event.listen(engine, "connect", _register_pgvector_adapters)
+
+
+class VectorParam(UserDefinedType):
+    """Bind type for query vectors.
+
+    Values are handed to the driver untouched (as float32 numpy arrays), so
+    psycopg's pgvector dumper sends them in binary and the SQL text stays the
+    same for every query vector.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw: Any) -> str:
+        return "vector"
+
+    def bind_processor(self, dialect):
+        return None
+
+
+def vector_bindparam(vector: Sequence[float], name: str = "query_vector") -> BindParameter:
+    return bindparam(name, np.asarray(vector, dtype=np.float32), type_=VectorParam())
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -16,6 +69,48 @@ def get_session() -> Generator[Session, None, None]:
         yield session
 
 
+def dialect_insert(session: Session):
+    """Return the ``insert`` construct of the session's dialect.
+
+    The PostgreSQL and SQLite variants support ``ON CONFLICT`` clauses; other
+    dialects get the generic construct.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy import insert
+    return insert
+
+
+def supports_binary_copy(session: Session) -> bool:
+    """Whether :func:`copy_rows` can be used on the session's connection."""
+    dialect = session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+
+def copy_rows(
+    session: Session,
+    table: str,
+    columns: Sequence[str],
+    types: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> None:
+    """Stream *rows* into *table* with a binary ``COPY`` on the session's transaction.
+
+    *types* are PostgreSQL type names for *columns*; ``vector`` values may be
+    numpy arrays (sent via the pgvector adapters registered on connect).
+    """
+    driver_connection = session.connection().connection.driver_connection
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT BINARY)"
+    with driver_connection.cursor() as cursor, cursor.copy(statement) as copy:
+        copy.set_types(list(types))
+        for row in rows:
+            copy.write_row(row)
+
+
 def create_all() -> None:
     SQLModel.metadata.create_all(engine)
 
@@ -6,6 +6,7 @@ from .config import settings
 from .db import db_healthcheck, pgvector_healthcheck
 from .mcp import mount_mcp_server
 from .redis_client import redis_healthcheck
+from .services.query_embedding_cache import get_query_embedding_cache
 
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.app_name)
@@ -45,6 +46,10 @@ def create_app() -> FastAPI:
         status_code = 200 if is_ready else 503
         return JSONResponse(status_code=status_code, content=payload)
 
+    @app.get("/metrics")
+    def metrics() -> dict[str, object]:
+        return {"query_embedding_cache": get_query_embedding_cache().stats()}
+
     mount_mcp_server(app)
 
     return app
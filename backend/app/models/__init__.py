@@ -1,9 +1,25 @@
-from .ingestion import Documentation, DocumentationSection, IngestionJob, IngestionStatus, RawPage
+from .ingestion import (
+    Documentation,
+    DocumentationSection,
+    DocumentationSectionChunk,
+    DocumentationTree,
+    DocumentationTreeEntry,
+    EmbeddingCacheEntry,
+    IngestionJob,
+    IngestionStatus,
+    PageFingerprint,
+    RawPage,
+)
 
 __all__ = [
     "Documentation",
     "DocumentationSection",
+    "DocumentationSectionChunk",
+    "DocumentationTree",
+    "DocumentationTreeEntry",
+    "EmbeddingCacheEntry",
     "IngestionJob",
     "IngestionStatus",
+    "PageFingerprint",
     "RawPage",
 ]
@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import Column, DateTime, Index, JSON, String, Text, UniqueConstraint, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, JSON, String, Text, UniqueConstraint, Uuid, func
 from sqlmodel import Field, Relationship, SQLModel
 
 try:
@@ -14,8 +14,11 @@ from app.config import settings
 
 if Vector is not None:
     EMBEDDING_COLUMN_TYPE = JSON().with_variant(Vector(settings.embedding_dimension), "postgresql")
+    # Dimension-less so entries for several models/dimensions can coexist
+    CACHED_EMBEDDING_COLUMN_TYPE = JSON().with_variant(Vector(), "postgresql")
 else:
     EMBEDDING_COLUMN_TYPE = JSON()
+    CACHED_EMBEDDING_COLUMN_TYPE = JSON()
 
 
 class IngestionStatus(str, Enum):
@@ -59,6 +62,8 @@ class Documentation(SQLModel, table=True):
     # Embedding metadata — tracks which model/dimension was used for this documentation set
     embedding_model_name: str | None = Field(default=None, sa_column=Column(String(length=255), nullable=True))
     embedding_dimension_size: int | None = Field(default=None, nullable=True)
+    # "off" or "<chunk tokens>/<overlap>"; a change re-embeds every section on the next ingestion
+    embedding_chunking: str | None = Field(default=None, sa_column=Column(String(length=64), nullable=True))
 
     sections: list["DocumentationSection"] = Relationship(back_populates="documentation")
     jobs: list["IngestionJob"] = Relationship(back_populates="documentation")
@@ -94,6 +99,33 @@ class DocumentationSection(SQLModel, table=True):
     documentation: "Documentation" = Relationship(back_populates="sections")
 
 
+class DocumentationSectionChunk(SQLModel, table=True):
+    """Embedding of one overlapping span of a section's content.
+
+    Only written when ``EMBEDDING_CHUNKING_ENABLED`` is set; offsets index into
+    ``DocumentationSection.content``.
+    """
+
+    __tablename__ = "documentation_section_chunk"
+    __table_args__ = (
+        UniqueConstraint("section_id", "chunk_index", name="uq_documentation_section_chunk_section_index"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    section_id: uuid.UUID = Field(
+        sa_column=Column(Uuid, ForeignKey("documentation_section.id", ondelete="CASCADE"), nullable=False, index=True)
+    )
+    documentation_id: uuid.UUID = Field(foreign_key="documentation.id", nullable=False, index=True)
+    chunk_index: int = Field(nullable=False)
+    start_offset: int = Field(nullable=False)
+    end_offset: int = Field(nullable=False)
+    embedding: Any = Field(default=None, sa_column=Column(EMBEDDING_COLUMN_TYPE, nullable=False))
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
+
+
 class IngestionJob(SQLModel, table=True):
     __tablename__ = "ingestion_job"
 
@@ -106,6 +138,8 @@ class IngestionJob(SQLModel, table=True):
     error_message: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
     progress_percent: int = Field(default=0, nullable=False)
     pages_processed: int = Field(default=0, nullable=False)
+    embedding_cache_hits: int = Field(default=0, nullable=False)
+    embedding_cache_misses: int = Field(default=0, nullable=False)
     stop_requested: bool = Field(default=False, nullable=False)
     created_at: datetime = Field(
         default_factory=utcnow,
@@ -137,3 +171,92 @@ class RawPage(SQLModel, table=True):
     )
 
     documentation: "Documentation" = Relationship(back_populates="raw_pages")
+
+
+class DocumentationTree(SQLModel, table=True):
+    """Serialized section tree of a documentation set, rebuilt at the end of every ingestion run.
+
+    ``version`` is the SHA-256 of ``roots_json`` and doubles as the tree endpoint's ETag.
+    """
+
+    __tablename__ = "documentation_tree"
+
+    documentation_id: uuid.UUID = Field(
+        sa_column=Column(Uuid, ForeignKey("documentation.id", ondelete="CASCADE"), primary_key=True)
+    )
+    version: str = Field(sa_column=Column(String(length=64), nullable=False))
+    roots_json: str = Field(sa_column=Column(Text, nullable=False))
+    built_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
+
+
+class DocumentationTreeEntry(SQLModel, table=True):
+    """One node of a stored documentation tree, for depth-limited subtree reads.
+
+    Written alongside :class:`DocumentationTree`.  ``tree_parent_path`` is the
+    path of the node's parent *in the tree* (``NULL`` for roots), which also
+    covers parents inferred from paths; ``section_id``/``parent_id`` mirror the
+    section.  Children of a node are one index range scan away.
+    """
+
+    __tablename__ = "documentation_tree_entry"
+    __table_args__ = (
+        Index("ix_documentation_tree_entry_parent", "documentation_id", "tree_parent_path", "path"),
+    )
+
+    documentation_id: uuid.UUID = Field(
+        sa_column=Column(Uuid, ForeignKey("documentation.id", ondelete="CASCADE"), primary_key=True)
+    )
+    path: str = Field(sa_column=Column(Text, primary_key=True))
+    tree_parent_path: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    section_id: uuid.UUID = Field(sa_column=Column(Uuid, nullable=False))
+    parent_id: uuid.UUID | None = Field(default=None, sa_column=Column(Uuid, nullable=True))
+    title: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    level: int | None = Field(default=None, nullable=True)
+    child_count: int = Field(default=0, nullable=False)
+
+
+class PageFingerprint(SQLModel, table=True):
+    """Content hash of a crawled page and the section paths it parsed into.
+
+    Re-ingestion skips parsing, the section delta and embedding for pages
+    whose markdown hash and ``parser_version`` are unchanged.
+    """
+
+    __tablename__ = "page_fingerprint"
+
+    documentation_id: uuid.UUID = Field(
+        sa_column=Column(Uuid, ForeignKey("documentation.id", ondelete="CASCADE"), primary_key=True)
+    )
+    url: str = Field(sa_column=Column(Text, primary_key=True))
+    content_sha256: str = Field(sa_column=Column(String(length=64), nullable=False))
+    parser_version: int = Field(nullable=False)
+    section_paths: list[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    # Cache validators and internal links from the last fetch, for conditional re-crawls.
+    etag: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    last_modified: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    links: list[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False, server_default="[]"))
+    last_seen_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
+
+
+class EmbeddingCacheEntry(SQLModel, table=True):
+    __tablename__ = "embedding_cache"
+    __table_args__ = (Index("ix_embedding_cache_last_used_at", "last_used_at"),)
+
+    embedding_model: str = Field(sa_column=Column(String(length=255), primary_key=True))
+    dimension: int = Field(primary_key=True)
+    text_sha256: str = Field(sa_column=Column(String(length=64), primary_key=True))
+    embedding: Any = Field(sa_column=Column(CACHED_EMBEDDING_COLUMN_TYPE, nullable=False))
+    created_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
+    last_used_at: datetime = Field(
+        default_factory=utcnow,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=func.now()),
+    )
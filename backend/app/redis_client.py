@@ -4,6 +4,8 @@ from .config import settings
 
 
 redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+# For raw byte payloads (e.g. float32 vectors) that must not be decoded as text.
+redis_binary_client = redis.Redis.from_url(settings.redis_url)
 
 
 def redis_healthcheck() -> bool:
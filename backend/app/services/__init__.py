@@ -1,32 +1,50 @@
-from .crawler import CrawledPage, crawl_site
+from .crawler import CrawledPage, crawl_site, crawl_site_stream
 from .documentation import (
+    SearchHit,
     build_search_items,
     delete_documentation,
+    get_documentation_subtree,
     get_documentation_tree,
+    get_documentation_tree_version,
     get_section_content,
+    get_stored_documentation_tree,
+    has_chunk_embeddings,
     has_embeddings,
     list_documentations,
     list_sections,
+    reciprocal_rank_fusion,
+    refresh_documentation_tree,
+    search_sections_hybrid,
     search_sections_keyword,
     search_sections_semantic,
 )
-from .embedding import embed_query, embed_sections
+from .embedding import embed_query, embed_sections, split_chunks
 from .ingestion import get_ingestion_job, request_stop, run_ingestion_pipeline, start_ingestion
-from .parser import ParsedSection, parse_sections
+from .parser import ParsedSection, parse_sections, parse_sections_async
 
 __all__ = [
     "CrawledPage",
     "ParsedSection",
+    "SearchHit",
     "crawl_site",
+    "crawl_site_stream",
     "embed_query",
     "embed_sections",
+    "split_chunks",
     "list_documentations",
     "list_sections",
     "get_section_content",
     "get_documentation_tree",
+    "get_documentation_subtree",
+    "get_documentation_tree_version",
+    "get_stored_documentation_tree",
+    "refresh_documentation_tree",
     "has_embeddings",
+    "has_chunk_embeddings",
     "search_sections_keyword",
     "search_sections_semantic",
+    "search_sections_hybrid",
+    "reciprocal_rank_fusion",
     "delete_documentation",
     "build_search_items",
     "start_ingestion",
@@ -34,4 +52,5 @@ __all__ = [
     "request_stop",
     "run_ingestion_pipeline",
     "parse_sections",
+    "parse_sections_async",
 ]
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import fnmatch
-from dataclasses import dataclass
+import logging
+import zlib
+from collections.abc import AsyncIterator, Collection
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse, urlunparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
 
+import httpx
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
 from crawl4ai.deep_crawling.filters import FilterChain, URLPatternFilter
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(slots=True)
 class CrawledPage:
@@ -15,6 +24,22 @@ class CrawledPage:
     markdown: str
     html: str | None
     depth: int
+    etag: str | None = None
+    last_modified: str | None = None
+    links: list[str] = field(default_factory=list)
+    # Set by recrawl_site / crawl_sitemap_stream when a conditional request
+    # answered 304 or the sitemap lastmod predates the last sync: markdown and
+    # html are empty and the page's previously ingested sections still apply.
+    not_modified: bool = False
+
+
+@dataclass(slots=True)
+class PageValidator:
+    """Cache validators and internal links stored from a page's previous crawl."""
+
+    etag: str | None
+    last_modified: str | None
+    links: list[str]
 
 
 def normalize_url(url: str) -> str:
@@ -75,6 +100,74 @@ def _build_filter_chain(
     return FilterChain(filters) if filters else None
 
 
+def _extract_internal_links(result: object) -> list[str]:
+    """Return the normalized, de-duplicated internal links of a Crawl4AI result."""
+    links = getattr(result, "links", None)
+    if not isinstance(links, dict):
+        return []
+    normalized: dict[str, None] = {}
+    for link in links.get("internal") or []:
+        href = link.get("href") if isinstance(link, dict) else link
+        if isinstance(href, str) and href.startswith(("http://", "https://")):
+            normalized[normalize_url(href)] = None
+    return list(normalized)
+
+
+def _to_crawled_page(result: object, fallback_url: str) -> CrawledPage | None:
+    """Map a Crawl4AI result to a ``CrawledPage`` (``None`` for failed fetches)."""
+    if hasattr(result, "success") and not getattr(result, "success"):
+        return None
+
+    markdown = _extract_markdown(result)
+    html = getattr(result, "html", None) or getattr(result, "cleaned_html", None)
+    depth = 0
+    if hasattr(result, "metadata") and isinstance(result.metadata, dict):
+        depth = result.metadata.get("depth", 0)
+    raw_headers = getattr(result, "response_headers", None)
+    headers = {key.lower(): value for key, value in raw_headers.items()} if isinstance(raw_headers, dict) else {}
+
+    return CrawledPage(
+        url=getattr(result, "url", fallback_url),
+        markdown=markdown,
+        html=html,
+        depth=depth,
+        etag=headers.get("etag"),
+        last_modified=headers.get("last-modified"),
+        links=_extract_internal_links(result),
+    )
+
+
+def _build_run_config(
+    max_depth: int | None,
+    include_patterns: list[str],
+    exclude_patterns: list[str],
+    max_pages: int | None,
+    timeout_seconds: int,
+    stream: bool,
+) -> CrawlerRunConfig:
+    filter_chain = _build_filter_chain(include_patterns, exclude_patterns)
+
+    # ── Strategy ────────────────────────────────────────────────────
+    strategy_kwargs: dict[str, object] = {
+        "max_depth": max_depth if max_depth is not None else 100,
+        "include_external": False,
+    }
+    if max_pages is not None:
+        strategy_kwargs["max_pages"] = max_pages
+    if filter_chain is not None:
+        strategy_kwargs["filter_chain"] = filter_chain
+
+    strategy = BFSDeepCrawlStrategy(**strategy_kwargs)
+
+    # ── Run config ──────────────────────────────────────────────────
+    return CrawlerRunConfig(
+        deep_crawl_strategy=strategy,
+        cache_mode=CacheMode.BYPASS,
+        page_timeout=timeout_seconds * 1000,
+        stream=stream,
+    )
+
+
 async def crawl_site(
     start_url: str,
     max_depth: int | None = 3,
@@ -105,30 +198,13 @@ async def crawl_site(
         Kept for backward compatibility; Crawl4AI handles retries
         internally.
     """
-    include_patterns = include_patterns or []
-    exclude_patterns = exclude_patterns or []
-
     start_url = normalize_url(start_url)
-
-    filter_chain = _build_filter_chain(include_patterns, exclude_patterns)
-
-    # ── Strategy ────────────────────────────────────────────────────
-    strategy_kwargs: dict[str, object] = {
-        "max_depth": max_depth if max_depth is not None else 100,
-        "include_external": False,
-    }
-    if max_pages is not None:
-        strategy_kwargs["max_pages"] = max_pages
-    if filter_chain is not None:
-        strategy_kwargs["filter_chain"] = filter_chain
-
-    strategy = BFSDeepCrawlStrategy(**strategy_kwargs)
-
-    # ── Run config ──────────────────────────────────────────────────
-    config = CrawlerRunConfig(
-        deep_crawl_strategy=strategy,
-        cache_mode=CacheMode.BYPASS,
-        page_timeout=timeout_seconds * 1000,
+    config = _build_run_config(
+        max_depth=max_depth,
+        include_patterns=include_patterns or [],
+        exclude_patterns=exclude_patterns or [],
+        max_pages=max_pages,
+        timeout_seconds=timeout_seconds,
         stream=False,
     )
 
@@ -142,22 +218,384 @@ async def crawl_site(
 
     pages: list[CrawledPage] = []
     for result in results:
-        if hasattr(result, "success") and not getattr(result, "success"):
-            continue
+        page = _to_crawled_page(result, start_url)
+        if page is not None:
+            pages.append(page)
+
+    return pages
+
+
+async def crawl_site_stream(
+    start_url: str,
+    max_depth: int | None = 3,
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    max_pages: int | None = 500,
+    timeout_seconds: int = 30,
+) -> AsyncIterator[CrawledPage]:
+    """Streaming variant of :func:`crawl_site`.
+
+    Yields each page as soon as Crawl4AI finishes it instead of waiting for
+    the whole BFS to complete, so downstream stages can start immediately.
+    Accepts the same parameters as :func:`crawl_site`.
+    """
+    start_url = normalize_url(start_url)
+    config = _build_run_config(
+        max_depth=max_depth,
+        include_patterns=include_patterns or [],
+        exclude_patterns=exclude_patterns or [],
+        max_pages=max_pages,
+        timeout_seconds=timeout_seconds,
+        stream=True,
+    )
+
+    async with AsyncWebCrawler() as crawler:
+        results = await crawler.arun(start_url, config=config)
 
-        markdown = _extract_markdown(result)
-        html = getattr(result, "html", None) or getattr(result, "cleaned_html", None)
-        depth = 0
-        if hasattr(result, "metadata") and isinstance(result.metadata, dict):
-            depth = result.metadata.get("depth", 0)
-
-        pages.append(
-            CrawledPage(
-                url=getattr(result, "url", start_url),
-                markdown=markdown,
-                html=html,
-                depth=depth,
-            )
+        # Single-page fallback: Crawl4AI returns a plain result when the
+        # deep-crawl strategy decides there is nothing to stream.
+        if not hasattr(results, "__aiter__"):
+            results_list = results if isinstance(results, list) else [results]
+            for result in results_list:
+                page = _to_crawled_page(result, start_url)
+                if page is not None:
+                    yield page
+            return
+
+        async for result in results:
+            page = _to_crawled_page(result, start_url)
+            if page is not None:
+                yield page
+
+
+async def _revalidate(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    validator: PageValidator | None,
+) -> httpx.Headers | None:
+    """Send a conditional GET for *url*; return the 304 response headers, or ``None`` if it must be rendered."""
+    if validator is None:
+        return None
+    headers: dict[str, str] = {}
+    if validator.etag:
+        headers["If-None-Match"] = validator.etag
+    if validator.last_modified:
+        headers["If-Modified-Since"] = validator.last_modified
+    if not headers:
+        return None
+
+    async with semaphore:
+        try:
+            # Streamed so a 200 body is never downloaded: the page is rendered by the browser instead.
+            async with client.stream("GET", url, headers=headers) as response:
+                return response.headers if response.status_code == 304 else None
+        except httpx.HTTPError:
+            return None
+
+
+async def _fetch_pages(
+    client: httpx.AsyncClient,
+    crawler: AsyncWebCrawler,
+    semaphore: asyncio.Semaphore,
+    urls: list[str],
+    validators: dict[str, PageValidator],
+    stored_urls: dict[str, str],
+    config: CrawlerRunConfig,
+    depth: int,
+) -> AsyncIterator[CrawledPage]:
+    """Revalidate *urls* that have validators, then render the rest with ``arun_many``.
+
+    *stored_urls* maps normalized URLs back to the URLs the validators were
+    stored under; ``not_modified`` pages keep the stored URL.
+    """
+    to_render: list[str] = []
+    revalidated = await asyncio.gather(
+        *(_revalidate(client, semaphore, url, validators.get(stored_urls.get(url, url))) for url in urls)
+    )
+    for url, headers in zip(urls, revalidated):
+        if headers is None:
+            to_render.append(url)
+            continue
+        stored_url = stored_urls.get(url, url)
+        validator = validators[stored_url]
+        yield CrawledPage(
+            url=stored_url,
+            markdown="",
+            html=None,
+            depth=depth,
+            etag=headers.get("etag", validator.etag),
+            last_modified=headers.get("last-modified", validator.last_modified),
+            links=list(validator.links),
+            not_modified=True,
         )
 
-    return pages
+    if to_render:
+        for result in await crawler.arun_many(to_render, config=config):
+            page = _to_crawled_page(result, to_render[0])
+            if page is not None:
+                page.depth = depth
+                yield page
+
+
+async def recrawl_site_stream(
+    start_url: str,
+    validators: dict[str, PageValidator],
+    max_depth: int | None = 3,
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    max_pages: int | None = 500,
+    timeout_seconds: int = 30,
+    concurrency: int = 16,
+) -> AsyncIterator[CrawledPage]:
+    """Re-crawl a site, revalidating previously crawled pages before rendering them.
+
+    Walks the site breadth-first with the same depth, pattern and page limits
+    as :func:`crawl_site`.  For every URL with a stored validator a
+    conditional GET (``If-None-Match`` / ``If-Modified-Since``) is sent first,
+    at most *concurrency* at a time; a ``304`` yields a ``not_modified`` page
+    whose links come from *validators*, so no browser work is done for it.
+    Only new URLs and pages that answer anything else are rendered by
+    Crawl4AI, one BFS level at a time.
+    """
+    start_url = normalize_url(start_url)
+    host = urlparse(start_url).netloc
+    filter_chain = _build_filter_chain(include_patterns or [], exclude_patterns or [])
+    render_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS, page_timeout=timeout_seconds * 1000)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    # Links are normalized; map them back to the URLs the validators were stored under.
+    stored_urls = {normalize_url(url): url for url in validators}
+    seen = {start_url}
+    level = [start_url]
+    depth = 0
+    remaining = max_pages
+    async with (
+        httpx.AsyncClient(timeout=timeout_seconds, follow_redirects=True) as client,
+        AsyncWebCrawler() as crawler,
+    ):
+        while level:
+            if remaining is not None:
+                level = level[:remaining]
+                remaining -= len(level)
+
+            pages: list[CrawledPage] = []
+            fetched = _fetch_pages(client, crawler, semaphore, level, validators, stored_urls, render_config, depth)
+            async for page in fetched:
+                pages.append(page)
+                yield page
+
+            depth += 1
+            level = []
+            if (max_depth is not None and depth > max_depth) or remaining == 0:
+                break
+            for page in pages:
+                for link in page.links:
+                    if link in seen or urlparse(link).netloc != host:
+                        continue
+                    seen.add(link)
+                    if filter_chain is None or await filter_chain.apply(link):
+                        level.append(link)
+
+
+async def recrawl_site(start_url: str, validators: dict[str, PageValidator], **kwargs) -> list[CrawledPage]:
+    """Collect :func:`recrawl_site_stream` into a list, like :func:`crawl_site`."""
+    return [page async for page in recrawl_site_stream(start_url, validators, **kwargs)]
+
+
+# Pages rendered per arun_many call while sitemaps are still being read.
+_SITEMAP_FETCH_BATCH = 64
+
+# Sitemap indexes may list further indexes; deeper nesting is ignored.
+_MAX_SITEMAP_NESTING = 3
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _parse_lastmod(value: str | None) -> datetime | None:
+    """Parse a sitemap ``lastmod`` (W3C datetime) as a UTC upper bound.
+
+    A date-only value could mean any time that day, so it maps to the end of
+    the day; unparseable values return ``None``.
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def _sitemap_locations(client: httpx.AsyncClient, start_url: str) -> list[str]:
+    """Return the sitemaps ``robots.txt`` declares, or the conventional ``/sitemap.xml``."""
+    parsed = urlparse(start_url)
+    root = f"{parsed.scheme}://{parsed.netloc}"
+    try:
+        response = await client.get(f"{root}/robots.txt")
+    except httpx.HTTPError:
+        response = None
+    sitemaps = []
+    if response is not None and response.status_code == 200:
+        for line in response.text.splitlines():
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sitemap" and value.strip():
+                sitemaps.append(value.strip())
+    return sitemaps or [f"{root}/sitemap.xml"]
+
+
+async def _iter_sitemap(
+    client: httpx.AsyncClient, sitemap_url: str, seen: set[str], nesting: int = 0
+) -> AsyncIterator[tuple[str, datetime | None]]:
+    """Yield ``(loc, lastmod)`` for every ``<url>`` of a sitemap, following sitemap indexes.
+
+    The document is fed to an ``XMLPullParser`` chunk by chunk as it
+    downloads (gunzipping ``.xml.gz`` bodies on the fly), so URLs are yielded
+    before the whole sitemap has arrived and finished entries are cleared
+    instead of accumulating a tree.  Unreachable or malformed sitemaps end
+    quietly with whatever was read.
+    """
+    if sitemap_url in seen or nesting > _MAX_SITEMAP_NESTING:
+        return
+    seen.add(sitemap_url)
+
+    parser = XMLPullParser(events=("end",))
+    nested: list[str] = []
+    try:
+        async with client.stream("GET", sitemap_url) as response:
+            if response.status_code != 200:
+                return
+            decompressor = None
+            async for chunk in response.aiter_bytes():
+                if decompressor is None and chunk.startswith(_GZIP_MAGIC):
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                parser.feed(decompressor.decompress(chunk) if decompressor is not None else chunk)
+                for _, element in parser.read_events():
+                    # Cheap suffix test first: most end events are <loc>/<lastmod> children.
+                    if not element.tag.endswith(("url", "sitemap")):
+                        continue
+                    kind = _local_name(element.tag)
+                    if kind not in ("url", "sitemap"):
+                        continue
+                    fields = {_local_name(child.tag): (child.text or "").strip() for child in element}
+                    element.clear()
+                    loc = fields.get("loc")
+                    if not loc:
+                        continue
+                    if kind == "sitemap":
+                        nested.append(loc)
+                    else:
+                        yield loc, _parse_lastmod(fields.get("lastmod"))
+    except (httpx.HTTPError, ParseError, zlib.error) as exc:
+        logger.warning("Could not read sitemap %s: %s", sitemap_url, exc)
+
+    for nested_url in nested:
+        async for entry in _iter_sitemap(client, nested_url, seen, nesting + 1):
+            yield entry
+
+
+async def _iter_site_sitemaps(
+    client: httpx.AsyncClient, start_url: str
+) -> AsyncIterator[tuple[str, datetime | None]]:
+    seen: set[str] = set()
+    for sitemap_url in await _sitemap_locations(client, start_url):
+        async for entry in _iter_sitemap(client, sitemap_url, seen):
+            yield entry
+
+
+async def crawl_sitemap_stream(
+    start_url: str,
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    max_pages: int | None = 500,
+    timeout_seconds: int = 30,
+    known_urls: Collection[str] = (),
+    last_synced: datetime | None = None,
+    validators: dict[str, PageValidator] | None = None,
+    concurrency: int = 16,
+) -> AsyncIterator[CrawledPage]:
+    """Crawl the pages a site lists in its sitemaps instead of following links.
+
+    Sitemaps are taken from ``robots.txt`` (``/sitemap.xml`` otherwise) and
+    read incrementally, sitemap indexes included.  Listed URLs on the start
+    URL's host that pass the include/exclude globs (the scope link-following
+    crawls too) are rendered in batches of ``_SITEMAP_FETCH_BATCH`` as soon
+    as they are known, without waiting for a render to discover them.
+
+    A URL in *known_urls* whose ``lastmod`` is not after *last_synced*
+    yields a ``not_modified`` page without any request.  With *validators*
+    the remaining known pages are revalidated with conditional GETs first, as
+    in :func:`recrawl_site_stream`.  Yields nothing when the site has no
+    usable sitemap, so callers can fall back to :func:`crawl_site`.
+    """
+    start_url = normalize_url(start_url)
+    host = urlparse(start_url).netloc
+    filter_chain = _build_filter_chain(include_patterns or [], exclude_patterns or [])
+    render_config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS, page_timeout=timeout_seconds * 1000)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    validators = validators or {}
+    if last_synced is not None and last_synced.tzinfo is None:
+        last_synced = last_synced.replace(tzinfo=timezone.utc)
+
+    known = set(known_urls)
+    stored_urls = {normalize_url(url): url for url in (*known, *validators)}
+    seen: set[str] = set()
+    batch: list[str] = []
+    remaining = max_pages
+    async with (
+        httpx.AsyncClient(timeout=timeout_seconds, follow_redirects=True) as client,
+        AsyncWebCrawler() as crawler,
+    ):
+        # Sitemaps are read by their own task so their downloads never sit idle
+        # while a batch renders; the queue only ever holds (url, lastmod) pairs.
+        entries: asyncio.Queue = asyncio.Queue()
+
+        async def read_sitemaps() -> None:
+            try:
+                async for entry in _iter_site_sitemaps(client, start_url):
+                    entries.put_nowait(entry)
+            finally:
+                entries.put_nowait(None)
+
+        reader = asyncio.create_task(read_sitemaps())
+        try:
+            while (entry := await entries.get()) is not None:
+                loc, lastmod = entry
+                url = normalize_url(loc)
+                if url in seen or urlparse(url).netloc != host:
+                    continue
+                seen.add(url)
+                if filter_chain is not None and not await filter_chain.apply(url):
+                    continue
+
+                stored_url = stored_urls.get(url, url)
+                if stored_url in known and lastmod is not None and last_synced is not None and lastmod <= last_synced:
+                    yield CrawledPage(url=stored_url, markdown="", html=None, depth=0, not_modified=True)
+                else:
+                    batch.append(url)
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining == 0:
+                        break
+                # Render as soon as a batch fills up or nothing else is known yet.
+                if len(batch) >= _SITEMAP_FETCH_BATCH or (batch and entries.empty()):
+                    async for page in _fetch_pages(
+                        client, crawler, semaphore, batch, validators, stored_urls, render_config, depth=0
+                    ):
+                        yield page
+                    batch = []
+
+            if batch:
+                async for page in _fetch_pages(
+                    client, crawler, semaphore, batch, validators, stored_urls, render_config, depth=0
+                ):
+                    yield page
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
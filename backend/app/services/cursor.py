@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+
+class InvalidCursorError(ValueError):
+    """The cursor is malformed or was issued by a different listing or ranking."""
+
+
+@dataclass(frozen=True, slots=True)
+class Cursor:
+    """Keyset position in a paginated listing.
+
+    *kind* names the ordering the cursor belongs to (``sections``,
+    ``vector``, ``chunk``, ``keyword``, ``fulltext`` or ``hybrid``).  Rows
+    after the cursor sort after ``(value, path)`` in that ordering — *value*
+    is the rank (a score or a distance; unused for path-ordered listings)
+    and the section path, unique within a documentation set, breaks ties.
+    *position* is the number of rows before the cursor, so depth-dependent
+    work (totals, candidate and ``ef_search`` sizing) still knows how deep
+    the page is.
+    """
+
+    kind: str
+    position: int
+    path: str = ""
+    value: float | None = None
+
+    def expect(self, *kinds: str) -> Cursor:
+        if self.kind not in kinds:
+            raise InvalidCursorError(f"cursor for {self.kind!r} results cannot continue {kinds[0]!r} results")
+        return self
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps([cursor.kind, cursor.position, cursor.path, cursor.value], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, position, path, value = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise InvalidCursorError("malformed cursor") from exc
+    if (
+        not isinstance(kind, str)
+        or not isinstance(position, int)
+        or position < 0
+        or not isinstance(path, str)
+        or not (value is None or isinstance(value, (int, float)))
+    ):
+        raise InvalidCursorError("malformed cursor")
+    return Cursor(kind=kind, position=position, path=path, value=None if value is None else float(value))
@@ -1,20 +1,110 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import uuid
 from dataclasses import dataclass
+from typing import Literal
 from urllib.parse import unquote
 
-from sqlalchemy import case, desc, func, or_, text, type_coerce, Float
+from sqlalchemy import (
+    Float,
+    Integer,
+    and_,
+    bindparam,
+    case,
+    cast,
+    desc,
+    func,
+    literal,
+    literal_column,
+    or_,
+    true,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql.functions import FunctionElement
 from sqlmodel import Session, delete, select
 
-from app.models import Documentation, DocumentationSection, IngestionJob, RawPage
+from app.config import settings
+from app.db import dialect_insert, vector_bindparam
+from app.models import (
+    Documentation,
+    DocumentationSection,
+    DocumentationSectionChunk,
+    DocumentationTree,
+    DocumentationTreeEntry,
+    IngestionJob,
+    PageFingerprint,
+    RawPage,
+)
+from app.services.cursor import Cursor, encode_cursor
+from app.services.vector_index import compact_distance, drop_documentation_vector_indexes
+
+
+TotalMode = Literal["exact", "estimate", "none"]
 
 
 @dataclass(slots=True)
 class PaginationResult:
-    total: int
+    # None when no total was computed (total_kind "none")
+    total: int | None
     limit: int
     offset: int
+    total_kind: TotalMode = "exact"
+    has_more: bool = False
+    # Opaque keyset cursor for the next page (set whenever has_more)
+    next_cursor: str | None = None
+
+
+@dataclass(slots=True)
+class SearchHit:
+    section: DocumentationSection
+    score: float
+    # Precomputed highlight (e.g. from ts_headline); derived from the query when None
+    excerpt: str | None = None
+
+
+# Text search configuration baked into the generated documentation_section.search_vector column.
+FTS_CONFIG = "english"
+_FTS_HEADLINE_OPTIONS = "StartSel=**, StopSel=**, MaxWords=35, MinWords=15, MaxFragments=2"
+
+# Column projections: listings and search hits never load section content or embeddings
+# (raiseload turns an accidental access into an error instead of a per-row query).
+_SECTION_LISTING_COLUMNS = load_only(
+    DocumentationSection.id,
+    DocumentationSection.documentation_id,
+    DocumentationSection.path,
+    DocumentationSection.title,
+    DocumentationSection.summary,
+    DocumentationSection.level,
+    DocumentationSection.url,
+    DocumentationSection.token_count,
+    DocumentationSection.checksum,
+    raiseload=True,
+)
+_SEARCH_HIT_COLUMNS = load_only(
+    DocumentationSection.id,
+    DocumentationSection.documentation_id,
+    DocumentationSection.path,
+    DocumentationSection.title,
+    DocumentationSection.summary,
+    raiseload=True,
+)
+# Search excerpts are cut from this much of the content, fetched with substr() instead of the full text:
+# a window starting just before the query's first match, or the head when it does not occur.
+_EXCERPT_SOURCE_CHARS = 2000
+_EXCERPT_CONTEXT_CHARS = 40
+
+HnswIterativeScan = Literal["default", "off", "strict_order", "relaxed_order"]
+# pgvector's default and upper bound for hnsw.ef_search
+_HNSW_DEFAULT_EF_SEARCH = 40
+_HNSW_MAX_EF_SEARCH = 1000
+# Rows fetched past the page end by the index-ordered scan, so equal distances there are sorted by path as a whole.
+_DISTANCE_TIE_SLACK = 10
 
 
 def normalize_section_path(path: str) -> str:
@@ -26,11 +116,85 @@ def normalize_section_path(path: str) -> str:
     return normalized
 
 
-def list_documentations(session: Session, limit: int, offset: int) -> tuple[list[dict], PaginationResult]:
-    total = session.exec(select(func.count()).select_from(Documentation)).one()
-    docs = session.exec(select(Documentation).order_by(Documentation.created_at.desc()).offset(offset).limit(limit)).all()
+def _fetch_limit(limit: int, total_mode: TotalMode) -> int:
+    """Rows to fetch for a page: one extra when ``has_more`` must be derived from the page itself."""
+    return limit if total_mode == "exact" else limit + 1
+
+
+def _paginate(session: Session, rows: list, count_query, limit: int, offset: int, total_mode: TotalMode):
+    """Trim *rows* (fetched with :func:`_fetch_limit`) to a page and work out its total.
+
+    ``exact`` runs *count_query*.  Otherwise the extra row tells whether
+    there is a next page; when there is not, the total is known exactly from
+    the page anyway.  ``estimate`` then asks the planner for a row estimate
+    (PostgreSQL only — elsewhere no total is returned) and ``none`` skips
+    the total altogether.
+    """
+    if total_mode == "exact":
+        total = session.exec(count_query).one()
+        return rows, PaginationResult(
+            total=total, limit=limit, offset=offset, has_more=offset + len(rows) < total
+        )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not has_more and (rows or offset == 0):
+        return rows, PaginationResult(total=offset + len(rows), limit=limit, offset=offset)
+
+    total = estimate_count(session, count_query) if total_mode == "estimate" else None
+    if total is None:
+        return rows, PaginationResult(total=None, limit=limit, offset=offset, total_kind="none", has_more=has_more)
+    # Planner estimates can be stale; never report fewer rows than the page proves exist.
+    total = max(total, offset + len(rows) + int(has_more))
+    return rows, PaginationResult(total=total, limit=limit, offset=offset, total_kind="estimate", has_more=has_more)
+
+
+def _set_next_cursor(page: PaginationResult, kind: str, rows: int, path: str, value: float | None = None) -> None:
+    if page.has_more:
+        page.next_cursor = encode_cursor(Cursor(kind=kind, position=page.offset + rows, path=path, value=value))
+
+
+def _after_ranked(rank, after: Cursor | None, *, descending: bool):
+    """Keyset predicate for rows after *after* in ``(rank, path)`` order (path ascending)."""
+    if after is None:
+        return true()
+    beyond = rank < after.value if descending else rank > after.value
+    return or_(beyond, and_(rank == after.value, DocumentationSection.path > after.path))
+
+
+def estimate_count(session: Session, count_query) -> int | None:
+    """Planner row estimate for the rows *count_query* counts (``EXPLAIN``, no execution).
+
+    Returns ``None`` on databases other than PostgreSQL.
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = count_query.with_only_columns(literal_column("1")).compile(
+        dialect=bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def list_documentations(
+    session: Session, limit: int, offset: int, total_mode: TotalMode = "exact"
+) -> tuple[list[dict], PaginationResult]:
+    docs, page = _paginate(
+        session,
+        session.exec(
+            select(Documentation)
+            .order_by(Documentation.created_at.desc())
+            .offset(offset)
+            .limit(_fetch_limit(limit, total_mode))
+        ).all(),
+        select(func.count()).select_from(Documentation),
+        limit,
+        offset,
+        total_mode,
+    )
     if not docs:
-        return [], PaginationResult(total=total, limit=limit, offset=offset)
+        return [], page
 
     doc_ids = [doc.id for doc in docs]
 
@@ -74,7 +238,7 @@ def list_documentations(session: Session, limit: int, offset: int) -> tuple[list
         }
         for doc in docs
     ]
-    return items, PaginationResult(total=total, limit=limit, offset=offset)
+    return items, page
 
 
 def list_sections(
@@ -83,8 +247,15 @@ def list_sections(
     limit: int,
     offset: int,
     start_path: str | None,
+    total_mode: TotalMode = "exact",
+    after: Cursor | None = None,
 ) -> tuple[list[DocumentationSection], PaginationResult]:
-    base_query = select(DocumentationSection).where(DocumentationSection.documentation_id == documentation_id)
+    """Sections ordered by path; *after* continues from a ``next_cursor`` by keyset instead of OFFSET."""
+    base_query = (
+        select(DocumentationSection)
+        .options(_SECTION_LISTING_COLUMNS)
+        .where(DocumentationSection.documentation_id == documentation_id)
+    )
     count_query = select(func.count()).select_from(DocumentationSection).where(
         DocumentationSection.documentation_id == documentation_id
     )
@@ -95,9 +266,23 @@ def list_sections(
         base_query = base_query.where(DocumentationSection.path.like(like_pattern))
         count_query = count_query.where(DocumentationSection.path.like(like_pattern))
 
-    total = session.exec(count_query).one()
-    sections = session.exec(base_query.order_by(DocumentationSection.path).offset(offset).limit(limit)).all()
-    return sections, PaginationResult(total=total, limit=limit, offset=offset)
+    if after is not None:
+        offset = after.expect("sections").position
+        base_query = base_query.where(DocumentationSection.path > after.path)
+    else:
+        base_query = base_query.offset(offset)
+
+    sections, page = _paginate(
+        session,
+        session.exec(base_query.order_by(DocumentationSection.path).limit(_fetch_limit(limit, total_mode))).all(),
+        count_query,
+        limit,
+        offset,
+        total_mode,
+    )
+    if sections:
+        _set_next_cursor(page, "sections", len(sections), sections[-1].path)
+    return sections, page
 
 
 def get_section_content(
@@ -113,7 +298,13 @@ def get_section_content(
 
 def get_documentation_tree(session: Session, documentation_id: uuid.UUID) -> list[dict]:
     sections = session.exec(
-        select(DocumentationSection)
+        select(
+            DocumentationSection.id,
+            DocumentationSection.path,
+            DocumentationSection.parent_id,
+            DocumentationSection.title,
+            DocumentationSection.level,
+        )
         .where(DocumentationSection.documentation_id == documentation_id)
         .order_by(DocumentationSection.path)
     ).all()
@@ -129,6 +320,7 @@ def get_documentation_tree(session: Session, documentation_id: uuid.UUID) -> lis
             "parent_id": section.parent_id,
             "title": section.title,
             "level": section.level,
+            "child_count": 0,
             "children": [],
         }
         nodes[section.id] = node
@@ -148,21 +340,164 @@ def get_documentation_tree(session: Session, documentation_id: uuid.UUID) -> lis
     def sort_nodes(items: list[dict]) -> None:
         items.sort(key=lambda n: n["path"])
         for item in items:
+            item["child_count"] = len(item["children"])
             sort_nodes(item["children"])
 
     sort_nodes(roots)
     return roots
 
 
-def _make_excerpt(section: DocumentationSection, query: str) -> str:
+def _tree_entries(documentation_id: uuid.UUID, nodes: list[dict], tree_parent_path: str | None = None):
+    for node in nodes:
+        yield {
+            "documentation_id": documentation_id,
+            "path": node["path"],
+            "tree_parent_path": tree_parent_path,
+            "section_id": node["id"],
+            "parent_id": node["parent_id"],
+            "title": node["title"],
+            "level": node["level"],
+            "child_count": node["child_count"],
+        }
+        yield from _tree_entries(documentation_id, node["children"], node["path"])
+
+
+def refresh_documentation_tree(session: Session, documentation_id: uuid.UUID) -> DocumentationTree:
+    """Rebuild and store the serialized tree of *documentation_id* (commits).
+
+    The version is the hash of the serialized roots, so a rebuild that finds
+    the same sections keeps the version (and clients' cached ETags) valid;
+    the per-node entries are only rewritten when it changes.
+    """
+    roots = get_documentation_tree(session, documentation_id)
+    roots_json = json.dumps(roots, default=str, separators=(",", ":"))
+    values = {
+        "version": hashlib.sha256(roots_json.encode("utf-8")).hexdigest(),
+        "roots_json": roots_json,
+        "built_at": func.now(),
+    }
+    if get_documentation_tree_version(session, documentation_id) != values["version"]:
+        session.exec(delete(DocumentationTreeEntry).where(DocumentationTreeEntry.documentation_id == documentation_id))
+        entries = list(_tree_entries(documentation_id, roots))
+        if entries:
+            session.execute(DocumentationTreeEntry.__table__.insert(), entries)
+    insert = dialect_insert(session)
+    session.exec(
+        insert(DocumentationTree)
+        .values(documentation_id=documentation_id, **values)
+        .on_conflict_do_update(index_elements=[DocumentationTree.documentation_id], set_=values)
+    )
+    session.commit()
+    return session.get(DocumentationTree, documentation_id, populate_existing=True)
+
+
+def get_documentation_tree_version(session: Session, documentation_id: uuid.UUID) -> str | None:
+    """Version of the stored tree, without loading it; ``None`` when no tree was built yet."""
+    return session.exec(
+        select(DocumentationTree.version).where(DocumentationTree.documentation_id == documentation_id)
+    ).first()
+
+
+def get_stored_documentation_tree(session: Session, documentation_id: uuid.UUID) -> DocumentationTree:
+    """The tree as stored at the end of the last ingestion run.
+
+    Documentation sets ingested before trees were stored get theirs built on
+    first access.
+    """
+    tree = session.get(DocumentationTree, documentation_id)
+    if tree is None:
+        tree = refresh_documentation_tree(session, documentation_id)
+    return tree
+
+
+def get_documentation_subtree(
+    session: Session, documentation_id: uuid.UUID, root_path: str | None = None, depth: int | None = None
+) -> list[dict] | None:
+    """Children of *root_path* (the tree roots when ``None``), expanded *depth* levels deep.
+
+    Reads the stored tree entries one level per query, so the cost follows
+    the size of the returned subtree rather than of the whole tree.  Nodes at
+    the depth limit keep their ``child_count`` but no ``children``; clients
+    expand them with another call rooted at their path.  ``None`` when
+    *root_path* is not in the tree.
+    """
+    if root_path is not None and session.get(DocumentationTreeEntry, (documentation_id, root_path)) is None:
+        return None
+
+    roots: list[dict] = []
+    frontier: dict[str | None, list[dict]] = {root_path: roots}
+    level = 0
+    while frontier and (depth is None or level < depth):
+        parent_filter = (
+            DocumentationTreeEntry.tree_parent_path.is_(None)
+            if root_path is None and level == 0
+            else DocumentationTreeEntry.tree_parent_path.in_(list(frontier))
+        )
+        entries = session.exec(
+            select(DocumentationTreeEntry)
+            .where(DocumentationTreeEntry.documentation_id == documentation_id, parent_filter)
+            .order_by(DocumentationTreeEntry.tree_parent_path, DocumentationTreeEntry.path)
+        ).all()
+        next_frontier: dict[str | None, list[dict]] = {}
+        for entry in entries:
+            node = {
+                "id": entry.section_id,
+                "path": entry.path,
+                "parent_id": entry.parent_id,
+                "title": entry.title,
+                "level": entry.level,
+                "child_count": entry.child_count,
+                "children": [],
+            }
+            frontier[entry.tree_parent_path].append(node)
+            if entry.child_count:
+                next_frontier[entry.path] = node["children"]
+        frontier = next_frontier
+        level += 1
+    return roots
+
+
+class _position(FunctionElement):
+    """1-based position of the second argument in the first, 0 when it does not occur."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(_position)
+def _compile_position(element, compiler, **kw):
+    return f"instr({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(_position, "postgresql")
+def _compile_position_postgresql(element, compiler, **kw):
+    return f"strpos({compiler.process(element.clauses, **kw)})"
+
+
+def _content_window(query: str):
+    match = _position(func.lower(DocumentationSection.content), func.lower(bindparam("excerpt_query", query)))
+    context = literal_column(str(_EXCERPT_CONTEXT_CHARS))
+    start = case((match > context, match - context), else_=literal_column("1"))
+    return func.substr(DocumentationSection.content, start, _EXCERPT_SOURCE_CHARS).label("content_window")
+
+
+def _make_excerpt(query: str, title: str | None, summary: str | None, content: str | None) -> str:
     query_lower = query.lower()
-    for value in [section.content or "", section.summary or "", section.title or ""]:
+    for value in [content or "", summary or "", title or ""]:
         idx = value.lower().find(query_lower)
         if idx != -1:
             start = max(0, idx - 40)
             end = min(len(value), idx + len(query) + 120)
             return value[start:end].strip()
-    return (section.summary or section.content or section.title or "")[:160].strip()
+    return (summary or content or title or "")[:160].strip()
+
+
+def _search_hit(section: DocumentationSection, score: float, content_window: str | None, query: str) -> SearchHit:
+    return SearchHit(
+        section=section,
+        score=score,
+        excerpt=_make_excerpt(query, section.title, section.summary, content_window),
+    )
 
 
 def search_sections_keyword(
@@ -171,38 +506,123 @@ def search_sections_keyword(
     query: str,
     limit: int,
     offset: int,
-) -> tuple[list[tuple[DocumentationSection, float]], PaginationResult]:
+    total_mode: TotalMode = "exact",
+    after: Cursor | None = None,
+) -> tuple[list[SearchHit], PaginationResult]:
+    """Keyword search over section title, summary and content.
+
+    On PostgreSQL this is full-text search against the weighted, GIN-indexed
+    ``search_vector`` column (title A, summary B, content C); elsewhere it
+    falls back to ``ILIKE`` substring matching.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return _search_sections_fulltext(session, documentation_id, query, limit, offset, total_mode, after)
+
     pattern = f"%{query}%"
     predicates = or_(
         DocumentationSection.title.ilike(pattern),
         DocumentationSection.summary.ilike(pattern),
         DocumentationSection.content.ilike(pattern),
     )
-    score_expr = (
+    score = (
         case((DocumentationSection.title.ilike(pattern), 3), else_=0)
         + case((DocumentationSection.summary.ilike(pattern), 2), else_=0)
         + case((DocumentationSection.content.ilike(pattern), 1), else_=0)
-    ).label("score")
+    )
+    if after is not None:
+        offset = after.expect("keyword").position
 
-    total = session.exec(
+    count_query = (
         select(func.count())
         .select_from(DocumentationSection)
         .where(DocumentationSection.documentation_id == documentation_id, predicates)
-    ).one()
+    )
 
     rows = session.exec(
-        select(DocumentationSection, score_expr)
-        .where(DocumentationSection.documentation_id == documentation_id, predicates)
+        select(DocumentationSection, score.label("score"), _content_window(query))
+        .options(_SEARCH_HIT_COLUMNS)
+        .where(
+            DocumentationSection.documentation_id == documentation_id,
+            predicates,
+            _after_ranked(score, after, descending=True),
+        )
         .order_by(desc("score"), DocumentationSection.path)
-        .offset(offset)
-        .limit(limit)
+        .offset(0 if after else offset)
+        .limit(_fetch_limit(limit, total_mode))
     ).all()
 
-    results: list[tuple[DocumentationSection, float]] = []
-    for section, score in rows:
-        results.append((section, float(score)))
+    results = [_search_hit(section, float(score), window, query) for section, score, window in rows]
+    results, page = _paginate(session, results, count_query, limit, offset, total_mode)
+    if results:
+        _set_next_cursor(page, "keyword", len(results), results[-1].section.path, results[-1].score)
+    return results, page
+
+
+def _fulltext_search_statements(
+    documentation_id: uuid.UUID, query: str, limit: int, offset: int, after: Cursor | None = None
+):
+    """Build (rows, count) statements for PostgreSQL full-text keyword search.
+
+    Ranking happens in an inner query so ``ts_headline`` — which re-parses the
+    section content — only runs for the page of sections actually returned.
+    With *after* the page starts behind that cursor instead of at *offset*.
+    """
+    # Generated column, created by migration only (not mapped on the model).
+    search_vector = literal_column("documentation_section.search_vector", TSVECTOR)
+    ts_query = func.websearch_to_tsquery(cast(literal(FTS_CONFIG), REGCONFIG), query)
+    predicates = (
+        DocumentationSection.documentation_id == documentation_id,
+        search_vector.op("@@")(ts_query),
+    )
+
+    rank = func.ts_rank_cd(search_vector, ts_query)
+    ranked = (
+        select(DocumentationSection.id, rank.label("score"))
+        .where(*predicates, _after_ranked(rank, after, descending=True))
+        .order_by(desc("score"), DocumentationSection.path)
+        .offset(0 if after else offset)
+        .limit(limit)
+        .subquery("ranked")
+    )
+    headline = func.ts_headline(
+        cast(literal(FTS_CONFIG), REGCONFIG),
+        func.coalesce(DocumentationSection.content, DocumentationSection.summary, ""),
+        ts_query,
+        _FTS_HEADLINE_OPTIONS,
+    ).label("excerpt")
 
-    return results, PaginationResult(total=total, limit=limit, offset=offset)
+    rows = (
+        select(DocumentationSection, ranked.c.score, headline)
+        .options(_SEARCH_HIT_COLUMNS)
+        .join(ranked, DocumentationSection.id == ranked.c.id)
+        .order_by(ranked.c.score.desc(), DocumentationSection.path)
+    )
+    count = select(func.count()).select_from(DocumentationSection).where(*predicates)
+    return rows, count
+
+
+def _search_sections_fulltext(
+    session: Session,
+    documentation_id: uuid.UUID,
+    query: str,
+    limit: int,
+    offset: int,
+    total_mode: TotalMode = "exact",
+    after: Cursor | None = None,
+) -> tuple[list[SearchHit], PaginationResult]:
+    if after is not None:
+        offset = after.expect("fulltext").position
+    rows_query, count_query = _fulltext_search_statements(
+        documentation_id, query, _fetch_limit(limit, total_mode), offset, after
+    )
+    results = [
+        SearchHit(section=section, score=float(score), excerpt=excerpt)
+        for section, score, excerpt in session.exec(rows_query).all()
+    ]
+    results, page = _paginate(session, results, count_query, limit, offset, total_mode)
+    if results:
+        _set_next_cursor(page, "fulltext", len(results), results[-1].section.path, results[-1].score)
+    return results, page
 
 
 def has_embeddings(session: Session, documentation_id: uuid.UUID) -> bool:
@@ -218,49 +638,367 @@ def has_embeddings(session: Session, documentation_id: uuid.UUID) -> bool:
     return count > 0
 
 
+def has_chunk_embeddings(session: Session, documentation_id: uuid.UUID) -> bool:
+    """Check whether this documentation set was embedded in sub-chunk mode."""
+    chunk_id = session.exec(
+        select(DocumentationSectionChunk.id).where(DocumentationSectionChunk.documentation_id == documentation_id).limit(1)
+    ).first()
+    return chunk_id is not None
+
+
+def _chunk_search_statements(
+    documentation_id: uuid.UUID,
+    query_vector_expr,
+    limit: int,
+    offset: int,
+    *,
+    aggregation: str,
+    candidates: int,
+    after: Cursor | None = None,
+    query: str = "",
+):
+    """Build (rows, count) statements ranking sections by their nearest chunks.
+
+    The nearest *candidates* chunks are fetched first (served by the chunk
+    HNSW index) and then folded into one score per section: the best chunk
+    similarity (``max``) or the sum over the section's matching chunks
+    (``sum``), which favours sections that match in several places.
+    *query* positions the content window excerpts are cut from.
+    """
+    distance_expr = DocumentationSectionChunk.embedding.op("<=>")(query_vector_expr)
+    candidate_chunks = (
+        select(
+            DocumentationSectionChunk.section_id,
+            (1.0 - type_coerce(distance_expr, Float)).label("similarity"),
+        )
+        .where(DocumentationSectionChunk.documentation_id == documentation_id)
+        .order_by(distance_expr)
+        .limit(candidates)
+        .subquery("candidate_chunks")
+    )
+    aggregate = func.sum if aggregation == "sum" else func.max
+    section_scores = (
+        select(
+            candidate_chunks.c.section_id,
+            aggregate(func.greatest(candidate_chunks.c.similarity, 0.0)).label("score"),
+        )
+        .group_by(candidate_chunks.c.section_id)
+        .subquery("section_scores")
+    )
+
+    rows = (
+        select(DocumentationSection, section_scores.c.score, _content_window(query))
+        .options(_SEARCH_HIT_COLUMNS)
+        .join(section_scores, DocumentationSection.id == section_scores.c.section_id)
+        .where(_after_ranked(section_scores.c.score, after, descending=True))
+        .order_by(section_scores.c.score.desc(), DocumentationSection.path)
+        .offset(0 if after else offset)
+        .limit(limit)
+    )
+    count = select(func.count()).select_from(section_scores)
+    return rows, count
+
+
 async def search_sections_semantic(
     session: Session,
     documentation_id: uuid.UUID,
     query: str,
     limit: int,
     offset: int,
-) -> tuple[list[tuple[DocumentationSection, float]], PaginationResult]:
-    """Semantic search using PGVector cosine distance."""
+    *,
+    ef_search: int | None = None,
+    iterative_scan: HnswIterativeScan | None = None,
+    total_mode: TotalMode = "exact",
+    after: Cursor | None = None,
+) -> tuple[list[SearchHit], PaginationResult]:
+    """Semantic search using PGVector cosine distance.
+
+    Documentation sets embedded in sub-chunk mode are searched over their
+    chunks, with chunk hits aggregated back to sections.  *ef_search* and
+    *iterative_scan* override ``SEARCH_HNSW_EF_SEARCH`` /
+    ``SEARCH_HNSW_ITERATIVE_SCAN`` for this search (see :func:`apply_hnsw_tuning`).
+    """
     from app.services.embedding import embed_query
 
     query_vector = await embed_query(query)
+    return _search_by_vector(
+        session,
+        documentation_id,
+        query_vector,
+        limit,
+        offset,
+        ef_search=ef_search,
+        iterative_scan=iterative_scan,
+        total_mode=total_mode,
+        after=after,
+        query=query,
+    )
 
-    # Use pgvector's <=> cosine distance operator
-    # Wrap in type_coerce(..., Float) to ensure result is treated as a float, not a vector
-    vector_str = "[" + ",".join(str(v) for v in query_vector) + "]"
-    raw_expr = DocumentationSection.embedding.op("<=>")(text(f"'{vector_str}'::vector"))
+
+def apply_hnsw_tuning(
+    session: Session,
+    *,
+    ef_search: int | None = None,
+    iterative_scan: HnswIterativeScan | None = None,
+    min_ef_search: int = 0,
+) -> None:
+    """Set pgvector's HNSW scan parameters for the rest of the session's transaction.
+
+    ``ef_search`` is the size of the candidate list an HNSW scan keeps, and
+    so the most rows a plain scan can return.  It is raised to
+    *min_ef_search* (the rows the query needs: ``offset + limit``, or the
+    rescoring/chunk candidate depth), up to pgvector's limit of 1000.
+    ``iterative_scan`` (pgvector >= 0.8) lets a scan keep walking the graph
+    past ``ef_search`` until enough rows pass the ``documentation_id``
+    filter; when *min_ef_search* is beyond the limit and none is configured,
+    ``strict_order`` is turned on so deep pages are not cut short (the scan
+    still stops at the server's ``hnsw.max_scan_tuples``).
+    Unset values fall back to the settings; ``0`` / ``"default"`` leave the
+    server's value alone.  With ``SEARCH_VECTOR_INDEX_SCOPE=documentation``
+    ``plan_cache_mode`` is forced to custom plans: a generic plan of a
+    server-side prepared search costs about the same with the global index
+    and would stop using the per-documentation partial ones.  Uses
+    ``set_config(..., is_local => true)``, i.e. ``SET LOCAL``, so pooled
+    connections are not affected.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    ef_search = ef_search or settings.search_hnsw_ef_search
+    if ef_search or min_ef_search > _HNSW_DEFAULT_EF_SEARCH:
+        ef_search = min(max(ef_search or _HNSW_DEFAULT_EF_SEARCH, min_ef_search), _HNSW_MAX_EF_SEARCH)
+        session.exec(select(func.set_config("hnsw.ef_search", str(ef_search), True)))
+    iterative_scan = iterative_scan or settings.search_hnsw_iterative_scan
+    if iterative_scan == "default" and min_ef_search > _HNSW_MAX_EF_SEARCH:
+        iterative_scan = "strict_order"
+    if iterative_scan != "default":
+        session.exec(select(func.set_config("hnsw.iterative_scan", iterative_scan, True)))
+    if settings.search_vector_index_scope == "documentation":
+        session.exec(select(func.set_config("plan_cache_mode", "force_custom_plan", True)))
+
+
+def _vector_search_statements(
+    documentation_id: uuid.UUID,
+    query_vector_expr,
+    limit: int,
+    offset: int,
+    *,
+    index_kind: str,
+    rescore_candidates: int,
+    after: Cursor | None = None,
+    query: str = "",
+):
+    """Return ``(rows, count)`` statements for section-level semantic search.
+
+    With a compact *index_kind* (``halfvec`` or ``binary``) retrieval is
+    two-stage: the nearest *rescore_candidates* rows by the compact distance
+    (served by the matching HNSW expression index), then exact cosine
+    distance on the full vectors for just those rows.  With *after* the
+    page starts behind that ``(distance, path)`` cursor; *offset* is then
+    only the depth used to size the candidate set.  *query* positions the
+    content window excerpts are cut from.
+    """
+    raw_expr = DocumentationSection.embedding.op("<=>")(query_vector_expr)
     distance_expr = type_coerce(raw_expr, Float).label("distance")
 
     base_filter = (
         DocumentationSection.documentation_id == documentation_id,
         DocumentationSection.embedding.is_not(None),
     )
+    count_query = select(func.count()).select_from(DocumentationSection).where(*base_filter)
 
-    total = session.exec(
-        select(func.count())
-        .select_from(DocumentationSection)
-        .where(*base_filter)
-    ).one()
+    keyset = _after_ranked(raw_expr, after, descending=False)
+    if index_kind != "full":
+        candidates = (
+            select(DocumentationSection.id)
+            .where(*base_filter)
+            .order_by(
+                compact_distance(
+                    DocumentationSection.embedding, query_vector_expr, index_kind, settings.embedding_dimension
+                )
+            )
+            .limit(max(rescore_candidates, offset + limit))
+            .subquery("candidates")
+        )
+        rows_query = (
+            select(DocumentationSection, distance_expr, _content_window(query))
+            .options(_SEARCH_HIT_COLUMNS)
+            .join(candidates, candidates.c.id == DocumentationSection.id)
+            .where(keyset)
+            .order_by("distance", DocumentationSection.path)
+        )
+    else:
+        # The HNSW index only serves a scan ordered by the distance alone, so the nearest rows come
+        # from that scan and the page is sorted by the (distance, path) keyset the cursor continues.
+        nearest = (
+            select(DocumentationSection.id)
+            .where(*base_filter, keyset)
+            .order_by(raw_expr)
+            .limit((0 if after else offset) + limit + _DISTANCE_TIE_SLACK)
+            .subquery("nearest")
+        )
+        rows_query = (
+            select(DocumentationSection, distance_expr, _content_window(query))
+            .options(_SEARCH_HIT_COLUMNS)
+            .join(nearest, nearest.c.id == DocumentationSection.id)
+            .order_by("distance", DocumentationSection.path)
+        )
 
-    rows = session.exec(
-        select(DocumentationSection, distance_expr)
-        .where(*base_filter)
-        .order_by("distance")
-        .offset(offset)
-        .limit(limit)
-    ).all()
+    return rows_query.offset(0 if after else offset).limit(limit), count_query
 
-    results: list[tuple[DocumentationSection, float]] = []
-    for section, distance in rows:
+
+def _search_by_vector(
+    session: Session,
+    documentation_id: uuid.UUID,
+    query_vector: list[float],
+    limit: int,
+    offset: int,
+    *,
+    ef_search: int | None = None,
+    iterative_scan: HnswIterativeScan | None = None,
+    total_mode: TotalMode = "exact",
+    after: Cursor | None = None,
+    query: str = "",
+) -> tuple[list[SearchHit], PaginationResult]:
+    # *query* is the search text, only used to cut excerpts around its first match.
+    # Use pgvector's <=> cosine distance operator against a bound (binary) query vector,
+    # keeping the statement text constant so psycopg can prepare and reuse it.
+    query_vector_expr = vector_bindparam(query_vector)
+    fetch = _fetch_limit(limit, total_mode)
+
+    if has_chunk_embeddings(session, documentation_id):
+        if after is not None:
+            offset = after.expect("chunk").position
+        # Over-fetch chunks so that several chunks per section still leave a full page of sections.
+        candidates = max(settings.search_chunk_candidates, (offset + fetch) * 4)
+        apply_hnsw_tuning(session, ef_search=ef_search, iterative_scan=iterative_scan, min_ef_search=candidates)
+        rows_query, count_query = _chunk_search_statements(
+            documentation_id,
+            query_vector_expr,
+            fetch,
+            offset,
+            aggregation=settings.search_chunk_aggregation,
+            candidates=candidates,
+            after=after,
+            query=query,
+        )
+        results = [
+            _search_hit(section, float(score), window, query)
+            for section, score, window in session.exec(rows_query).all()
+        ]
+        results, page = _paginate(session, results, count_query, limit, offset, total_mode)
+        if results:
+            _set_next_cursor(page, "chunk", len(results), results[-1].section.path, results[-1].score)
+        return results, page
+
+    if after is not None:
+        offset = after.expect("vector").position
+    index_kind = settings.search_vector_index
+    apply_hnsw_tuning(
+        session,
+        ef_search=ef_search,
+        iterative_scan=iterative_scan,
+        min_ef_search=offset + fetch
+        if index_kind == "full"
+        else max(settings.search_rescore_candidates, offset + fetch),
+    )
+    rows_query, count_query = _vector_search_statements(
+        documentation_id,
+        query_vector_expr,
+        fetch,
+        offset,
+        index_kind=index_kind,
+        rescore_candidates=settings.search_rescore_candidates,
+        after=after,
+        query=query,
+    )
+    rows = session.exec(rows_query).all()
+
+    results: list[SearchHit] = []
+    for section, distance, window in rows:
         similarity = max(0.0, 1.0 - float(distance))
-        results.append((section, similarity))
+        results.append(_search_hit(section, similarity, window, query))
+
+    results, page = _paginate(session, results, count_query, limit, offset, total_mode)
+    if results:
+        # The cursor keeps the raw distance: the reported similarity is clamped at 0.
+        _set_next_cursor(page, "vector", len(results), results[-1].section.path, float(rows[len(results) - 1][1]))
+    return results, page
 
-    return results, PaginationResult(total=total, limit=limit, offset=offset)
+
+def reciprocal_rank_fusion(rankings: list[list[SearchHit]], *, k: int = 60) -> list[SearchHit]:
+    """Fuse ranked hit lists with reciprocal rank fusion.
+
+    Each section scores ``sum(1 / (k + rank))`` over the lists it appears in
+    (1-based rank), so agreement between lists beats a high rank in one.
+    The first available excerpt is kept.
+    """
+    fused: dict[uuid.UUID, SearchHit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            entry = fused.get(hit.section.id)
+            if entry is None:
+                entry = fused[hit.section.id] = SearchHit(section=hit.section, score=0.0, excerpt=hit.excerpt)
+            elif entry.excerpt is None:
+                entry.excerpt = hit.excerpt
+            entry.score += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda hit: (-hit.score, hit.section.path))
+
+
+async def search_sections_hybrid(
+    session: Session,
+    documentation_id: uuid.UUID,
+    query: str,
+    limit: int,
+    offset: int,
+    *,
+    ef_search: int | None = None,
+    iterative_scan: HnswIterativeScan | None = None,
+    after: Cursor | None = None,
+) -> tuple[list[SearchHit], PaginationResult]:
+    """Keyword and semantic search fused with reciprocal rank fusion.
+
+    The keyword candidates are fetched on a worker thread (with their own
+    session) while the query is embedded and the vector candidates fetched,
+    so the lexical query adds no latency on top of the semantic one.  The
+    top ``SEARCH_HYBRID_CANDIDATES`` of each list are fused and paginated.
+    """
+    from app.services.embedding import embed_query
+
+    if after is not None:
+        # The fused list is rebuilt per request, so its cursor is just a position in it.
+        offset = after.expect("hybrid").position
+    depth = max(settings.search_hybrid_candidates, offset + limit)
+
+    def keyword_candidates() -> list[SearchHit]:
+        with Session(session.get_bind()) as keyword_session:
+            hits, _ = search_sections_keyword(keyword_session, documentation_id, query, depth, 0, "none")
+            return hits
+
+    async def semantic_candidates() -> list[SearchHit]:
+        query_vector = await embed_query(query)
+        hits, _ = _search_by_vector(
+            session,
+            documentation_id,
+            query_vector,
+            depth,
+            0,
+            ef_search=ef_search,
+            iterative_scan=iterative_scan,
+            total_mode="none",
+            query=query,
+        )
+        return hits
+
+    keyword_hits, semantic_hits = await asyncio.gather(
+        asyncio.to_thread(keyword_candidates),
+        semantic_candidates(),
+    )
+    fused = reciprocal_rank_fusion([semantic_hits, keyword_hits], k=settings.search_rrf_k)
+    hits = fused[offset : offset + limit]
+    page = PaginationResult(total=len(fused), limit=limit, offset=offset, has_more=offset + limit < len(fused))
+    if hits:
+        _set_next_cursor(page, "hybrid", len(hits), hits[-1].section.path)
+    return hits, page
 
 
 def delete_documentation(session: Session, documentation_id: uuid.UUID) -> bool:
@@ -268,23 +1006,35 @@ def delete_documentation(session: Session, documentation_id: uuid.UUID) -> bool:
     if doc is None:
         return False
 
+    session.exec(
+        delete(DocumentationSectionChunk).where(DocumentationSectionChunk.documentation_id == documentation_id)
+    )
     session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == documentation_id))
+    session.exec(delete(DocumentationTreeEntry).where(DocumentationTreeEntry.documentation_id == documentation_id))
+    session.exec(delete(DocumentationTree).where(DocumentationTree.documentation_id == documentation_id))
     session.exec(delete(IngestionJob).where(IngestionJob.documentation_id == documentation_id))
     session.exec(delete(RawPage).where(RawPage.documentation_id == documentation_id))
+    session.exec(delete(PageFingerprint).where(PageFingerprint.documentation_id == documentation_id))
     session.delete(doc)
     session.commit()
+    # Whatever the current scope: indexes built under SEARCH_VECTOR_INDEX_SCOPE=documentation outlive a switch back.
+    drop_documentation_vector_indexes(session, documentation_id)
     return True
 
 
-def build_search_items(rows: list[tuple[DocumentationSection, float]], query: str) -> list[dict]:
+def build_search_items(hits: list[SearchHit], query: str) -> list[dict]:
     return [
         {
-            "id": section.id,
-            "path": section.path,
-            "title": section.title,
-            "summary": section.summary,
-            "excerpt": _make_excerpt(section, query),
-            "score": score,
+            "id": hit.section.id,
+            "path": hit.section.path,
+            "title": hit.section.title,
+            "summary": hit.section.summary,
+            "excerpt": (
+                hit.excerpt
+                if hit.excerpt is not None
+                else _make_excerpt(query, hit.section.title, hit.section.summary, hit.section.content)
+            ),
+            "score": hit.score,
         }
-        for section, score in rows
+        for hit in hits
     ]
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
+import random
+import re
 import time
+from collections.abc import Callable, Sequence
 from typing import TYPE_CHECKING
 
+import numpy as np
 from pydantic_ai import Embedder
 
 from app.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.query_embedding_cache import get_query_embedding_cache
 
 if TYPE_CHECKING:
     import uuid
@@ -24,76 +32,231 @@ def _get_embedder() -> Embedder:
     return _embedder
 
 
+# Rough provider-agnostic ratio; also used to derive the per-text character cap.
+CHARS_PER_TOKEN = 1.5
+
+TokenEstimator = Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate (~1.5 chars per token) for batch planning."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def plan_batches(
+    texts: Sequence[str],
+    *,
+    max_tokens: int,
+    max_items: int,
+    estimate: TokenEstimator = estimate_tokens,
+) -> list[list[int]]:
+    """Greedily pack *texts*, in order, into batches of input indices.
+
+    A batch is closed when adding the next text would exceed *max_tokens*
+    estimated tokens or *max_items* texts.  A single text larger than the
+    budget still gets a batch of its own.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def split_chunks(text: str, *, chunk_tokens: int, overlap_tokens: int) -> list[tuple[int, int]]:
+    """Split *text* into overlapping ``(start, end)`` character spans.
+
+    Tokens are whitespace-separated words, as in ``ParsedSection.token_count``.
+    Each span holds at most *chunk_tokens* words and repeats the last
+    *overlap_tokens* words of the previous span.  Text that fits in one chunk
+    yields a single ``(0, len(text))`` span.
+    """
+    words = [match.span() for match in _WORD_PATTERN.finditer(text)]
+    if len(words) <= chunk_tokens:
+        return [(0, len(text))]
+
+    stride = max(1, chunk_tokens - max(0, overlap_tokens))
+    spans: list[tuple[int, int]] = []
+    for first in range(0, len(words), stride):
+        last = min(first + chunk_tokens, len(words)) - 1
+        spans.append((words[first][0], words[last][1]))
+        if last == len(words) - 1:
+            break
+    return spans
+
+
+# Substrings (lower-cased) identifying provider throttling in error class names / messages.
+_THROTTLING_MARKERS = ("throttl", "toomanyrequests", "too many requests", "rate limit", "ratelimit", "slowdown")
+
+
+def _is_throttling_error(exc: Exception) -> bool:
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    haystack = f"{type(exc).__name__} {exc}".lower()
+    return any(marker in haystack for marker in _THROTTLING_MARKERS)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given 1-based *attempt*."""
+    ceiling = min(
+        settings.embedding_backoff_max_seconds,
+        settings.embedding_backoff_base_seconds * (2 ** (attempt - 1)),
+    )
+    return random.uniform(0, ceiling)
+
+
+class _AdaptiveLimiter:
+    """Concurrency limiter whose limit shrinks on throttling and slowly recovers.
+
+    Multiplicative decrease (halve on every throttling response) and additive
+    increase (+1 after ``limit`` consecutive successes), capped at
+    ``max_limit``.
+    """
+
+    def __init__(self, max_limit: int) -> None:
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self.limit < self.max_limit and self._successes >= self.limit:
+            self.limit += 1
+            self._successes = 0
+
+    def on_throttle(self) -> None:
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+
+
 async def embed_sections(
     texts: list[str],
     *,
     doc_id: uuid.UUID | None = None,
     job_id: uuid.UUID | None = None,
-) -> list[list[float]]:
+    cache: EmbeddingCache | None = None,
+    estimate: TokenEstimator = estimate_tokens,
+) -> list[np.ndarray]:
     """Embed a list of texts in batches, with retry and dimension validation.
 
-    Returns vectors in the same order as the input texts.
+    Batches are packed by estimated token count (*estimate*) up to
+    ``EMBEDDING_MAX_BATCH_TOKENS`` and at most ``EMBEDDING_BATCH_SIZE`` texts.
+    Up to ``EMBEDDING_CONCURRENCY`` batches are in flight at once; failed
+    batches are retried with jittered exponential backoff, and throttling
+    responses halve the number of in-flight batches.  Identical texts are
+    embedded once.  When *cache* is given, texts it already holds are not
+    sent to the provider, and every successful batch is written back to it.
+
+    Returns float32 vectors in the same order as the input texts (identical
+    texts share one array).
     """
     embedder = _get_embedder()
-    batch_size = settings.embedding_batch_size
     max_retries = settings.embedding_max_retries
     expected_dim = settings.embedding_dimension
-
-    all_vectors: list[list[float]] = []
-    total_batches = (len(texts) + batch_size - 1) // batch_size
+    limiter = _AdaptiveLimiter(settings.embedding_concurrency)
 
     # Derive a conservative character limit from the user-configured token limit.
     # Approximation: ~1.5 chars per token, minus a 2000-char safety padding.
-    CHARS_PER_TOKEN = 1.5
     PADDING_CHARS = 2000
     max_chars = int(settings.embedding_token_limit * CHARS_PER_TOKEN) - PADDING_CHARS
 
-    for batch_idx in range(total_batches):
-        start = batch_idx * batch_size
-        end = start + batch_size
-        batch = texts[start:end]
+    # Truncate texts to avoid "Too many input tokens" error
+    truncated_texts = [text[:max_chars] for text in texts]
+    keys = [EmbeddingCache.key(text) for text in truncated_texts]
+    vectors_by_key: dict[str, np.ndarray] = cache.get_many(keys) if cache is not None else {}
+
+    # Unique texts still to embed, mapped to the first input index using them.
+    pending: dict[str, int] = {}
+    for index, key in enumerate(keys):
+        if key not in vectors_by_key and key not in pending:
+            pending[key] = index
+    pending_keys = list(pending)
 
-        # Truncate texts to avoid "Too many input tokens" error
-        truncated_batch = [text[:max_chars] for text in batch]
+    batches = plan_batches(
+        [truncated_texts[pending[key]] for key in pending_keys],
+        max_tokens=settings.embedding_max_batch_tokens,
+        max_items=settings.embedding_batch_size,
+        estimate=estimate,
+    )
+    total_batches = len(batches)
+    log_extra = {
+        "doc_id": str(doc_id) if doc_id else None,
+        "job_id": str(job_id) if job_id else None,
+    }
+
+    async def embed_batch(batch_idx: int) -> None:
+        batch_keys = [pending_keys[position] for position in batches[batch_idx]]
+        batch = [truncated_texts[pending[key]] for key in batch_keys]
 
         last_error: Exception | None = None
         for attempt in range(1, max_retries + 1):
             try:
-                t0 = time.monotonic()
-                result = await embedder.embed_documents(truncated_batch)
-                duration = time.monotonic() - t0
+                async with limiter:
+                    t0 = time.monotonic()
+                    result = await embedder.embed_documents(batch)
+                    duration = time.monotonic() - t0
 
                 logger.info(
                     "Embedding batch %d/%d completed",
                     batch_idx + 1,
                     total_batches,
                     extra={
-                        "doc_id": str(doc_id) if doc_id else None,
-                        "job_id": str(job_id) if job_id else None,
+                        **log_extra,
                         "batch_size": len(batch),
+                        "batch_tokens": sum(estimate(text) for text in batch),
                         "duration_s": round(duration, 3),
+                        "concurrency": limiter.limit,
                     },
                 )
 
-                vectors = [list(v) for v in result.embeddings]
+                # Compact float32 arrays (4 bytes/element) instead of lists of boxed floats.
+                vectors = [np.asarray(v, dtype=np.float32) for v in result.embeddings]
 
                 # Dimension validation
-                for i, vec in enumerate(vectors):
-                    if len(vec) != expected_dim:
+                for key, vec in zip(batch_keys, vectors):
+                    if vec.shape != (expected_dim,):
                         raise ValueError(
-                            f"Dimension mismatch at index {start + i}: "
-                            f"got {len(vec)}, expected {expected_dim}"
+                            f"Dimension mismatch at index {pending[key]}: "
+                            f"got {vec.size}, expected {expected_dim}"
                         )
 
-                all_vectors.extend(vectors)
-                last_error = None
-                break
+                limiter.on_success()
+                batch_vectors = dict(zip(batch_keys, vectors))
+                vectors_by_key.update(batch_vectors)
+                if cache is not None:
+                    cache.put_many(batch_vectors)
+                return
 
             except ValueError:
                 raise  # Dimension mismatch is terminal
 
             except Exception as exc:
                 last_error = exc
+                if _is_throttling_error(exc):
+                    limiter.on_throttle()
                 logger.error(
                     "Embedding batch %d/%d attempt %d/%d failed: %s",
                     batch_idx + 1,
@@ -101,26 +264,45 @@ async def embed_sections(
                     attempt,
                     max_retries,
                     exc,
-                    extra={
-                        "doc_id": str(doc_id) if doc_id else None,
-                        "job_id": str(job_id) if job_id else None,
-                    },
+                    extra={**log_extra, "concurrency": limiter.limit},
                     exc_info=True,
                 )
+                if attempt < max_retries:
+                    await asyncio.sleep(_backoff_delay(attempt))
+
+        raise RuntimeError(
+            f"Embedding batch {batch_idx + 1}/{total_batches} failed after "
+            f"{max_retries} retries: {last_error}"
+        ) from last_error
 
-        if last_error is not None:
-            raise RuntimeError(
-                f"Embedding batch {batch_idx + 1}/{total_batches} failed after "
-                f"{max_retries} retries: {last_error}"
-            ) from last_error
+    tasks = [asyncio.ensure_future(embed_batch(batch_idx)) for batch_idx in range(total_batches)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
-    return all_vectors
+    return [vectors_by_key[key] for key in keys]
 
 
 async def embed_query(text: str) -> list[float]:
-    """Embed a single query string for search-time use."""
+    """Embed a single query string for search-time use.
+
+    Repeated queries are served from the query embedding cache without a
+    provider round trip.
+    """
+    cache = get_query_embedding_cache()
+    key = cache.key(settings.embedding_model, text)
+    cached = cache.get(key)
+    if cached is not None and len(cached) == settings.embedding_dimension:
+        return cached.tolist()
+
     embedder = _get_embedder()
+    t0 = time.monotonic()
     result = await embedder.embed_query(text)
+    provider_seconds = time.monotonic() - t0
     vector = list(result.embeddings[0])
 
     if len(vector) != settings.embedding_dimension:
@@ -129,4 +311,5 @@ async def embed_query(text: str) -> list[float]:
             f"expected {settings.embedding_dimension}"
         )
 
+    cache.put(key, vector, provider_seconds=provider_seconds)
     return vector
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import delete, text, tuple_, update
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.db import copy_rows, dialect_insert, supports_binary_copy
+from app.models import EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Keep IN-lists well below driver/parameter limits.
+_LOOKUP_CHUNK = 1000
+
+
+def _chunks(items: list[str], size: int) -> Iterable[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class EmbeddingCache:
+    """Persistent, content-addressed cache of document embeddings.
+
+    Entries are keyed by ``(embedding_model, dimension, sha256(text))`` where
+    *text* is exactly what is sent to the provider, so a hit is
+    interchangeable with a fresh embedding regardless of which documentation
+    set produced it.  ``hits`` / ``misses`` count unique keys looked up.
+    Writes are only flushed: the caller that owns *session* commits them
+    together with the rest of its transaction.
+    """
+
+    def __init__(self, session: Session, *, model: str | None = None, dimension: int | None = None) -> None:
+        self._session = session
+        self.model = model or settings.embedding_model
+        self.dimension = dimension or settings.embedding_dimension
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, np.ndarray]:
+        """Return cached float32 vectors for *keys* and refresh their LRU timestamp."""
+        unique_keys = list(dict.fromkeys(keys))
+        found: dict[str, np.ndarray] = {}
+
+        for chunk in _chunks(unique_keys, _LOOKUP_CHUNK):
+            rows = self._session.exec(
+                select(EmbeddingCacheEntry.text_sha256, EmbeddingCacheEntry.embedding).where(
+                    EmbeddingCacheEntry.embedding_model == self.model,
+                    EmbeddingCacheEntry.dimension == self.dimension,
+                    EmbeddingCacheEntry.text_sha256.in_(chunk),
+                )
+            ).all()
+            for text_sha256, embedding in rows:
+                found[text_sha256] = np.asarray(embedding, dtype=np.float32)
+
+        hit_keys = list(found)
+        for chunk in _chunks(hit_keys, _LOOKUP_CHUNK):
+            self._session.exec(
+                update(EmbeddingCacheEntry)
+                .where(
+                    EmbeddingCacheEntry.embedding_model == self.model,
+                    EmbeddingCacheEntry.dimension == self.dimension,
+                    EmbeddingCacheEntry.text_sha256.in_(chunk),
+                )
+                .values(last_used_at=datetime.now(timezone.utc))
+            )
+
+        self.hits += len(found)
+        self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, entries: dict[str, Sequence[float]]) -> None:
+        """Stage freshly embedded vectors in the session; existing keys are left untouched."""
+        if not entries:
+            return
+
+        if supports_binary_copy(self._session):
+            self._put_many_copy(entries)
+        else:
+            insert = dialect_insert(self._session)
+            statement = insert(EmbeddingCacheEntry.__table__).values(
+                [
+                    {
+                        "embedding_model": self.model,
+                        "dimension": self.dimension,
+                        "text_sha256": key,
+                        "embedding": np.asarray(vector, dtype=np.float32).tolist(),
+                    }
+                    for key, vector in entries.items()
+                ]
+            )
+            if hasattr(statement, "on_conflict_do_nothing"):
+                statement = statement.on_conflict_do_nothing()
+            self._session.exec(statement)
+        self._session.flush()
+
+    def _put_many_copy(self, entries: dict[str, Sequence[float]]) -> None:
+        # Binary COPY into a stage table, then a conflict-tolerant INSERT ... SELECT.
+        self._session.execute(
+            text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS embedding_cache_stage "
+                "(text_sha256 varchar(64) NOT NULL, embedding vector NOT NULL) ON COMMIT DROP"
+            )
+        )
+        # The stage outlives this call until the caller commits; start every batch empty.
+        self._session.execute(text("TRUNCATE embedding_cache_stage"))
+        copy_rows(
+            self._session,
+            "embedding_cache_stage",
+            ("text_sha256", "embedding"),
+            ("varchar", "vector"),
+            ((key, np.asarray(vector, dtype=np.float32)) for key, vector in entries.items()),
+        )
+        self._session.execute(
+            text(
+                "INSERT INTO embedding_cache (embedding_model, dimension, text_sha256, embedding) "
+                "SELECT :model, :dimension, text_sha256, embedding FROM embedding_cache_stage "
+                "ON CONFLICT DO NOTHING"
+            ),
+            {"model": self.model, "dimension": self.dimension},
+        )
+
+
+def evict_embedding_cache(
+    session: Session,
+    *,
+    ttl_days: int | None = None,
+    max_entries: int | None = None,
+) -> int:
+    """Drop entries unused for *ttl_days* and trim to the *max_entries* most recently used.
+
+    Returns the number of evicted entries.  The deletes are flushed, not
+    committed; the caller commits them.
+    """
+    ttl_days = settings.embedding_cache_ttl_days if ttl_days is None else ttl_days
+    max_entries = settings.embedding_cache_max_entries if max_entries is None else max_entries
+    evicted = 0
+
+    if ttl_days > 0:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
+        result = session.exec(delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.last_used_at < cutoff))
+        evicted += result.rowcount or 0
+
+    if max_entries > 0:
+        key_columns = (
+            EmbeddingCacheEntry.embedding_model,
+            EmbeddingCacheEntry.dimension,
+            EmbeddingCacheEntry.text_sha256,
+        )
+        overflow = (
+            select(*key_columns)
+            .order_by(EmbeddingCacheEntry.last_used_at.desc())
+            .offset(max_entries)
+        )
+        result = session.exec(delete(EmbeddingCacheEntry).where(tuple_(*key_columns).in_(overflow)))
+        evicted += result.rowcount or 0
+
+    session.flush()
+    if evicted:
+        logger.info("Evicted %d embedding cache entries", evicted)
+    return evicted
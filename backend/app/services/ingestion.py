@@ -1,17 +1,60 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 
+import numpy as np
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    Uuid,
+    bindparam,
+    exists,
+    func,
+    literal,
+    or_,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session, delete, select
 
 from app.celery_app import celery_app
 from app.config import settings
-from app.models import Documentation, DocumentationSection, IngestionJob, IngestionStatus, RawPage
-from app.services.crawler import crawl_site
-from app.services.parser import ParsedSection, parse_sections
+from app.db import copy_rows, dialect_insert, supports_binary_copy
+from app.models import (
+    Documentation,
+    DocumentationSection,
+    DocumentationSectionChunk,
+    IngestionJob,
+    IngestionStatus,
+    PageFingerprint,
+    RawPage,
+)
+from app.services.crawler import (
+    CrawledPage,
+    PageValidator,
+    crawl_site,
+    crawl_site_stream,
+    crawl_sitemap_stream,
+    recrawl_site,
+    recrawl_site_stream,
+)
+from app.services.documentation import has_chunk_embeddings, refresh_documentation_tree
+from app.services.embedding_cache import EmbeddingCache, evict_embedding_cache
+from app.services.parser import PARSER_VERSION, ParsedSection, parse_sections_async
+from app.services.search_cache import invalidate_search_cache
+from app.services.vector_index import ensure_vector_index
 
 
 def _utcnow() -> datetime:
@@ -148,12 +191,24 @@ def _stop_if_requested(session: Session, job: IngestionJob) -> bool:
     return False
 
 
-def _persist_raw_pages(session: Session, documentation_id: uuid.UUID, pages: list) -> None:
+# URLs per IN (...) list when rewriting raw pages and page fingerprints.
+_URL_BATCH = 500
+
+
+def _persist_raw_pages(session: Session, documentation_id: uuid.UUID, pages: list[CrawledPage]) -> None:
+    """Replace the stored raw copies of *pages*; ``not_modified`` pages keep their previous copy."""
     if not settings.store_raw_pages:
         return
 
-    session.exec(delete(RawPage).where(RawPage.documentation_id == documentation_id))
-    for page in pages:
+    fetched = [page for page in pages if not page.not_modified]
+    urls = [page.url for page in fetched]
+    for start in range(0, len(urls), _URL_BATCH):
+        session.exec(
+            delete(RawPage).where(
+                RawPage.documentation_id == documentation_id, RawPage.url.in_(urls[start : start + _URL_BATCH])
+            )
+        )
+    for page in fetched:
         session.add(
             RawPage(
                 documentation_id=documentation_id,
@@ -164,15 +219,185 @@ def _persist_raw_pages(session: Session, documentation_id: uuid.UUID, pages: lis
         )
     session.commit()
 
+
+def _prune_raw_pages(session: Session, documentation_id: uuid.UUID, seen_urls: set[str]) -> None:
+    """Delete raw pages of *documentation_id* whose URL was not crawled this run."""
+    if not settings.store_raw_pages:
+        return
+
+    stale_ids = [
+        raw_page_id
+        for raw_page_id, url in session.exec(
+            select(RawPage.id, RawPage.url).where(RawPage.documentation_id == documentation_id)
+        ).all()
+        if url not in seen_urls
+    ]
+    for start in range(0, len(stale_ids), _URL_BATCH):
+        session.exec(delete(RawPage).where(RawPage.id.in_(stale_ids[start : start + _URL_BATCH])))
+    session.commit()
+
+
 logger = logging.getLogger(__name__)
 
 
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE ... RETURNING.
+_BULK_DELTA_DIALECTS = frozenset({"postgresql", "sqlite"})
+
+# Per-transaction staging table for the set-based delta writer.
+_SECTION_STAGE = Table(
+    "documentation_section_stage",
+    MetaData(),
+    Column("id", Uuid, nullable=False),
+    Column("path", Text, nullable=False, primary_key=True),
+    Column("parent_path", Text, nullable=True),
+    Column("title", Text, nullable=True),
+    Column("summary", Text, nullable=True),
+    Column("content", Text, nullable=True),
+    Column("level", Integer, nullable=True),
+    Column("url", Text, nullable=True),
+    Column("token_count", Integer, nullable=True),
+    Column("checksum", String(length=64), nullable=True),
+    prefixes=["TEMPORARY"],
+)
+
+
 def _apply_sections_delta(
-    session: Session, documentation_id: uuid.UUID, parsed_sections: list[ParsedSection]
+    session: Session,
+    documentation_id: uuid.UUID,
+    parsed_sections: list[ParsedSection],
+    *,
+    prune: bool = True,
 ) -> list[uuid.UUID]:
-    existing_sections = session.exec(
-        select(DocumentationSection).where(DocumentationSection.documentation_id == documentation_id)
-    ).all()
+    """Upsert *parsed_sections* by checksum and return the ids that changed.
+
+    With ``prune=False`` nothing is deleted — the streaming pipeline applies
+    one page at a time and removes stale sections once at the end via
+    :func:`_prune_stale_sections`.
+    """
+    if session.get_bind().dialect.name in _BULK_DELTA_DIALECTS:
+        return _apply_sections_delta_bulk(session, documentation_id, parsed_sections, prune=prune)
+    return _apply_sections_delta_orm(session, documentation_id, parsed_sections, prune=prune)
+
+
+def _apply_sections_delta_bulk(
+    session: Session,
+    documentation_id: uuid.UUID,
+    parsed_sections: list[ParsedSection],
+    *,
+    prune: bool = True,
+) -> list[uuid.UUID]:
+    """Set-based delta writer: a constant number of statements per call.
+
+    Sections are staged into a temporary table, upserted on
+    ``uq_documentation_section_doc_path`` (rows whose checksum is unchanged
+    are left untouched and not returned), stale paths are deleted in one
+    statement and ``parent_id`` is fixed up with a single ``UPDATE ... FROM``.
+    """
+    table = DocumentationSection.__table__
+    stage = _SECTION_STAGE
+
+    # Later duplicates of a path win, matching the ORM writer.
+    staged: dict[str, dict] = {}
+    for parsed in parsed_sections:
+        staged[parsed.path] = {
+            "id": uuid.uuid4(),
+            "path": parsed.path,
+            "parent_path": parsed.parent_path,
+            "title": parsed.title,
+            "summary": parsed.summary,
+            "content": parsed.content,
+            "level": parsed.level,
+            "url": parsed.url,
+            "token_count": parsed.token_count,
+            "checksum": parsed.checksum,
+        }
+
+    connection = session.connection()
+    stage.drop(connection, checkfirst=True)
+    stage.create(connection)
+    if staged:
+        session.execute(stage.insert(), list(staged.values()))
+
+    insert = dialect_insert(session)
+    upsert = insert(table).from_select(
+        ["id", "documentation_id", "path", "title", "summary", "content", "level", "url", "token_count", "checksum"],
+        select(
+            stage.c.id,
+            literal(documentation_id, Uuid),
+            stage.c.path,
+            stage.c.title,
+            stage.c.summary,
+            stage.c.content,
+            stage.c.level,
+            stage.c.url,
+            stage.c.token_count,
+            stage.c.checksum,
+        ).where(true()),  # SQLite needs a WHERE to parse INSERT ... SELECT ... ON CONFLICT
+    )
+    conflict_target = (
+        {"constraint": "uq_documentation_section_doc_path"}
+        if session.get_bind().dialect.name == "postgresql"
+        else {"index_elements": ["documentation_id", "path"]}
+    )
+    upsert = upsert.on_conflict_do_update(
+        **conflict_target,
+        set_={
+            "title": upsert.excluded.title,
+            "summary": upsert.excluded.summary,
+            "content": upsert.excluded.content,
+            "level": upsert.excluded.level,
+            "url": upsert.excluded.url,
+            "token_count": upsert.excluded.token_count,
+            "checksum": upsert.excluded.checksum,
+            "updated_at": func.now(),
+        },
+        where=table.c.checksum.is_distinct_from(upsert.excluded.checksum),
+    ).returning(table.c.id)
+    changed_ids = list(session.execute(upsert).scalars().all()) if staged else []
+
+    if prune:
+        session.execute(
+            delete(table).where(
+                table.c.documentation_id == documentation_id,
+                ~exists().where(stage.c.path == table.c.path),
+            )
+        )
+
+    parent = table.alias("parent")
+    parent_id = (
+        select(parent.c.id)
+        .where(parent.c.documentation_id == documentation_id, parent.c.path == stage.c.parent_path)
+        .scalar_subquery()
+    )
+    session.execute(
+        update(table)
+        .where(
+            table.c.documentation_id == documentation_id,
+            table.c.path == stage.c.path,
+            table.c.parent_id.is_distinct_from(parent_id),
+        )
+        .values(parent_id=parent_id)
+    )
+
+    stage.drop(connection)
+    session.commit()
+    return changed_ids
+
+
+def _apply_sections_delta_orm(
+    session: Session,
+    documentation_id: uuid.UUID,
+    parsed_sections: list[ParsedSection],
+    *,
+    prune: bool = True,
+) -> list[uuid.UUID]:
+    """Row-by-row ORM delta writer, used for dialects without ON CONFLICT."""
+    existing_query = select(DocumentationSection).where(DocumentationSection.documentation_id == documentation_id)
+    if not prune:
+        existing_query = existing_query.where(
+            DocumentationSection.path.in_({section.path for section in parsed_sections})
+        )
+    existing_sections = session.exec(existing_query).all()
     existing_by_path = {section.path: section for section in existing_sections}
 
     incoming_paths = {section.path for section in parsed_sections}
@@ -213,9 +438,10 @@ def _apply_sections_delta(
         if existing.id not in changed_ids:
             changed_ids.append(existing.id)
 
-    stale_sections = [section for section in existing_sections if section.path not in incoming_paths]
-    for stale in stale_sections:
-        session.delete(stale)
+    if prune:
+        stale_sections = [section for section in existing_sections if section.path not in incoming_paths]
+        for stale in stale_sections:
+            session.delete(stale)
 
     session.flush()
 
@@ -233,75 +459,617 @@ def _apply_sections_delta(
     return changed_ids
 
 
-async def run_ingestion_pipeline(session: Session, job_id: uuid.UUID) -> None:
-    job = session.get(IngestionJob, job_id)
-    if job is None:
-        return
+def _prune_stale_sections(session: Session, documentation_id: uuid.UUID, keep_paths: set[str]) -> int:
+    """Delete sections of *documentation_id* whose path is not in *keep_paths*."""
+    stale_ids = [
+        section_id
+        for section_id, path in session.exec(
+            select(DocumentationSection.id, DocumentationSection.path).where(
+                DocumentationSection.documentation_id == documentation_id
+            )
+        ).all()
+        if path not in keep_paths
+    ]
+    if stale_ids:
+        session.exec(delete(DocumentationSection).where(DocumentationSection.id.in_(stale_ids)))
+    session.commit()
+    return len(stale_ids)
 
-    documentation = session.get(Documentation, job.documentation_id)
-    if documentation is None:
-        _set_job_state(session, job, IngestionStatus.FAILED, error_message="Missing documentation row")
+
+def _page_sha256(page: CrawledPage) -> str:
+    return hashlib.sha256(page.markdown.encode("utf-8")).hexdigest()
+
+
+def _load_page_fingerprints(
+    session: Session, documentation_id: uuid.UUID
+) -> dict[str, tuple[str, int, list[str]]]:
+    """Map each fingerprinted URL to ``(content_sha256, parser_version, section_paths)``."""
+    rows = session.exec(
+        select(
+            PageFingerprint.url,
+            PageFingerprint.content_sha256,
+            PageFingerprint.parser_version,
+            PageFingerprint.section_paths,
+        ).where(PageFingerprint.documentation_id == documentation_id)
+    ).all()
+    return {url: (sha256, parser_version, section_paths) for url, sha256, parser_version, section_paths in rows}
+
+
+def _unchanged_section_paths(
+    fingerprints: dict[str, tuple[str, int, list[str]]], page: CrawledPage
+) -> list[str] | None:
+    """Return the stored section paths of *page* if it is unchanged since it was parsed, else ``None``.
+
+    ``not_modified`` pages (a re-crawl got ``304`` back) carry no markdown and
+    are unchanged by definition.
+    """
+    fingerprint = fingerprints.get(page.url)
+    if fingerprint is None:
+        return None
+    sha256, parser_version, section_paths = fingerprint
+    if parser_version != PARSER_VERSION or not (page.not_modified or sha256 == _page_sha256(page)):
+        return None
+    return section_paths
+
+
+def _load_page_validators(session: Session, documentation_id: uuid.UUID) -> dict[str, PageValidator]:
+    """Return the stored cache validators of pages a conditional re-crawl may skip.
+
+    Pages parsed by another parser version are left out: they have to be
+    fetched again to be re-parsed.
+    """
+    rows = session.exec(
+        select(PageFingerprint.url, PageFingerprint.etag, PageFingerprint.last_modified, PageFingerprint.links).where(
+            PageFingerprint.documentation_id == documentation_id,
+            PageFingerprint.parser_version == PARSER_VERSION,
+            or_(PageFingerprint.etag.is_not(None), PageFingerprint.last_modified.is_not(None)),
+        )
+    ).all()
+    return {
+        url: PageValidator(etag=etag, last_modified=last_modified, links=links)
+        for url, etag, last_modified, links in rows
+    }
+
+
+def _stage_page_fingerprints(
+    session: Session,
+    documentation_id: uuid.UUID,
+    pages: list[CrawledPage],
+    parsed_sections: list[ParsedSection],
+) -> None:
+    """Replace the fingerprints of *pages* with the sections they parsed into.
+
+    Nothing is committed: the caller applies the pages' section delta next,
+    which commits fingerprints and sections in one transaction, so a stored
+    fingerprint never describes content the section table does not hold.
+    """
+    pages_by_url = {page.url: page for page in pages}
+    if not pages_by_url:
         return
+    paths_by_url: dict[str, list[str]] = {url: [] for url in pages_by_url}
+    for section in parsed_sections:
+        paths_by_url.setdefault(section.url, []).append(section.path)
+
+    urls = list(pages_by_url)
+    for start in range(0, len(urls), _URL_BATCH):
+        session.exec(
+            delete(PageFingerprint).where(
+                PageFingerprint.documentation_id == documentation_id,
+                PageFingerprint.url.in_(urls[start : start + _URL_BATCH]),
+            )
+        )
+    now = _utcnow()
+    session.execute(
+        PageFingerprint.__table__.insert(),
+        [
+            {
+                "documentation_id": documentation_id,
+                "url": url,
+                "content_sha256": _page_sha256(page),
+                "parser_version": PARSER_VERSION,
+                "section_paths": paths_by_url[url],
+                "etag": page.etag,
+                "last_modified": page.last_modified,
+                "links": page.links,
+                "last_seen_at": now,
+            }
+            for url, page in pages_by_url.items()
+        ],
+    )
 
-    try:
-        if _stop_if_requested(session, job):
-            return
 
-        _set_job_state(session, job, IngestionStatus.CRAWLING, progress_percent=10)
-        pages = await crawl_site(
-            start_url=documentation.url,
-            max_depth=documentation.crawl_depth,
-            include_patterns=documentation.include_patterns,
-            exclude_patterns=documentation.exclude_patterns,
+def _finish_page_fingerprints(
+    session: Session,
+    documentation_id: uuid.UUID,
+    fingerprints: dict[str, tuple[str, int, list[str]]],
+    seen_urls: set[str],
+    unchanged_urls: list[str],
+) -> None:
+    """Stamp ``last_seen_at`` on unchanged pages and drop fingerprints of pages no longer crawled."""
+    gone = [url for url in fingerprints if url not in seen_urls]
+    for start in range(0, len(gone), _URL_BATCH):
+        session.exec(
+            delete(PageFingerprint).where(
+                PageFingerprint.documentation_id == documentation_id,
+                PageFingerprint.url.in_(gone[start : start + _URL_BATCH]),
+            )
+        )
+    now = _utcnow()
+    for start in range(0, len(unchanged_urls), _URL_BATCH):
+        session.exec(
+            update(PageFingerprint)
+            .where(
+                PageFingerprint.documentation_id == documentation_id,
+                PageFingerprint.url.in_(unchanged_urls[start : start + _URL_BATCH]),
+            )
+            .values(last_seen_at=now)
         )
-        _set_job_state(session, job, IngestionStatus.CRAWLING, progress_percent=40, pages_processed=len(pages))
-        _persist_raw_pages(session, documentation.id, pages)
+    session.commit()
 
-        if _stop_if_requested(session, job):
-            return
 
-        _set_job_state(session, job, IngestionStatus.PARSING, progress_percent=55, pages_processed=len(pages))
-        parsed_sections = parse_sections(pages)
-        changed_ids = _apply_sections_delta(session, documentation.id, parsed_sections)
+# Rows per multi-VALUES chunk insert; keeps bind parameters under driver limits.
+_CHUNK_INSERT_ROWS = 500
 
-        if _stop_if_requested(session, job):
-            return
+_CHUNK_COLUMNS = ("id", "section_id", "documentation_id", "chunk_index", "start_offset", "end_offset", "embedding")
 
-        # ── EMBEDDING ───────────────────────────────────────────────
-        _set_job_state(session, job, IngestionStatus.EMBEDDING, progress_percent=60)
 
-        if changed_ids:
-            from app.services.embedding import embed_sections
+def _copy_section_vectors(
+    session: Session,
+    section_vectors: list[tuple[DocumentationSection, np.ndarray]],
+    chunk_rows: list[tuple],
+) -> None:
+    """Write float32 vectors with binary ``COPY`` (PostgreSQL + psycopg).
 
-            changed_sections = session.exec(
-                select(DocumentationSection).where(DocumentationSection.id.in_(changed_ids))
-            ).all()
+    Section vectors go through a temporary stage table and one ``UPDATE ...
+    FROM``; chunk rows are copied straight into their table.
+    """
+    if section_vectors:
+        session.execute(
+            text(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS section_embedding_stage "
+                "(id uuid PRIMARY KEY, embedding vector NOT NULL) ON COMMIT DROP"
+            )
+        )
+        copy_rows(
+            session,
+            "section_embedding_stage",
+            ("id", "embedding"),
+            ("uuid", "vector"),
+            ((section_model.id, vector) for section_model, vector in section_vectors),
+        )
+        session.execute(
+            text(
+                "UPDATE documentation_section AS s "
+                "SET embedding = stage.embedding, updated_at = now() "
+                "FROM section_embedding_stage AS stage WHERE s.id = stage.id"
+            )
+        )
+    if chunk_rows:
+        copy_rows(
+            session,
+            DocumentationSectionChunk.__tablename__,
+            _CHUNK_COLUMNS,
+            ("uuid", "uuid", "uuid", "int4", "int4", "int4", "vector"),
+            chunk_rows,
+        )
 
-            texts = [
-                f"{s.title or ''}\n{s.summary or ''}\n{s.content or ''}"
-                for s in changed_sections
-            ]
 
-            vectors = await embed_sections(
-                texts, doc_id=documentation.id, job_id=job.id
+def _write_section_vectors(
+    session: Session,
+    section_vectors: list[tuple[DocumentationSection, np.ndarray]],
+    chunk_rows: list[tuple],
+) -> None:
+    """Portable fallback for :func:`_copy_section_vectors` (vectors stored as JSON lists)."""
+    section_table = DocumentationSection.__table__
+    if section_vectors:
+        session.connection().execute(
+            update(section_table)
+            .where(section_table.c.id == bindparam("section_id"))
+            .values(embedding=bindparam("vector")),
+            [
+                {"section_id": section_model.id, "vector": vector.tolist()}
+                for section_model, vector in section_vectors
+            ],
+        )
+    insert = dialect_insert(session)
+    for start in range(0, len(chunk_rows), _CHUNK_INSERT_ROWS):
+        session.exec(
+            insert(DocumentationSectionChunk.__table__).values(
+                [
+                    dict(zip(_CHUNK_COLUMNS, (*row[:-1], row[-1].tolist())))
+                    for row in chunk_rows[start : start + _CHUNK_INSERT_ROWS]
+                ]
             )
+        )
 
-            for section_model, vector in zip(changed_sections, vectors):
-                section_model.embedding = vector
-                session.add(section_model)
-            session.commit()
 
-            logger.info(
-                "Embedded %d changed sections for doc %s",
-                len(changed_ids),
-                documentation.id,
+async def _embed_changed_sections(
+    session: Session, documentation: Documentation, job: IngestionJob, section_ids: list[uuid.UUID]
+) -> list[DocumentationSection]:
+    """Embed *section_ids* and store the vectors.
+
+    With ``EMBEDDING_CHUNKING_ENABLED`` each section's content is split into
+    overlapping spans, every span is embedded and stored as a
+    :class:`DocumentationSectionChunk`, and the section keeps the vector of
+    its first span.  Otherwise the whole (truncated) section is embedded.
+    """
+    from app.services.embedding import embed_sections, split_chunks
+
+    changed_sections = session.exec(
+        select(DocumentationSection).where(DocumentationSection.id.in_(section_ids))
+    ).all()
+
+    chunking = settings.embedding_chunking_enabled
+    texts: list[str] = []
+    spans: list[tuple[DocumentationSection, int, int]] = []
+    for s in changed_sections:
+        content = s.content or ""
+        section_spans = (
+            split_chunks(
+                content,
+                chunk_tokens=settings.embedding_chunk_tokens,
+                overlap_tokens=settings.embedding_chunk_overlap_tokens,
+            )
+            if chunking
+            else [(0, len(content))]
+        )
+        for start, end in section_spans:
+            texts.append(f"{s.title or ''}\n{s.summary or ''}\n{content[start:end]}")
+            spans.append((s, start, end))
+
+    cache = EmbeddingCache(session) if settings.embedding_cache_enabled else None
+    vectors = await embed_sections(
+        texts, doc_id=documentation.id, job_id=job.id, cache=cache
+    )
+
+    # Chunks of changed sections are always rewritten (or dropped when chunking is off).
+    if changed_sections:
+        session.exec(
+            delete(DocumentationSectionChunk).where(
+                DocumentationSectionChunk.section_id.in_([s.id for s in changed_sections])
+            )
+        )
+
+    section_vectors: list[tuple[DocumentationSection, np.ndarray]] = []
+    chunk_rows: list[tuple] = []
+    chunk_counts: dict[uuid.UUID, int] = {}
+    for (section_model, start, end), vector in zip(spans, vectors):
+        vector = np.asarray(vector, dtype=np.float32)
+        chunk_index = chunk_counts.get(section_model.id, 0)
+        chunk_counts[section_model.id] = chunk_index + 1
+        if chunk_index == 0:
+            section_vectors.append((section_model, vector))
+        if chunking:
+            chunk_rows.append(
+                (uuid.uuid4(), section_model.id, documentation.id, chunk_index, start, end, vector)
             )
+
+    if supports_binary_copy(session):
+        _copy_section_vectors(session, section_vectors, chunk_rows)
+    else:
+        _write_section_vectors(session, section_vectors, chunk_rows)
+    for section_model, vector in section_vectors:
+        set_committed_value(section_model, "embedding", vector)
+
+    if cache is not None:
+        job.embedding_cache_hits += cache.hits
+        job.embedding_cache_misses += cache.misses
+        session.add(job)
+        logger.info(
+            "Embedding cache for doc %s: %d hits, %d misses",
+            documentation.id,
+            cache.hits,
+            cache.misses,
+        )
+    session.commit()
+    invalidate_search_cache(documentation.id)
+    return changed_sections
+
+
+def _chunking_signature() -> str:
+    """How sections are embedded, as recorded on the documentation: ``off`` or ``<chunk tokens>/<overlap>``."""
+    if not settings.embedding_chunking_enabled:
+        return "off"
+    return f"{settings.embedding_chunk_tokens}/{settings.embedding_chunk_overlap_tokens}"
+
+
+def _chunking_changed(session: Session, documentation: Documentation) -> bool:
+    """Whether the set's sections were embedded under other chunking settings than the current ones."""
+    if documentation.embedding_chunking is None:
+        # Recorded since chunking became switchable; before that, only chunk rows tell (not their sizes).
+        return settings.embedding_chunking_enabled or has_chunk_embeddings(session, documentation.id)
+    return documentation.embedding_chunking != _chunking_signature()
+
+
+async def _reembed_remaining_sections(
+    session: Session, documentation: Documentation, job: IngestionJob, embedded_ids: set[uuid.UUID]
+) -> list[DocumentationSection]:
+    """Embed every section of *documentation* not in *embedded_ids* under the current chunking settings.
+
+    Semantic search reads either chunks or section vectors for a whole set,
+    so after a chunking change the sections this run did not touch are
+    re-embedded too (which also drops their chunks when chunking is off).
+    """
+    section_ids = [
+        section_id
+        for section_id in session.exec(
+            select(DocumentationSection.id).where(DocumentationSection.documentation_id == documentation.id)
+        ).all()
+        if section_id not in embedded_ids
+    ]
+    if not section_ids:
+        return []
+    logger.info(
+        "Chunking settings changed for doc %s; re-embedding %d unchanged sections",
+        documentation.id,
+        len(section_ids),
+    )
+    return await _embed_changed_sections(session, documentation, job, section_ids)
+
+
+def _crawl_arguments(session: Session, documentation: Documentation) -> tuple[dict, dict[str, PageValidator]]:
+    """Return the crawl keyword arguments and, with ``CRAWL_REVALIDATE``, the stored page validators."""
+    arguments = {
+        "start_url": documentation.url,
+        "max_depth": documentation.crawl_depth,
+        "include_patterns": documentation.include_patterns,
+        "exclude_patterns": documentation.exclude_patterns,
+    }
+    validators = _load_page_validators(session, documentation.id) if settings.crawl_revalidate else {}
+    return arguments, validators
+
+
+def _sitemap_pages(
+    documentation: Documentation,
+    validators: dict[str, PageValidator],
+    fingerprints: dict[str, tuple[str, int, list[str]]],
+) -> AsyncIterator[CrawledPage]:
+    """Crawl the pages listed in the site's sitemaps; unchanged fingerprinted pages are not fetched."""
+    return crawl_sitemap_stream(
+        start_url=documentation.url,
+        include_patterns=documentation.include_patterns,
+        exclude_patterns=documentation.exclude_patterns,
+        known_urls=[url for url, (_, parser_version, _) in fingerprints.items() if parser_version == PARSER_VERSION],
+        last_synced=documentation.last_synced,
+        validators=validators,
+        concurrency=settings.crawl_revalidate_concurrency,
+    )
+
+
+class _IngestionStopped(Exception):
+    """Raised inside a streaming stage once the job's stop flag is observed."""
+
+
+_STAGE_DONE = object()
+
+
+async def _run_streaming_stages(
+    session: Session, job: IngestionJob, documentation: Documentation
+) -> set[uuid.UUID]:
+    """Crawl, parse/delta and embed concurrently through bounded queues.
+
+    Pages flow crawl → parse → delta one at a time and changed section ids
+    flow on to the embedder, which batches whatever is queued (up to
+    ``EMBEDDING_BATCH_SIZE``) each time it is free.  Queue depth, not site
+    size, bounds how much is held in memory.  Returns the ids of the
+    sections it embedded; raises :class:`_IngestionStopped` when a stop is
+    requested.
+    """
+    queue_depth = max(1, settings.ingestion_queue_depth)
+    batch_size = max(1, settings.embedding_batch_size)
+    page_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth)
+    section_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_depth * batch_size)
+    fingerprints = _load_page_fingerprints(session, documentation.id)
+    seen_paths: set[str] = set()
+    seen_urls: set[str] = set()
+    unchanged_urls: list[str] = []
+    pages_processed = 0
+    embedded_ids: set[uuid.UUID] = set()
+
+    async def crawl_stage() -> None:
+        arguments, validators = _crawl_arguments(session, documentation)
+        found = False
+        if settings.crawl_discovery_mode == "sitemap":
+            async for page in _sitemap_pages(documentation, validators, fingerprints):
+                found = True
+                await page_queue.put(page)
+            if not found:
+                logger.info("No sitemap pages for %s; falling back to link-following", documentation.url)
+        if not found:
+            if validators:
+                pages = recrawl_site_stream(
+                    validators=validators, concurrency=settings.crawl_revalidate_concurrency, **arguments
+                )
+            else:
+                pages = crawl_site_stream(**arguments)
+            async for page in pages:
+                await page_queue.put(page)
+        await page_queue.put(_STAGE_DONE)
+
+    async def parse_stage() -> None:
+        nonlocal pages_processed
+        queued_ids: set[uuid.UUID] = set()
+        while (page := await page_queue.get()) is not _STAGE_DONE:
+            if _stop_if_requested(session, job):
+                raise _IngestionStopped
+
+            _persist_raw_pages(session, documentation.id, [page])
+            seen_urls.add(page.url)
+            unchanged_paths = _unchanged_section_paths(fingerprints, page)
+            if unchanged_paths is not None:
+                seen_paths.update(unchanged_paths)
+                unchanged_urls.append(page.url)
+                changed_ids = []
+            else:
+                parsed_sections = await parse_sections_async([page])
+                seen_paths.update(section.path for section in parsed_sections)
+                _stage_page_fingerprints(session, documentation.id, [page], parsed_sections)
+                changed_ids = _apply_sections_delta(session, documentation.id, parsed_sections, prune=False)
+
+            pages_processed += 1
+            _set_job_state(session, job, IngestionStatus.CRAWLING, pages_processed=pages_processed)
+
+            for section_id in changed_ids:
+                if section_id not in queued_ids:
+                    queued_ids.add(section_id)
+                    await section_queue.put(section_id)
+        await section_queue.put(_STAGE_DONE)
+
+    async def embed_stage() -> None:
+        finished = False
+        while not finished:
+            first = await section_queue.get()
+            if first is _STAGE_DONE:
+                break
+            batch = [first]
+            while len(batch) < batch_size:
+                try:
+                    item = section_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STAGE_DONE:
+                    finished = True
+                    break
+                batch.append(item)
+
+            await _embed_changed_sections(session, documentation, job, batch)
+            embedded_ids.update(batch)
+
+    tasks = [
+        asyncio.create_task(crawl_stage()),
+        asyncio.create_task(parse_stage()),
+        asyncio.create_task(embed_stage()),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    pruned = _prune_stale_sections(session, documentation.id, seen_paths)
+    _prune_raw_pages(session, documentation.id, seen_urls)
+    _finish_page_fingerprints(session, documentation.id, fingerprints, seen_urls, unchanged_urls)
+    logger.info(
+        "Streamed %d pages for doc %s (%d unchanged, embedded %d changed sections, pruned %d stale)",
+        pages_processed,
+        documentation.id,
+        len(unchanged_urls),
+        len(embedded_ids),
+        pruned,
+    )
+    return embedded_ids
+
+
+async def run_ingestion_pipeline(session: Session, job_id: uuid.UUID) -> None:
+    job = session.get(IngestionJob, job_id)
+    if job is None:
+        return
+
+    documentation = session.get(Documentation, job.documentation_id)
+    if documentation is None:
+        _set_job_state(session, job, IngestionStatus.FAILED, error_message="Missing documentation row")
+        return
+
+    try:
+        if _stop_if_requested(session, job):
+            return
+
+        _set_job_state(session, job, IngestionStatus.CRAWLING, progress_percent=10)
+        # Sitemap lastmods are compared with last_synced, so it records when the crawl started:
+        # a page edited while this run was crawling must still look changed to the next one.
+        crawl_started = _utcnow()
+
+        changed_sections: list[DocumentationSection] = []
+        rechunk = _chunking_changed(session, documentation)
+        if settings.ingestion_streaming:
+            try:
+                embedded_ids = await _run_streaming_stages(session, job, documentation)
+            except _IngestionStopped:
+                return
         else:
+            arguments, validators = _crawl_arguments(session, documentation)
+            fingerprints = _load_page_fingerprints(session, documentation.id)
+            pages: list[CrawledPage] = []
+            if settings.crawl_discovery_mode == "sitemap":
+                pages = [page async for page in _sitemap_pages(documentation, validators, fingerprints)]
+                if not pages:
+                    logger.info("No sitemap pages for %s; falling back to link-following", documentation.url)
+            if not pages:
+                if validators:
+                    pages = await recrawl_site(
+                        validators=validators, concurrency=settings.crawl_revalidate_concurrency, **arguments
+                    )
+                else:
+                    pages = await crawl_site(**arguments)
+            _set_job_state(session, job, IngestionStatus.CRAWLING, progress_percent=40, pages_processed=len(pages))
+            _persist_raw_pages(session, documentation.id, pages)
+            _prune_raw_pages(session, documentation.id, {page.url for page in pages})
+
+            if _stop_if_requested(session, job):
+                return
+
+            _set_job_state(session, job, IngestionStatus.PARSING, progress_percent=55, pages_processed=len(pages))
+            # Pages whose markdown hashes to their stored fingerprint keep their
+            # sections as they are: no parse, no delta, no embedding.
+            keep_paths: set[str] = set()
+            changed_pages: list[CrawledPage] = []
+            unchanged_urls: list[str] = []
+            for page in pages:
+                unchanged_paths = _unchanged_section_paths(fingerprints, page)
+                if unchanged_paths is None:
+                    changed_pages.append(page)
+                else:
+                    keep_paths.update(unchanged_paths)
+                    unchanged_urls.append(page.url)
+
+            parsed_sections = await parse_sections_async(
+                changed_pages,
+                workers=settings.ingestion_parse_workers,
+                chunk_pages=settings.ingestion_parse_chunk_pages,
+            )
+            keep_paths.update(section.path for section in parsed_sections)
+            changed_ids: list[uuid.UUID] = []
+            if changed_pages:
+                _stage_page_fingerprints(session, documentation.id, changed_pages, parsed_sections)
+                changed_ids = _apply_sections_delta(session, documentation.id, parsed_sections, prune=False)
+            _prune_stale_sections(session, documentation.id, keep_paths)
+            _finish_page_fingerprints(
+                session, documentation.id, fingerprints, {page.url for page in pages}, unchanged_urls
+            )
             logger.info(
-                "No changed sections to embed for doc %s",
+                "Parsed %d of %d pages for doc %s (%d unchanged)",
+                len(changed_pages),
+                len(pages),
                 documentation.id,
+                len(unchanged_urls),
             )
 
+            if _stop_if_requested(session, job):
+                return
+
+            # ── EMBEDDING ───────────────────────────────────────────────
+            _set_job_state(session, job, IngestionStatus.EMBEDDING, progress_percent=60)
+
+            embedded_ids = set(changed_ids)
+            if changed_ids:
+                changed_sections = await _embed_changed_sections(session, documentation, job, changed_ids)
+
+                logger.info(
+                    "Embedded %d changed sections for doc %s",
+                    len(changed_ids),
+                    documentation.id,
+                )
+            else:
+                logger.info(
+                    "No changed sections to embed for doc %s",
+                    documentation.id,
+                )
+
+        if rechunk:
+            changed_sections += await _reembed_remaining_sections(session, documentation, job, embedded_ids)
+
         _set_job_state(session, job, IngestionStatus.EMBEDDING, progress_percent=85)
 
         if _stop_if_requested(session, job):
@@ -311,27 +1079,43 @@ async def run_ingestion_pipeline(session: Session, job_id: uuid.UUID) -> None:
         _set_job_state(session, job, IngestionStatus.INDEXING, progress_percent=90)
 
         # Validate dimensions for changed sections
-        if changed_ids:
-            for section_model in changed_sections:
-                if section_model.embedding is not None:
-                    vec_len = len(section_model.embedding)
-                    if vec_len != settings.embedding_dimension:
-                        raise ValueError(
-                            f"Section {section_model.id} has embedding dim {vec_len}, "
-                            f"expected {settings.embedding_dimension}"
-                        )
+        for section_model in changed_sections:
+            if section_model.embedding is not None:
+                vec_len = len(section_model.embedding)
+                if vec_len != settings.embedding_dimension:
+                    raise ValueError(
+                        f"Section {section_model.id} has embedding dim {vec_len}, "
+                        f"expected {settings.embedding_dimension}"
+                    )
+
+        if settings.embedding_cache_enabled:
+            evict_embedding_cache(session)
 
         # Record embedding metadata on the documentation record
         documentation.embedding_model_name = settings.embedding_model
         documentation.embedding_dimension_size = settings.embedding_dimension
+        documentation.embedding_chunking = _chunking_signature()
 
-        documentation.last_synced = _utcnow()
+        documentation.last_synced = crawl_started
         documentation.updated_at = _utcnow()
         session.add(documentation)
         session.commit()
 
+        # Built concurrently on a separate connection, so only once nothing is left open here.
+        ensure_vector_index(session)
+        if settings.search_vector_index_scope == "documentation":
+            ensure_vector_index(session, documentation_id=documentation.id)
+
         _set_job_state(session, job, IngestionStatus.COMPLETED, progress_percent=100, error_message=None)
     except Exception as exc:
         _set_job_state(session, job, IngestionStatus.FAILED, error_message=str(exc))
     except BaseException as exc:
         _set_job_state(session, job, IngestionStatus.FAILED, error_message=str(exc))
+    finally:
+        # Sections may have changed on any exit path (completed, stopped or failed mid-way).
+        invalidate_search_cache(documentation.id)
+        try:
+            refresh_documentation_tree(session, documentation.id)
+        except Exception:
+            session.rollback()
+            logger.exception("Failed to rebuild the section tree for doc %s", documentation.id)
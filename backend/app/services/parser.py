@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import logging
+import multiprocessing
 import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from urllib.parse import urlparse
 
 from .crawler import CrawledPage
 
+logger = logging.getLogger(__name__)
+
 HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*$")
+# HEADING_PATTERN restricted to H1-H3, matched at a line start within a whole page
+# (whitespace may not cross the line break).
+SPLIT_HEADING = re.compile(r"(#{1,3})[^\S\n]+(.+?)[^\S\n]*$", re.MULTILINE)
+# Every line boundary str.splitlines() recognises, other than "\n" itself.
+_LINE_BREAK_CHARS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+LINE_BREAK = re.compile(r"\r\n?|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
 NON_ALNUM = re.compile(r"[^a-z0-9\-\s]")
 MULTI_DASH = re.compile(r"-+")
 
@@ -32,6 +47,11 @@ MIN_SECTION_TOKENS: int = 1500
 # Only H1-H3 are used as candidate split-points for the large-page chunker.
 _SPLIT_LEVELS: frozenset[int] = frozenset({1, 2, 3})
 
+# Stored page fingerprints record the version that parsed the page; bump this
+# whenever parse_sections (or MIN_SECTION_TOKENS) would section the same
+# markdown differently, so the next ingestion re-parses every page.
+PARSER_VERSION: int = 1
+
 
 @dataclass(slots=True)
 class ParsedSection:
@@ -56,7 +76,7 @@ def slugify(value: str) -> str:
 
 def _clean_heading(raw: str) -> str:
     """Strip markdown links and permalink symbols from a heading string."""
-    cleaned = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", raw)
+    cleaned = MARKDOWN_LINK.sub(r"\1", raw)
     return cleaned.replace("¶", "").strip()
 
 
@@ -73,7 +93,9 @@ def _make_section(
     content: str,
     level: int,
     url: str,
+    token_count: int | None = None,
 ) -> ParsedSection:
+    """*token_count* may be passed when already known (whitespace-split words of *content*)."""
     content = content.strip()
     return ParsedSection(
         path=path,
@@ -83,11 +105,43 @@ def _make_section(
         content=content,
         level=level,
         url=url,
-        token_count=len(content.split()),
+        token_count=len(content.split()) if token_count is None else token_count,
         checksum=_checksum(title=title, content=content, level=level, url=url),
     )
 
 
+def _normalize_line_breaks(markdown: str) -> str:
+    """*markdown* with every line break as ``\n``, so slices of it equal ``"\n".join`` of its lines."""
+    # Substring checks are memchr-fast; the substitution only runs for pages that need it.
+    if any(char in markdown for char in _LINE_BREAK_CHARS):
+        return LINE_BREAK.sub("\n", markdown)
+    return markdown
+
+
+def _iter_headings(text: str) -> Iterator[tuple[int, int, str]]:
+    """H1-H3 headings of *text* as ``(offset, level, raw title)``, in order.
+
+    Only line starts beginning with ``#`` are tried, located with ``str.find``.
+    """
+    offset = 0
+    while True:
+        m = SPLIT_HEADING.match(text, offset)
+        if m:
+            yield offset, m.end(1) - offset, m.group(2)
+        offset = text.find("\n#", offset) + 1
+        if offset == 0:
+            return
+
+
+def _span_tokens(text: str, headings: list[tuple[int, int, str]]) -> list[int]:
+    """Token counts of the intro before the first heading, then of each heading's span.
+
+    Tokens never span a line break, so counting per span equals counting per line.
+    """
+    bounds = [0, *(offset for offset, _, _ in headings), len(text)]
+    return [len(text[start:end].split()) for start, end in zip(bounds, bounds[1:])]
+
+
 def parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
     sections: list[ParsedSection] = []
 
@@ -99,11 +153,19 @@ def parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
             raw_path = "/" + raw_path
         root_path = raw_path.rstrip("/") or "/"
 
-        lines = page.markdown.splitlines()
-        total_tokens = len(page.markdown.split())
+        # ── Single pass: H1-H3 boundaries and the token count between them ──
+        text = _normalize_line_breaks(page.markdown)
+        headings: list[tuple[int, int, str]] | None = None
+        if len(text) < 2 * MIN_SECTION_TOKENS - 1:
+            # Too short to hold MIN_SECTION_TOKENS tokens: a small page, only its first H1 matters.
+            span_tokens = [len(text.split())]
+        else:
+            headings = list(_iter_headings(text))
+            span_tokens = _span_tokens(text, headings)
+        total_tokens = sum(span_tokens)
 
         # ── Empty page ───────────────────────────────────────────────────
-        if not lines or total_tokens == 0:
+        if total_tokens == 0:
             empty_path = f"{root_path}/content" if root_path != "/" else "/content"
             sections.append(
                 _make_section(
@@ -113,6 +175,7 @@ def parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
                     content="",
                     level=1,
                     url=page.url,
+                    token_count=0,
                 )
             )
             continue
@@ -120,13 +183,14 @@ def parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
         # ── Small-page guard (<MIN_SECTION_TOKENS) ───────────────────────
         # Entire page → one flat section at root_path (no splitting, no parent).
         if total_tokens < MIN_SECTION_TOKENS:
-            flat_title: str = root_path.split("/")[-1] or "home"
-            for line in lines:
-                m = HEADING_PATTERN.match(line)
-                if m and len(m.group(1)) == 1:  # first H1 only
-                    flat_title = _clean_heading(m.group(2))
-                    break
-
+            flat_title: str = next(
+                (
+                    _clean_heading(raw)
+                    for _, level, raw in (_iter_headings(text) if headings is None else headings)
+                    if level == 1  # first H1 only
+                ),
+                root_path.split("/")[-1] or "home",
+            )
             sections.append(
                 _make_section(
                     path=root_path,
@@ -135,122 +199,139 @@ def parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
                     content=page.markdown,
                     level=1,
                     url=page.url,
+                    token_count=total_tokens,
                 )
             )
             continue
 
         # ── Large-page (>=MIN_SECTION_TOKENS): root node + merged children ──
         #
-        # Step 1 ─ walk lines and collect:
-        #   • intro_lines  : everything before the first H1-H3 heading
-        #   • page_title   : from the first H1 found, else from URL path stem
-        #   • heading_lines: first index of the first H1-H3 (chunker starts here)
-        #
+        # Step 1 ─ the root section (the page anchor in the tree) holds the
+        #           intro: everything before the first H1-H3 heading.  Its
+        #           title comes from that heading if it is an H1, else from
+        #           the URL path stem.
         page_title: str = root_path.split("/")[-1] or "home"
-        intro_lines: list[str] = []
-        first_heading_idx: int = len(lines)  # default: no heading found
-
-        for idx, line in enumerate(lines):
-            m = HEADING_PATTERN.match(line)
-            if m and len(m.group(1)) in _SPLIT_LEVELS:
-                if len(m.group(1)) == 1:
-                    page_title = _clean_heading(m.group(2))
-                first_heading_idx = idx
-                break
-            intro_lines.append(line)
-
-        # Step 2 ─ emit the root section (the page anchor in the tree)
-        intro_content = "\n".join(intro_lines).strip()
+        if headings and headings[0][1] == 1:
+            page_title = _clean_heading(headings[0][2])
+        intro_end = headings[0][0] if headings else len(text)
         sections.append(
             _make_section(
                 path=root_path,
                 parent_path=None,
                 title=page_title,
-                content=intro_content,
+                content=text[:intro_end],
                 level=1,
                 url=page.url,
+                token_count=span_tokens[0],
             )
         )
 
         # If the page had NO headings, everything was intro — we're done.
-        if first_heading_idx == len(lines):
+        if not headings:
             continue
 
-        # Step 3 ─ collect one "candidate" per H1-H3, starting from the first heading.
-        #
-        # A candidate = (title, level, lines[]).  All lines between headings
-        # belong to the preceding candidate.
-        candidates: list[tuple[str | None, int, list[str]]] = []
-        c_title: str | None = None
-        c_level: int = 1
-        c_lines: list[str] = []
-
-        for line in lines[first_heading_idx:]:
-            m = HEADING_PATTERN.match(line)
-            if m and len(m.group(1)) in _SPLIT_LEVELS:
-                if c_lines or c_title is not None:
-                    candidates.append((c_title, c_level, c_lines))
-                c_title = _clean_heading(m.group(2))
-                c_level = len(m.group(1))
-                c_lines = [line]
-            else:
-                c_lines.append(line)
-
-        if c_lines or c_title is not None:
-            candidates.append((c_title, c_level, c_lines))  # flush last
-
-        # Step 4 ─ merge consecutive candidates until the accumulated token
+        # Step 2 ─ every H1-H3 starts a "candidate" running to the next one.
+        #           Merge consecutive candidates until the accumulated token
         #           count reaches MIN_SECTION_TOKENS, then start a new chunk.
         #
         # This ensures every emitted section is wide enough to be semantically
-        # useful while still respecting heading boundaries.
-        chunks: list[tuple[str | None, int, list[str]]] = []
-        m_title: str | None = None
-        m_level: int = 1
-        m_lines: list[str] = []
+        # useful while still respecting heading boundaries.  A chunk is
+        # (first heading index, end offset, tokens); it takes its title and
+        # level from its first heading.
+        chunks: list[tuple[int, int, int]] = []
+        m_first: int = 0
         m_tokens: int = 0
 
-        for cand_title, cand_level, cand_lines in candidates:
-            cand_tokens = sum(len(ln.split()) for ln in cand_lines)
-
+        for idx in range(len(headings)):
+            cand_tokens = span_tokens[idx + 1]
             if m_tokens >= MIN_SECTION_TOKENS:
                 # Current accumulation hit the threshold — flush it.
-                chunks.append((m_title, m_level, m_lines))
-                m_title = cand_title
-                m_level = cand_level
-                m_lines = list(cand_lines)
+                chunks.append((m_first, headings[idx][0], m_tokens))
+                m_first = idx
                 m_tokens = cand_tokens
             else:
                 # Not enough yet — absorb this candidate into the current chunk.
-                if m_title is None:
-                    m_title = cand_title
-                    m_level = cand_level
-                m_lines.extend(cand_lines)
                 m_tokens += cand_tokens
 
-        if m_lines or m_title is not None:
-            chunks.append((m_title, m_level, m_lines))  # flush last
+        chunks.append((m_first, len(text), m_tokens))  # flush last
 
-        # Step 5 ─ emit each merged chunk as a child of root_path.
+        # Step 3 ─ emit each merged chunk as a child of root_path.
         slug_counters: dict[str, int] = {}
-        for raw_title, level, chunk_lines in chunks:
-            title = raw_title if raw_title is not None else (root_path.split("/")[-1] or "home")
+        for first, end, tokens in chunks:
+            start, level, raw_title = headings[first]
+            title = _clean_heading(raw_title)
             slug = slugify(title)
             slug_counters[slug] = slug_counters.get(slug, 0) + 1
             suffix = "" if slug_counters[slug] == 1 else f"-{slug_counters[slug]}"
             section_path = (
                 f"/{slug}{suffix}" if root_path == "/" else f"{root_path}/{slug}{suffix}"
             )
-            content = "\n".join(chunk_lines)
             sections.append(
                 _make_section(
                     path=section_path,
                     parent_path=root_path,
                     title=title,
-                    content=content,
+                    content=text[start:end],
                     level=level,
                     url=page.url,
+                    token_count=tokens,
                 )
             )
 
     return sections
+
+
+# Process pools are kept per worker count and reused across ingestion runs.
+_parse_pools: dict[int, ProcessPoolExecutor] = {}
+_process_pools_unavailable = False
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _parse_pools.get(workers)
+    if pool is None:
+        # spawn: forking would copy the caller's threads, event loop and database connections.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _parse_pools[workers] = pool
+    return pool
+
+
+async def parse_sections_async(
+    pages: list[CrawledPage], *, workers: int = 0, chunk_pages: int = 64
+) -> list[ParsedSection]:
+    """:func:`parse_sections` off the event loop.
+
+    With *workers* > 0 and more than *chunk_pages* pages, chunks of
+    *chunk_pages* pages are parsed in a process pool of that many workers and
+    merged back in page order — slug counters are per page, so the result is
+    identical to a serial parse.  Otherwise, or when no process pool can be
+    started here (e.g. inside a daemonic worker process), the pages are parsed
+    on a worker thread.
+    """
+    global _process_pools_unavailable
+
+    if workers > 0 and len(pages) > chunk_pages and not _process_pools_unavailable:
+        loop = asyncio.get_running_loop()
+        try:
+            pool = _parse_pool(workers)
+            parsed_chunks = await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, parse_sections, pages[start : start + chunk_pages])
+                    for start in range(0, len(pages), chunk_pages)
+                )
+            )
+        except BrokenProcessPool:
+            # A worker died; parse this batch on a thread and start a fresh pool next time.
+            logger.warning("Parse process pool broke; parsing %d pages on a thread", len(pages))
+            _parse_pools.pop(workers).shutdown(wait=False, cancel_futures=True)
+        except (AssertionError, OSError) as exc:
+            # Logged once: Celery's default prefork pool runs tasks in daemonic processes, which cannot have children.
+            logger.warning(
+                "Process pool parsing unavailable (%s); INGESTION_PARSE_WORKERS is ignored and pages are parsed "
+                "on a thread. Run the Celery worker with --pool=threads or --pool=solo to use it",
+                exc,
+            )
+            _process_pools_unavailable = True
+        else:
+            return [section for chunk in parsed_chunks for section in chunk]
+
+    return await asyncio.to_thread(parse_sections, pages)
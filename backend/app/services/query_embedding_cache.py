@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+from redis import RedisError
+
+from app.config import settings
+from app.services.search_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "qemb"
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings.
+
+    The first tier is an in-process LRU bounded by both entry count and the
+    bytes of the stored float32 vectors; the optional second tier is Redis,
+    shared across API processes.  Keys are the embedding model plus the
+    normalized query text (see :func:`normalize_query`), so queries that only
+    differ in case or spacing share a vector.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        redis=None,
+        redis_ttl_seconds: int = 86_400,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._redis = redis
+        self._redis_ttl_seconds = redis_ttl_seconds
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self._provider_seconds = 0.0
+        self.provider_seconds_saved = 0.0
+
+    @staticmethod
+    def key(model: str, query: str) -> str:
+        return f"{model}\x00{normalize_query(query)}"
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"{_REDIS_KEY_PREFIX}:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._record_hit()
+                return vector
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self._redis_key(key))
+            except RedisError:
+                logger.warning("Query embedding cache lookup in Redis failed", exc_info=True)
+                raw = None
+            if raw is not None:
+                vector = np.frombuffer(raw, dtype=np.float32)
+                with self._lock:
+                    self._store_local(key, vector)
+                    self.redis_hits += 1
+                    self._record_hit()
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, vector: Sequence[float], *, provider_seconds: float = 0.0) -> np.ndarray:
+        """Store a freshly embedded vector; *provider_seconds* is the call it took."""
+        compact = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._store_local(key, compact)
+            self._provider_seconds += provider_seconds
+        if self._redis is not None:
+            try:
+                self._redis.set(self._redis_key(key), compact.tobytes(), ex=self._redis_ttl_seconds)
+            except RedisError:
+                logger.warning("Query embedding cache store in Redis failed", exc_info=True)
+        return compact
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "provider_seconds_saved": round(self.provider_seconds_saved, 3),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _record_hit(self) -> None:
+        self.hits += 1
+        # Credit each hit with the average provider round trip it avoided.
+        if self.misses:
+            self.provider_seconds_saved += self._provider_seconds / self.misses
+
+    def _store_local(self, key: str, vector: np.ndarray) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        if vector.nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+
+_query_embedding_cache: QueryEmbeddingCache | None = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    global _query_embedding_cache
+    if _query_embedding_cache is None:
+        redis = None
+        if settings.query_embedding_cache_redis:
+            from app.redis_client import redis_binary_client as redis
+        _query_embedding_cache = QueryEmbeddingCache(
+            max_entries=settings.query_embedding_cache_max_entries,
+            max_bytes=settings.query_embedding_cache_max_bytes,
+            redis=redis,
+            redis_ttl_seconds=settings.query_embedding_cache_redis_ttl_seconds,
+        )
+    return _query_embedding_cache
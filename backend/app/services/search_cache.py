@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any
+
+from redis import RedisError
+
+from app.config import settings
+from app.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "search"
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of *query*, for keys of query embeddings."""
+    return " ".join(query.casefold().split())
+
+
+def _generation_key(documentation_id: uuid.UUID) -> str:
+    return f"{_KEY_PREFIX}:gen:{documentation_id}"
+
+
+def _result_key(
+    documentation_id: uuid.UUID,
+    generation: str,
+    mode: str,
+    query: str,
+    limit: int,
+    offset: int,
+    ef_search: int | None,
+    iterative_scan: str | None,
+    total_mode: str,
+    cursor: str | None,
+) -> str:
+    # The raw query: ILIKE keyword matching (also the fallback of the vector
+    # modes) and the excerpts in every response depend on its exact spacing.
+    fingerprint = json.dumps(
+        [
+            mode,
+            query,
+            limit,
+            offset,
+            ef_search,
+            iterative_scan,
+            total_mode,
+            cursor,
+            settings.embedding_model,
+        ],
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{documentation_id}:{generation}:{digest}"
+
+
+class SearchResultCache:
+    """Redis cache slot for one search request's response payload.
+
+    The key is pinned to the documentation's cache generation read by
+    :meth:`get`, so a result computed while an ingestion bumps the generation
+    is stored under the old, already-invalidated generation.  The cache is
+    best-effort: Redis errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        documentation_id: uuid.UUID,
+        mode: str,
+        query: str,
+        limit: int,
+        offset: int,
+        *,
+        ef_search: int | None = None,
+        iterative_scan: str | None = None,
+        total_mode: str = "exact",
+        cursor: str | None = None,
+    ) -> None:
+        self.documentation_id = documentation_id
+        self._params = (mode, query, limit, offset, ef_search, iterative_scan, total_mode, cursor)
+        self._key: str | None = None
+
+    def get(self) -> dict[str, Any] | None:
+        if not settings.search_cache_enabled:
+            return None
+        try:
+            generation = redis_client.get(_generation_key(self.documentation_id)) or "0"
+            self._key = _result_key(self.documentation_id, generation, *self._params)
+            cached = redis_client.get(self._key)
+        except RedisError:
+            logger.warning("Search cache lookup failed", exc_info=True)
+            return None
+        return json.loads(cached) if cached else None
+
+    def set(self, payload: dict[str, Any]) -> None:
+        if self._key is None:
+            return
+        try:
+            redis_client.set(self._key, json.dumps(payload, separators=(",", ":")), ex=settings.search_cache_ttl_seconds)
+        except RedisError:
+            logger.warning("Search cache store failed", exc_info=True)
+
+
+def invalidate_search_cache(documentation_id: uuid.UUID) -> None:
+    """Bump the documentation's cache generation so earlier entries are never read again.
+
+    Orphaned entries simply expire with their TTL.
+    """
+    if not settings.search_cache_enabled:
+        return
+    try:
+        redis_client.incr(_generation_key(documentation_id))
+    except RedisError:
+        logger.warning("Search cache invalidation failed for doc %s", documentation_id, exc_info=True)
@@ -0,0 +1,194 @@
+"""HNSW indexes over ``documentation_section.embedding``.
+
+With ``SEARCH_VECTOR_INDEX`` set to ``halfvec`` or ``binary`` the full
+``vector`` column is kept for exact scoring, but approximate candidate
+retrieval runs on an expression index over a half-precision cast or a
+binary quantization of it — 2x or 32x smaller than the ``vector`` HNSW
+index, which is dropped once the compact one is built.
+:func:`compact_distance` builds the distance expression that matches the
+index so the planner can use it.  Switching modes takes effect on the next
+ingestion, or immediately with ``python -m app.services.vector_index``.
+
+With ``SEARCH_VECTOR_INDEX_SCOPE=documentation`` each documentation set
+additionally gets a partial HNSW index (``WHERE documentation_id = ...``),
+created once its sections are embedded and dropped with the documentation.
+Every search filters on one ``documentation_id``, so the planner walks a
+graph that only holds that set's sections instead of over-fetching from the
+global index and discarding other sets' neighbours.  A partial index is
+only matched by a plan built for the bound ``documentation_id``, so
+searches force custom plans for their transaction (see
+:func:`app.services.documentation.apply_hnsw_tuning`); a generic plan of a
+prepared statement would fall back to the global index.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Literal
+
+from pgvector.sqlalchemy import BIT, HALFVEC
+from sqlalchemy import cast, func, text
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+VectorIndexKind = Literal["full", "halfvec", "binary"]
+
+_INDEX_NAMES: dict[str, str] = {
+    "full": "ix_documentation_section_embedding",
+    "halfvec": "ix_documentation_section_embedding_halfvec",
+    "binary": "ix_documentation_section_embedding_binary",
+}
+
+
+def _index_expression(kind: VectorIndexKind, dimension: int) -> str:
+    if kind == "halfvec":
+        return f"(embedding::halfvec({dimension})) halfvec_cosine_ops"
+    return f"(binary_quantize(embedding)::bit({dimension})) bit_hamming_ops"
+
+
+def compact_distance(
+    column: ColumnElement, query_vector_expr: ColumnElement, kind: VectorIndexKind, dimension: int
+) -> ColumnElement:
+    """Distance between *column* and the query in the compact space of *kind*.
+
+    The expression mirrors the one :func:`ensure_vector_index` indexes: cosine
+    distance on ``halfvec`` casts, or Hamming distance on binary quantizations.
+    """
+    if kind == "halfvec":
+        return cast(column, HALFVEC(dimension)).op("<=>")(cast(query_vector_expr, HALFVEC(dimension)))
+    if kind == "binary":
+        return cast(func.binary_quantize(column), BIT(dimension)).op("<~>")(func.binary_quantize(query_vector_expr))
+    raise ValueError(f"No compact distance for vector index kind {kind!r}")
+
+
+def _index_name(kind: VectorIndexKind, documentation_id: uuid.UUID | None) -> str:
+    if documentation_id is None:
+        return _INDEX_NAMES[kind]
+    return f"ix_section_embedding_{kind}_{documentation_id.hex}"
+
+
+def _index_method(kind: VectorIndexKind, dimension: int) -> str:
+    if kind == "full":
+        return "embedding vector_cosine_ops"
+    return _index_expression(kind, dimension)
+
+
+def _execute_autocommit(session: Session, statement: str) -> None:
+    # CONCURRENTLY cannot run inside a transaction block.
+    with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(statement))
+
+
+def _query_autocommit(session: Session, statement: str, **params: object) -> list[tuple]:
+    # Catalog reads also stay off *session*: an open transaction there would stall a concurrent build.
+    with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        return [tuple(row) for row in connection.execute(text(statement), params)]
+
+
+def _index_is_valid(session: Session, name: str) -> bool | None:
+    """``True``/``False`` for an existing valid/invalid index, ``None`` when there is none."""
+    rows = _query_autocommit(
+        session,
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name",
+        name=name,
+    )
+    return rows[0][0] if rows else None
+
+
+def _partial_index_count(session: Session) -> int:
+    rows = _query_autocommit(
+        session, r"SELECT count(*) FROM pg_class WHERE relkind = 'i' AND relname LIKE 'ix\_section\_embedding\_%'"
+    )
+    return rows[0][0]
+
+
+def _create_index(session: Session, name: str, statement: str) -> None:
+    """Run ``CREATE INDEX CONCURRENTLY IF NOT EXISTS`` for *name*, rebuilding it if it was left invalid.
+
+    A failed or cancelled concurrent build leaves an INVALID index behind
+    that ``IF NOT EXISTS`` would keep skipping while the planner ignores it.
+    """
+    if _index_is_valid(session, name) is False:
+        logger.warning("Dropping invalid vector index %s left by an earlier build", name)
+        _execute_autocommit(session, f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    _execute_autocommit(session, statement)
+
+
+def ensure_vector_index(
+    session: Session,
+    kind: VectorIndexKind | None = None,
+    *,
+    documentation_id: uuid.UUID | None = None,
+) -> bool:
+    """Bring the HNSW indexes for *kind* (``SEARCH_VECTOR_INDEX`` by default) into place.
+
+    Without *documentation_id* this is the global layout: the index for
+    *kind* is built, then the global indexes of the other kinds are dropped,
+    so a compact mode replaces the ``vector`` index instead of adding to it
+    (and switching back to ``full`` rebuilds it).  With *documentation_id*
+    it is that documentation's partial index, skipped with a warning once
+    ``SEARCH_VECTOR_INDEX_MAX_PARTIAL`` of them exist.  An index left
+    invalid by a failed build is dropped and rebuilt.
+
+    Every statement runs ``CONCURRENTLY`` on its own autocommit connection so
+    searches and ingestion writes are not blocked; call it with no
+    transaction open on *session*, since a build waits for every
+    transaction older than itself.  Returns ``True`` when index statements
+    were issued; non-PostgreSQL databases are a no-op.
+    """
+    kind = kind or settings.search_vector_index
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+
+    name = _index_name(kind, documentation_id)
+    statement = (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON documentation_section "
+        f"USING hnsw ({_index_method(kind, settings.embedding_dimension)})"
+    )
+    if documentation_id is not None:
+        if _index_is_valid(session, name) is None:
+            partial_indexes = _partial_index_count(session)
+            if partial_indexes >= settings.search_vector_index_max_partial:
+                logger.warning(
+                    "Not creating vector index %s: %d per-documentation indexes exist (limit %d); "
+                    "this documentation is searched through the global index",
+                    name,
+                    partial_indexes,
+                    settings.search_vector_index_max_partial,
+                )
+                return False
+            logger.info("Creating vector index %s (%d per-documentation indexes exist)", name, partial_indexes)
+        # Inlined rather than bound: index predicates must be constants (a UUID is safe to inline).
+        statement += f" WHERE documentation_id = '{documentation_id}'::uuid"
+    _create_index(session, name, statement)
+    if documentation_id is None:
+        # Only once the new index is built, so searches always have one to use.
+        for other, other_name in _INDEX_NAMES.items():
+            if other != kind:
+                _execute_autocommit(session, f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}")
+    logger.info("Ensured %s vector index %s", kind, name)
+    return True
+
+
+def drop_documentation_vector_indexes(session: Session, documentation_id: uuid.UUID) -> None:
+    """Drop every per-documentation partial index of *documentation_id* (all kinds)."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    for kind in ("full", "halfvec", "binary"):
+        _execute_autocommit(
+            session, f"DROP INDEX CONCURRENTLY IF EXISTS {_index_name(kind, documentation_id)}"
+        )
+
+
+if __name__ == "__main__":
+    # Apply a SEARCH_VECTOR_INDEX change without waiting for the next ingestion.
+    from app.db import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with Session(engine) as session:
+        ensure_vector_index(session)
@@ -0,0 +1,60 @@
+"""Benchmark embedding throughput against ``EMBEDDING_CONCURRENCY``.
+
+Runs ``embed_sections`` against a fake provider with a fixed per-request
+latency, so the numbers isolate the batch scheduler from network noise.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_embedding_concurrency
+    uv run python -m benchmarks.bench_embedding_concurrency --texts 2000 --latency-ms 250 --levels 1,2,4,8,16
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import app.services.embedding as embedding
+from app.config import settings
+
+
+class _FakeEmbedder:
+    def __init__(self, latency_s: float, dimension: int) -> None:
+        self.latency_s = latency_s
+        self.dimension = dimension
+
+    async def embed_documents(self, batch: list[str]) -> SimpleNamespace:
+        await asyncio.sleep(self.latency_s)
+        return SimpleNamespace(embeddings=[[0.0] * self.dimension for _ in batch])
+
+
+def _run(texts: list[str], concurrency: int, latency_s: float) -> float:
+    settings.embedding_concurrency = concurrency
+    embedding._embedder = _FakeEmbedder(latency_s, settings.embedding_dimension)
+    started = time.perf_counter()
+    asyncio.run(embedding.embed_sections(texts))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--levels", default="1,2,4,8")
+    args = parser.parse_args()
+
+    settings.embedding_batch_size = args.batch_size
+    texts = [f"benchmark text {i}" for i in range(args.texts)]
+    latency_s = args.latency_ms / 1000
+
+    print(f"{'concurrency':>11} {'seconds':>9} {'texts/s':>9}")
+    for level in (int(value) for value in args.levels.split(",")):
+        elapsed = _run(texts, level, latency_s)
+        print(f"{level:>11} {elapsed:>9.3f} {args.texts / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
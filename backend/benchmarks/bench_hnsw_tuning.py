@@ -0,0 +1,107 @@
+"""Benchmark HNSW scan tuning: recall vs latency over ``ef_search`` and iterative scan.
+
+Seeds one target documentation set plus ``--noise-docs`` other sets of the
+same size, so the ``documentation_id`` filter is selective the way it is in
+production, then runs ``_search_by_vector`` for every combination of
+``--ef-search`` and ``--iterative-scan``.  ``exact`` is the baseline: the
+same query with index scans disabled (a sequential scan and sort).  Recall
+is measured against brute-force neighbours computed in NumPy, on the page
+at ``--offset``; "short" counts searches that returned fewer than
+``--limit`` rows.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_hnsw_tuning --sections 5000 --noise-docs 19 --queries 100
+
+``POSTGRES_CONNECTION_STRING`` must point at PostgreSQL with pgvector
+(>= 0.8 for iterative scans).  Seeded rows are deleted afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session, delete, select
+
+from app.config import settings
+from app.db import engine
+from app.models import Documentation, DocumentationSection
+from app.services.documentation import _search_by_vector
+
+from benchmarks.bench_vector_search import _percentile, _seed
+
+
+def _exact_pages(vectors: np.ndarray, ids: list, queries: np.ndarray, offset: int, limit: int) -> list[set]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarities = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    ranked = np.argsort(-similarities, axis=1)[:, offset : offset + limit]
+    return [{ids[i] for i in row} for row in ranked]
+
+
+def _run(session: Session, doc_id, queries, expected, args, *, exact: bool = False, **tuning):
+    samples, recalls, short = [], [], 0
+    for query_vector, truth in zip(queries, expected):
+        if exact:
+            session.exec(text("SET LOCAL enable_indexscan = off"))
+        started = time.perf_counter()
+        hits, _ = _search_by_vector(session, doc_id, query_vector, args.limit, args.offset, **tuning)
+        samples.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({hit.section.id for hit in hits} & truth) / args.limit)
+        short += len(hits) < args.limit
+        # SET LOCAL values end with the transaction; start every query from a clean one.
+        session.rollback()
+    return statistics.fmean(recalls), _percentile(samples, 50), _percentile(samples, 99), short
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=5_000, help="sections per documentation set")
+    parser.add_argument("--noise-docs", type=int, default=19)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--ef-search", default="40,100,200,400")
+    parser.add_argument("--iterative-scan", default="off,strict_order,relaxed_order")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dimension = settings.embedding_dimension
+    queries = rng.standard_normal((args.queries, dimension)).astype(np.float32)
+
+    with Session(engine) as session:
+        doc_ids = [_seed(session, args.sections, dimension, rng) for _ in range(args.noise_docs + 1)]
+        target = doc_ids[0]
+        try:
+            rows = session.exec(
+                select(DocumentationSection.id, DocumentationSection.embedding).where(
+                    DocumentationSection.documentation_id == target
+                )
+            ).all()
+            ids = [row[0] for row in rows]
+            vectors = np.asarray([row[1] for row in rows], dtype=np.float32)
+            expected = _exact_pages(vectors, ids, queries, args.offset, args.limit)
+            session.rollback()
+
+            print(f"{'ef_search':>9} {'iterative':>14} {f'recall@{args.limit}':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'short':>6}")
+            recall, p50, p99, short = _run(session, target, queries, expected, args, exact=True)
+            print(f"{'exact':>9} {'-':>14} {recall:>10.3f} {p50:>9.2f} {p99:>9.2f} {short:>6}")
+            for ef_search in (int(value) for value in args.ef_search.split(",")):
+                for iterative_scan in args.iterative_scan.split(","):
+                    recall, p50, p99, short = _run(
+                        session, target, queries, expected, args, ef_search=ef_search, iterative_scan=iterative_scan
+                    )
+                    print(f"{ef_search:>9} {iterative_scan:>14} {recall:>10.3f} {p50:>9.2f} {p99:>9.2f} {short:>6}")
+        finally:
+            session.rollback()
+            for doc_id in doc_ids:
+                session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == doc_id))
+                session.exec(delete(Documentation).where(Documentation.id == doc_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
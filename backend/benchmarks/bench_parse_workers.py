@@ -0,0 +1,84 @@
+"""Benchmark parallel parsing: throughput and event-loop stalls per worker count.
+
+``inline`` calls ``parse_sections`` on the event loop (the old behaviour),
+``thread`` is ``parse_sections_async`` with ``workers=0`` and the numbers
+are process pools of that many workers (``INGESTION_PARSE_WORKERS``).
+While each parse runs, a ticker task sleeps 1 ms at a time on the loop; the
+longest gap between its wake-ups is how long the loop was blocked (what
+concurrent embedding I/O would wait).  Pools are warmed up before timing.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_parse_workers --pages 4000 --workers 1,2,4,8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.parser import parse_sections, parse_sections_async
+
+from benchmarks.bench_parser import _synthetic_page
+
+
+async def _measure(parse, pages) -> tuple[float, float]:
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await parse(pages)
+    elapsed = time.perf_counter() - started
+    done = True
+    await ticking
+    return elapsed, stall
+
+
+async def _inline(pages):
+    return parse_sections(pages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=4_000)
+    parser.add_argument("--chunk-pages", type=int, default=64)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--runs", type=int, default=3, help="timed parses per mode (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [_synthetic_page(rng, i, sections=rng.choice((3, 20, 60)), words=30) for i in range(args.pages)]
+    expected = parse_sections(pages)
+
+    modes = {"inline": _inline, "thread": lambda p: parse_sections_async(p, workers=0)}
+    for workers in (int(value) for value in args.workers.split(",")):
+        modes[str(workers)] = lambda p, w=workers: parse_sections_async(p, workers=w, chunk_pages=args.chunk_pages)
+
+    async def run() -> None:
+        print(f"{'mode':>8} {'pages/s':>10} {'speedup':>8} {'max loop stall (ms)':>20}")
+        baseline = None
+        for name, parse in modes.items():
+            if await parse(pages) != expected:
+                raise SystemExit(f"{name} output differs from a serial parse")
+            elapsed, stall = min([await _measure(parse, pages) for _ in range(args.runs)])
+            baseline = baseline or elapsed
+            print(f"{name:>8} {len(pages) / elapsed:>10.0f} {baseline / elapsed:>8.2f} {stall * 1000:>20.1f}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
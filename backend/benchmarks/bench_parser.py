@@ -0,0 +1,237 @@
+"""Benchmark ``parse_sections``: pages/sec and peak allocations, legacy vs single pass.
+
+``legacy`` reproduces the old line-by-line parser (``splitlines()`` plus a
+whole-page ``split()``, up to two heading matches per line, tokens
+re-counted per line while merging and again per section); ``single-pass``
+is the current ``parse_sections``, which finds H1-H3 boundaries with one
+regex scan, counts tokens once per span and slices sections out of the
+page.  Both are checked to produce identical sections before timing.
+
+Corpora:
+
+* ``synthetic-large`` — pages well above ``MIN_SECTION_TOKENS`` with many
+  headings, so they are split and merged;
+* ``synthetic-small`` — pages below the threshold (one flat section each);
+* ``real-world`` — every ``*.md`` file under ``--markdown-dir`` (the
+  repository root by default), repeated to ``--pages`` pages.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_parser --pages 500 --runs 5
+    uv run python -m benchmarks.bench_parser --markdown-dir /path/to/crawled/markdown
+
+Peak allocation is ``tracemalloc``'s peak over one parse of the corpus,
+output sections included.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import random
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urlparse
+
+from app.services.crawler import CrawledPage
+from app.services.parser import (
+    HEADING_PATTERN,
+    MIN_SECTION_TOKENS,
+    _SPLIT_LEVELS,
+    ParsedSection,
+    _make_section,
+    parse_sections,
+    slugify,
+)
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _legacy_clean_heading(raw: str) -> str:
+    cleaned = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", raw)
+    return cleaned.replace("¶", "").strip()
+
+
+def _legacy_parse_sections(pages: list[CrawledPage]) -> list[ParsedSection]:
+    sections: list[ParsedSection] = []
+    for page in pages:
+        raw_path = urlparse(page.url).path
+        if not raw_path.startswith("/"):
+            raw_path = "/" + raw_path
+        root_path = raw_path.rstrip("/") or "/"
+        stem = root_path.split("/")[-1] or "home"
+
+        lines = page.markdown.splitlines()
+        total_tokens = len(page.markdown.split())
+        if not lines or total_tokens == 0:
+            empty_path = f"{root_path}/content" if root_path != "/" else "/content"
+            sections.append(
+                _make_section(path=empty_path, parent_path=root_path, title=page.url, content="", level=1, url=page.url)
+            )
+            continue
+
+        if total_tokens < MIN_SECTION_TOKENS:
+            flat_title = stem
+            for line in lines:
+                m = HEADING_PATTERN.match(line)
+                if m and len(m.group(1)) == 1:
+                    flat_title = _legacy_clean_heading(m.group(2))
+                    break
+            sections.append(
+                _make_section(
+                    path=root_path, parent_path=None, title=flat_title, content=page.markdown, level=1, url=page.url
+                )
+            )
+            continue
+
+        page_title = stem
+        intro_lines: list[str] = []
+        first_heading_idx = len(lines)
+        for idx, line in enumerate(lines):
+            m = HEADING_PATTERN.match(line)
+            if m and len(m.group(1)) in _SPLIT_LEVELS:
+                if len(m.group(1)) == 1:
+                    page_title = _legacy_clean_heading(m.group(2))
+                first_heading_idx = idx
+                break
+            intro_lines.append(line)
+        sections.append(
+            _make_section(
+                path=root_path,
+                parent_path=None,
+                title=page_title,
+                content="\n".join(intro_lines).strip(),
+                level=1,
+                url=page.url,
+            )
+        )
+        if first_heading_idx == len(lines):
+            continue
+
+        candidates: list[tuple[str | None, int, list[str]]] = []
+        c_title: str | None = None
+        c_level = 1
+        c_lines: list[str] = []
+        for line in lines[first_heading_idx:]:
+            m = HEADING_PATTERN.match(line)
+            if m and len(m.group(1)) in _SPLIT_LEVELS:
+                if c_lines or c_title is not None:
+                    candidates.append((c_title, c_level, c_lines))
+                c_title = _legacy_clean_heading(m.group(2))
+                c_level = len(m.group(1))
+                c_lines = [line]
+            else:
+                c_lines.append(line)
+        if c_lines or c_title is not None:
+            candidates.append((c_title, c_level, c_lines))
+
+        chunks: list[tuple[str | None, int, list[str]]] = []
+        m_title: str | None = None
+        m_level = 1
+        m_lines: list[str] = []
+        m_tokens = 0
+        for cand_title, cand_level, cand_lines in candidates:
+            cand_tokens = sum(len(ln.split()) for ln in cand_lines)
+            if m_tokens >= MIN_SECTION_TOKENS:
+                chunks.append((m_title, m_level, m_lines))
+                m_title, m_level, m_lines, m_tokens = cand_title, cand_level, list(cand_lines), cand_tokens
+            else:
+                if m_title is None:
+                    m_title, m_level = cand_title, cand_level
+                m_lines.extend(cand_lines)
+                m_tokens += cand_tokens
+        if m_lines or m_title is not None:
+            chunks.append((m_title, m_level, m_lines))
+
+        slug_counters: dict[str, int] = {}
+        for raw_title, level, chunk_lines in chunks:
+            title = raw_title if raw_title is not None else stem
+            slug = slugify(title)
+            slug_counters[slug] = slug_counters.get(slug, 0) + 1
+            suffix = "" if slug_counters[slug] == 1 else f"-{slug_counters[slug]}"
+            section_path = f"/{slug}{suffix}" if root_path == "/" else f"{root_path}/{slug}{suffix}"
+            sections.append(
+                _make_section(
+                    path=section_path,
+                    parent_path=root_path,
+                    title=title,
+                    content="\n".join(chunk_lines),
+                    level=level,
+                    url=page.url,
+                )
+            )
+    return sections
+
+
+PARSERS = {"legacy": _legacy_parse_sections, "single-pass": parse_sections}
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(("lorem", "ipsum", "dolor", "sit", "amet", "`code`", "[link](/x)")) for _ in range(words))
+
+
+def _synthetic_page(rng: random.Random, index: int, *, sections: int, words: int) -> CrawledPage:
+    lines = [f"# Page {index}", _paragraph(rng, 40), ""]
+    for i in range(sections):
+        lines.append(f"{'#' * rng.choice((2, 2, 3, 4))} Heading {i} [¶](#heading-{i})")
+        for _ in range(rng.randint(2, 6)):
+            lines.extend((_paragraph(rng, words), ""))
+        if i % 5 == 0:
+            lines.extend(("```python", "def f(x):", "    return x", "```", ""))
+    return CrawledPage(url=f"https://bench.example.com/docs/page-{index}", markdown="\n".join(lines), html=None, depth=1)
+
+
+def _corpora(args: argparse.Namespace) -> dict[str, list[CrawledPage]]:
+    rng = random.Random(0)
+    real = [
+        CrawledPage(url=f"https://bench.example.com/{path.stem.lower()}-{i}", markdown=path.read_text(), html=None, depth=1)
+        for i, path in enumerate(sorted(Path(args.markdown_dir).rglob("*.md")))
+        if "node_modules" not in path.parts
+    ]
+    return {
+        "synthetic-large": [_synthetic_page(rng, i, sections=60, words=30) for i in range(args.pages)],
+        "synthetic-small": [_synthetic_page(rng, i, sections=3, words=10) for i in range(args.pages)],
+        "real-world": [real[i % len(real)] for i in range(args.pages)] if real else [],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="pages per corpus")
+    parser.add_argument("--runs", type=int, default=5, help="timed parses per corpus (best is reported)")
+    parser.add_argument("--markdown-dir", default=str(_REPO_ROOT))
+    parser.add_argument("--parsers", default="legacy,single-pass")
+    args = parser.parse_args()
+
+    print(f"{'corpus':>16} {'parser':>12} {'MB':>7} {'pages/s':>10} {'MB/s':>8} {'peak alloc (MB)':>16}")
+    for corpus, pages in _corpora(args).items():
+        if not pages:
+            continue
+        expected = [dataclasses.astuple(section) for section in parse_sections(pages)]
+        size_mb = sum(len(page.markdown.encode("utf-8")) for page in pages) / 1e6
+        for name in args.parsers.split(","):
+            parse = PARSERS[name]
+            if [dataclasses.astuple(section) for section in parse(pages)] != expected:
+                raise SystemExit(f"{name} output differs from parse_sections on {corpus}")
+
+            best = min(_timed(parse, pages) for _ in range(args.runs))
+            tracemalloc.start()
+            parse(pages)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{corpus:>16} {name:>12} {size_mb:>7.1f} {len(pages) / best:>10.0f} {size_mb / best:>8.1f} "
+                f"{peak / 1e6:>16.1f}"
+            )
+
+
+def _timed(parse, pages: list[CrawledPage]) -> float:
+    started = time.perf_counter()
+    parse(pages)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark compact vector indexes: recall@k and latency per ``SEARCH_VECTOR_INDEX``.
+
+``full`` searches the ``vector`` HNSW index directly; ``halfvec`` and
+``binary`` retrieve ``--rescore`` candidates from the compact expression
+index and rescore them on the full vectors.  Recall is measured against
+exact (brute-force) cosine neighbours computed in NumPy.  The on-disk size
+of each mode's global HNSW layout is reported next to the old one, which
+kept the ``vector`` index alongside the compact index; ``full`` is always
+run first as that baseline.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_quantized_search --sections 50000 --queries 200
+
+``POSTGRES_CONNECTION_STRING`` must point at PostgreSQL with pgvector
+>= 0.7.  The benchmark inserts its own documentation row and deletes its
+rows afterwards.  Each mode switches the global index layout, which is
+restored to ``SEARCH_VECTOR_INDEX`` at the end (rebuilding an index on the
+whole table may take a while).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session, delete, select
+
+from app.config import settings
+from app.db import engine
+from app.models import Documentation, DocumentationSection
+from app.services.documentation import _search_by_vector
+from app.services.vector_index import _INDEX_NAMES, ensure_vector_index
+
+from benchmarks.bench_vector_search import _percentile, _seed
+
+
+def _exact_neighbours(vectors: np.ndarray, ids: list, queries: np.ndarray, k: int) -> list[set]:
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarities = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    top = np.argsort(-similarities, axis=1)[:, :k]
+    return [{ids[i] for i in row} for row in top]
+
+
+def _index_size_mb(session: Session, name: str) -> float:
+    size = session.exec(text("SELECT pg_relation_size(to_regclass(:name))").bindparams(name=name)).one()[0]
+    return (size or 0) / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=settings.search_rescore_candidates)
+    parser.add_argument("--modes", default="full,halfvec,binary")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dimension = settings.embedding_dimension
+    queries = rng.standard_normal((args.queries, dimension)).astype(np.float32)
+    settings.search_rescore_candidates = args.rescore
+
+    with Session(engine) as session:
+        doc_id = _seed(session, args.sections, dimension, rng)
+        try:
+            rows = session.exec(
+                select(DocumentationSection.id, DocumentationSection.embedding).where(
+                    DocumentationSection.documentation_id == doc_id
+                )
+            ).all()
+            ids = [row[0] for row in rows]
+            vectors = np.asarray([row[1] for row in rows], dtype=np.float32)
+            expected = _exact_neighbours(vectors, ids, queries, args.k)
+
+            configured_mode = settings.search_vector_index
+            modes = ["full", *(mode for mode in args.modes.split(",") if mode != "full")]
+            full_index_mb = 0.0
+            print(
+                f"{'mode':>8} {f'recall@{args.k}':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} "
+                f"{'index (MB)':>11} {'old layout (MB)':>16}"
+            )
+            for mode in modes:
+                session.commit()
+                ensure_vector_index(session, mode)
+                index_mb = _index_size_mb(session, _INDEX_NAMES[mode])
+                if mode == "full":
+                    full_index_mb = index_mb
+                settings.search_vector_index = mode
+                for query_vector in queries[:10]:
+                    _search_by_vector(session, doc_id, query_vector, args.k, 0)
+
+                samples, recalls = [], []
+                for query_vector, truth in zip(queries, expected):
+                    started = time.perf_counter()
+                    hits, _ = _search_by_vector(session, doc_id, query_vector, args.k, 0)
+                    samples.append((time.perf_counter() - started) * 1000)
+                    recalls.append(len({hit.section.id for hit in hits} & truth) / args.k)
+                # Before compact layouts replaced it, the full index was kept next to the compact one.
+                old_layout_mb = index_mb if mode == "full" else index_mb + full_index_mb
+                print(
+                    f"{mode:>8} {statistics.fmean(recalls):>10.3f} {_percentile(samples, 50):>10.2f} "
+                    f"{_percentile(samples, 99):>10.2f} {index_mb:>11.1f} {old_layout_mb:>16.1f}"
+                )
+        finally:
+            session.rollback()
+            session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == doc_id))
+            session.exec(delete(Documentation).where(Documentation.id == doc_id))
+            session.commit()
+            settings.search_vector_index = configured_mode
+            ensure_vector_index(session)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark section column projection: bytes transferred and latency per query.
+
+``full`` reproduces the old query shapes, which load whole
+``documentation_section`` rows (content and embedding included) for the
+tree, a section listing page and a semantic search page; ``projected`` runs
+the current service functions, which select only the columns the responses
+render and cut search excerpts from a ``substr()`` prefix of the content.
+Bytes are the sizes of the result values PostgreSQL sent, read from the
+psycopg result after each statement in a separate, untimed pass.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_section_projection --sections 5000 --content-chars 8000
+
+``POSTGRES_CONNECTION_STRING`` must point at PostgreSQL with pgvector.  The
+benchmark inserts its own documentation row and deletes it afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import Float, event, func, type_coerce, update
+from sqlmodel import Session, delete, select
+
+from app.config import settings
+from app.db import engine, vector_bindparam
+from app.models import Documentation, DocumentationSection
+from app.services.documentation import _search_by_vector, get_documentation_tree, list_sections
+
+from benchmarks.bench_vector_search import _percentile, _seed
+
+
+def _full_tree(session: Session, documentation_id: uuid.UUID, query_vector, limit: int) -> None:
+    session.exec(
+        select(DocumentationSection)
+        .where(DocumentationSection.documentation_id == documentation_id)
+        .order_by(DocumentationSection.path)
+    ).all()
+
+
+def _full_list(session: Session, documentation_id: uuid.UUID, query_vector, limit: int) -> None:
+    session.exec(
+        select(DocumentationSection)
+        .where(DocumentationSection.documentation_id == documentation_id)
+        .order_by(DocumentationSection.path)
+        .limit(limit)
+    ).all()
+
+
+def _full_search(session: Session, documentation_id: uuid.UUID, query_vector, limit: int) -> None:
+    distance = type_coerce(
+        DocumentationSection.embedding.op("<=>")(vector_bindparam(query_vector)), Float
+    ).label("distance")
+    session.exec(
+        select(DocumentationSection, distance)
+        .where(DocumentationSection.documentation_id == documentation_id, DocumentationSection.embedding.is_not(None))
+        .order_by("distance")
+        .limit(limit)
+    ).all()
+
+
+QUERIES = {
+    "tree": (_full_tree, lambda session, doc_id, query_vector, limit: get_documentation_tree(session, doc_id)),
+    "list": (_full_list, lambda session, doc_id, query_vector, limit: list_sections(session, doc_id, limit, 0, None)),
+    "search": (
+        _full_search,
+        lambda session, doc_id, query_vector, limit: _search_by_vector(session, doc_id, query_vector, limit, 0),
+    ),
+}
+
+
+@contextmanager
+def _count_result_bytes(totals: list[int]):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        result = cursor.pgresult
+        if result is not None:
+            totals.append(
+                sum(result.get_length(row, col) for row in range(result.ntuples) for col in range(result.nfields))
+            )
+
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=5_000)
+    parser.add_argument("--content-chars", type=int, default=8_000, help="content length of every seeded section")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--queries", default="tree,list,search")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dimension = settings.embedding_dimension
+    query_vectors = rng.standard_normal((args.runs, dimension)).astype(np.float32)
+
+    with Session(engine) as session:
+        doc_id = _seed(session, args.sections, dimension, rng)
+        try:
+            filler = "lorem ipsum dolor sit amet "
+            session.exec(
+                update(DocumentationSection)
+                .where(DocumentationSection.documentation_id == doc_id)
+                .values(content=func.repeat(filler, args.content_chars // len(filler) + 1))
+            )
+            session.commit()
+
+            print(f"{'query':>7} {'mode':>10} {'bytes':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+            for name in args.queries.split(","):
+                for mode, run in zip(("full", "projected"), QUERIES[name]):
+                    totals: list[int] = []
+                    with _count_result_bytes(totals):
+                        run(session, doc_id, query_vectors[0], args.limit)
+                    session.expunge_all()
+
+                    samples = []
+                    for query_vector in query_vectors:
+                        started = time.perf_counter()
+                        run(session, doc_id, query_vector, args.limit)
+                        samples.append((time.perf_counter() - started) * 1000)
+                        # Drop the identity map so every run materializes its rows again.
+                        session.expunge_all()
+                    print(
+                        f"{name:>7} {mode:>10} {sum(totals):>12,} {_percentile(samples, 50):>10.2f} "
+                        f"{_percentile(samples, 99):>10.2f}"
+                    )
+        finally:
+            session.rollback()
+            session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == doc_id))
+            session.exec(delete(Documentation).where(Documentation.id == doc_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark the section delta writers (ORM row-by-row vs set-based bulk).
+
+For every size the script ingests N synthetic sections into a fresh
+documentation set, then re-ingests with ~10% of the sections changed, ~5%
+removed and ~5% added — the shape of a typical refresh.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_sections_delta --sizes 1000,10000,100000
+    uv run python -m benchmarks.bench_sections_delta --dsn sqlite://
+
+``--dsn`` defaults to ``POSTGRES_CONNECTION_STRING``.  Tables are created if
+missing; each run uses its own documentation row and deletes it afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from dataclasses import replace
+
+from sqlmodel import Session, SQLModel, create_engine, delete
+
+from app.config import settings
+from app.models import Documentation, DocumentationSection
+from app.services.ingestion import _apply_sections_delta_bulk, _apply_sections_delta_orm
+from app.services.parser import ParsedSection
+
+WRITERS = {
+    "orm": _apply_sections_delta_orm,
+    "bulk": _apply_sections_delta_bulk,
+}
+
+
+def _make_sections(count: int, *, revision: int = 0, offset: int = 0) -> list[ParsedSection]:
+    sections: list[ParsedSection] = []
+    for i in range(offset, offset + count):
+        page = i // 10
+        root = f"/page-{page}"
+        is_root = i % 10 == 0
+        path = root if is_root else f"{root}/section-{i}"
+        content = f"section {i} revision {revision} " + "lorem ipsum " * 50
+        sections.append(
+            ParsedSection(
+                path=path,
+                parent_path=None if is_root else root,
+                title=f"Section {i}",
+                summary=content[:240],
+                content=content,
+                level=1 if is_root else 2,
+                url=f"https://bench.example.com{root}",
+                token_count=len(content.split()),
+                checksum=f"{i:032x}{revision:032x}",
+            )
+        )
+    return sections
+
+
+def _refresh(sections: list[ParsedSection], count: int) -> list[ParsedSection]:
+    """~10% changed, ~5% removed, ~5% added."""
+    refreshed = []
+    for idx, section in enumerate(sections):
+        if idx % 20 == 7:
+            continue
+        if idx % 10 == 3:
+            section = replace(section, checksum="f" * 64)
+        refreshed.append(section)
+    refreshed.extend(_make_sections(count // 20, offset=count * 2))
+    return refreshed
+
+
+def _run(engine, writer_name: str, count: int) -> tuple[float, float]:
+    writer = WRITERS[writer_name]
+    initial = _make_sections(count)
+    refreshed = _refresh(initial, count)
+
+    with Session(engine) as session:
+        doc = Documentation(url=f"https://bench.example.com/{uuid.uuid4()}")
+        session.add(doc)
+        session.commit()
+        doc_id = doc.id
+
+        started = time.perf_counter()
+        writer(session, doc_id, initial)
+        initial_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        writer(session, doc_id, refreshed)
+        refresh_s = time.perf_counter() - started
+
+        session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == doc_id))
+        session.exec(delete(Documentation).where(Documentation.id == doc_id))
+        session.commit()
+
+    return initial_s, refresh_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=settings.postgres_connection_string)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--writers", default="orm,bulk")
+    args = parser.parse_args()
+
+    engine = create_engine(args.dsn)
+    SQLModel.metadata.create_all(engine)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    writers = args.writers.split(",")
+
+    print(f"{'sections':>10} {'writer':>6} {'initial (s)':>12} {'refresh (s)':>12}")
+    for count in sizes:
+        for writer_name in writers:
+            initial_s, refresh_s = _run(engine, writer_name, count)
+            print(f"{count:>10} {writer_name:>6} {initial_s:>12.3f} {refresh_s:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
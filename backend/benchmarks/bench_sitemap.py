@@ -0,0 +1,108 @@
+"""Benchmark sitemap reading: time to first URL, throughput and peak memory.
+
+``whole`` reproduces reading a sitemap the straightforward way (download the
+body, ``ElementTree.fromstring`` it, walk the tree); ``streaming`` is
+``_iter_sitemap``, which feeds an ``XMLPullParser`` as chunks arrive and
+clears finished ``<url>`` entries.  The sitemap is served from memory
+through an ``httpx.MockTransport`` in ``--chunk-kb`` pieces with
+``--chunk-delay-ms`` between them, standing in for a slow origin; time to
+first URL is how soon page fetches can start.
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_sitemap --urls 50000 --chunk-kb 64 --chunk-delay-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+import httpx
+
+from app.services.crawler import _iter_sitemap, _local_name, _parse_lastmod
+
+_SITEMAP_URL = "https://bench.example.com/sitemap.xml"
+
+
+def _sitemap(urls: int) -> bytes:
+    entries = "".join(
+        f"<url><loc>https://bench.example.com/docs/page-{i}</loc><lastmod>2026-10-{1 + i % 28:02d}</lastmod></url>"
+        for i in range(urls)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    ).encode()
+
+
+class _ChunkedBody(httpx.AsyncByteStream):
+    def __init__(self, body: bytes, chunk_bytes: int, delay: float) -> None:
+        self._body, self._chunk_bytes, self._delay = body, chunk_bytes, delay
+
+    async def __aiter__(self):
+        for start in range(0, len(self._body), self._chunk_bytes):
+            await asyncio.sleep(self._delay)
+            yield self._body[start : start + self._chunk_bytes]
+
+
+async def _whole(client: httpx.AsyncClient):
+    response = await client.get(_SITEMAP_URL)
+    for element in ElementTree.fromstring(response.content):
+        fields = {_local_name(child.tag): (child.text or "").strip() for child in element}
+        yield fields["loc"], _parse_lastmod(fields.get("lastmod"))
+
+
+async def _streaming(client: httpx.AsyncClient):
+    async for entry in _iter_sitemap(client, _SITEMAP_URL, set()):
+        yield entry
+
+
+async def _measure(read, transport: httpx.MockTransport, *, trace: bool = False) -> tuple[float, float, int, float]:
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    count = 0
+    async with httpx.AsyncClient(transport=transport) as client:
+        async for _ in read(client):
+            first = first if first is not None else time.perf_counter() - started
+            count += 1
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return first or 0.0, elapsed, count, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=50_000)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--chunk-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    body = _sitemap(args.urls)
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, stream=_ChunkedBody(body, args.chunk_kb * 1024, args.chunk_delay_ms / 1000)
+        )
+    )
+
+    print(f"sitemap: {len(body) / 1e6:.1f} MB, {args.urls:,} URLs")
+    print(f"{'mode':>10} {'first URL (ms)':>15} {'total (ms)':>11} {'URLs/s':>10} {'peak alloc (MB)':>16}")
+    for name, read in (("whole", _whole), ("streaming", _streaming)):
+        first, elapsed, count, _ = asyncio.run(_measure(read, transport))
+        # Allocation tracing slows parsing down, so the peak comes from a separate, untimed pass.
+        *_, peak = asyncio.run(_measure(read, transport, trace=True))
+        if count != args.urls:
+            raise SystemExit(f"{name} read {count} URLs, expected {args.urls}")
+        print(f"{name:>10} {first * 1000:>15.1f} {elapsed * 1000:>11.1f} {count / elapsed:>10.0f} {peak:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark semantic search latency: inlined vector literal vs bound parameter.
+
+``literal`` reproduces the old query shape (the query vector formatted into
+the SQL text as ``'[...]'::vector``, a new statement per query); ``bound``
+is the current ``_search_by_vector`` path (binary float32 parameter,
+constant SQL text, server-side prepared after ``POSTGRES_PREPARE_THRESHOLD``
+executions).
+
+Usage (from ``backend/``)::
+
+    uv run python -m benchmarks.bench_vector_search --sections 20000 --queries 500
+
+``--dsn`` defaults to ``POSTGRES_CONNECTION_STRING`` and must point at
+PostgreSQL with pgvector.  The benchmark inserts its own documentation row
+and deletes it afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+from sqlalchemy import Float, func, text, type_coerce
+from sqlmodel import Session, delete, select
+
+from app.config import settings
+from app.db import engine
+from app.models import Documentation, DocumentationSection
+from app.services.documentation import _search_by_vector
+
+
+def _literal_search(session: Session, documentation_id: uuid.UUID, query_vector: list[float], limit: int) -> None:
+    vector_str = "[" + ",".join(str(v) for v in query_vector) + "]"
+    raw_expr = DocumentationSection.embedding.op("<=>")(text(f"'{vector_str}'::vector"))
+    distance_expr = type_coerce(raw_expr, Float).label("distance")
+    base_filter = (
+        DocumentationSection.documentation_id == documentation_id,
+        DocumentationSection.embedding.is_not(None),
+    )
+    session.exec(select(func.count()).select_from(DocumentationSection).where(*base_filter)).one()
+    session.exec(select(DocumentationSection, distance_expr).where(*base_filter).order_by("distance").limit(limit)).all()
+
+
+def _bound_search(session: Session, documentation_id: uuid.UUID, query_vector: list[float], limit: int) -> None:
+    _search_by_vector(session, documentation_id, query_vector, limit, 0)
+
+
+MODES = {"literal": _literal_search, "bound": _bound_search}
+
+
+def _seed(session: Session, count: int, dimension: int, rng: np.random.Generator) -> uuid.UUID:
+    doc = Documentation(url=f"https://bench.example.com/{uuid.uuid4()}")
+    session.add(doc)
+    session.commit()
+    for start in range(0, count, 1000):
+        session.add_all(
+            DocumentationSection(
+                documentation_id=doc.id,
+                path=f"/section-{i}",
+                title=f"Section {i}",
+                content="lorem ipsum",
+                embedding=rng.standard_normal(dimension).astype(np.float32).tolist(),
+            )
+            for i in range(start, min(start + 1000, count))
+        )
+        session.commit()
+    return doc.id
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(q) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--modes", default="literal,bound")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dimension = settings.embedding_dimension
+    queries = [rng.standard_normal(dimension).astype(np.float32).tolist() for _ in range(args.queries)]
+
+    with Session(engine) as session:
+        doc_id = _seed(session, args.sections, dimension, rng)
+        try:
+            print(f"{'mode':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'mean (ms)':>10}")
+            for mode in args.modes.split(","):
+                search = MODES[mode]
+                # Warm up the pool and (for ``bound``) cross the prepare threshold.
+                for query_vector in queries[:10]:
+                    search(session, doc_id, query_vector, args.limit)
+                samples = []
+                for query_vector in queries:
+                    started = time.perf_counter()
+                    search(session, doc_id, query_vector, args.limit)
+                    samples.append((time.perf_counter() - started) * 1000)
+                print(
+                    f"{mode:>8} {_percentile(samples, 50):>10.2f} {_percentile(samples, 99):>10.2f} "
+                    f"{statistics.fmean(samples):>10.2f}"
+                )
+        finally:
+            session.rollback()
+            session.exec(delete(DocumentationSection).where(DocumentationSection.documentation_id == doc_id))
+            session.exec(delete(Documentation).where(Documentation.id == doc_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run ``@pytest.mark.anyio`` tests on asyncio only — the runtime the worker uses."""
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _disable_search_cache(monkeypatch):
+    """No Redis in unit tests; cache behaviour is tested against a fake in test_search_cache."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "search_cache_enabled", False)
+
+
+class FakeRedis:
+    """In-memory stand-in for the few Redis commands the search cache uses."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.expiry: dict[str, int | None] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+        return int(self.data[key])
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    from app.services import search_cache
+
+    fake = FakeRedis()
+    monkeypatch.setattr(search_cache, "redis_client", fake)
+    monkeypatch.setattr(search_cache.settings, "search_cache_enabled", True)
+    return fake
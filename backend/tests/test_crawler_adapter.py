@@ -1,7 +1,12 @@
 import asyncio
+import functools
+import gzip
+from datetime import datetime, timezone
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
+
 from app.services import crawler
 
 
@@ -13,12 +18,16 @@ class FakeResult:
         html: str = "",
         success: bool = True,
         depth: int = 0,
+        links: list[str] | None = None,
+        headers: dict[str, str] | None = None,
     ):
         self.url = url
         self.success = success
         self.markdown = markdown
         self.html = html
         self.metadata = {"depth": depth}
+        self.links = {"internal": [{"href": href} for href in links or []], "external": []}
+        self.response_headers = headers or {}
 
 
 def test_normalize_url_removes_fragment_and_query_and_trailing_slash():
@@ -122,3 +131,227 @@ def test_build_filter_chain_with_exclude_patterns():
 def test_build_filter_chain_with_both_patterns():
     chain = crawler._build_filter_chain(["*docs*"], ["*old*"])
     assert chain is not None
+
+
+def test_crawl_site_stream_yields_pages_as_they_arrive():
+    """crawl_site_stream enables Crawl4AI streaming and maps each result."""
+    fake_results = [
+        FakeResult(url="https://example.com", markdown="# Home", depth=0),
+        FakeResult(url="https://example.com/bad", markdown="", depth=1, success=False),
+        FakeResult(url="https://example.com/a", markdown="# A", depth=1),
+    ]
+
+    async def fake_stream():
+        for result in fake_results:
+            yield result
+
+    captured = {}
+
+    async def fake_arun(url, config):
+        captured["stream"] = config.stream
+        return fake_stream()
+
+    fake_crawler = MagicMock()
+    fake_crawler.__aenter__ = AsyncMock(return_value=fake_crawler)
+    fake_crawler.__aexit__ = AsyncMock(return_value=False)
+    fake_crawler.arun = fake_arun
+
+    async def collect():
+        return [page async for page in crawler.crawl_site_stream(start_url="https://example.com")]
+
+    with patch.object(crawler, "AsyncWebCrawler", return_value=fake_crawler):
+        pages = asyncio.run(collect())
+
+    assert captured["stream"] is True
+    assert [page.url for page in pages] == ["https://example.com", "https://example.com/a"]
+    assert pages[1].depth == 1
+
+
+def test_crawled_page_keeps_validators_and_internal_links():
+    result = FakeResult(
+        url="https://example.com",
+        markdown="# Home",
+        links=["https://example.com/a/", "https://example.com/a#intro", "https://example.com/b?x=1"],
+        headers={"ETag": '"v1"', "Last-Modified": "Wed, 14 Oct 2026 10:00:00 GMT"},
+    )
+
+    page = crawler._to_crawled_page(result, "https://example.com")
+
+    assert page.etag == '"v1"'
+    assert page.last_modified == "Wed, 14 Oct 2026 10:00:00 GMT"
+    assert page.links == ["https://example.com/a", "https://example.com/b"]
+    assert page.not_modified is False
+
+
+def test_recrawl_site_renders_only_pages_that_changed():
+    validators = {
+        "https://example.com/": crawler.PageValidator(etag='"home"', last_modified=None, links=["https://example.com/a"]),
+        "https://example.com/a": crawler.PageValidator(etag='"a-old"', last_modified=None, links=[]),
+    }
+    conditional_headers = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        conditional_headers[str(request.url)] = request.headers.get("if-none-match")
+        if request.headers.get("if-none-match") == '"home"':
+            return httpx.Response(304, headers={"ETag": '"home"'})
+        return httpx.Response(200, text="<html>changed</html>")
+
+    rendered = []
+
+    async def fake_arun_many(urls, config):
+        rendered.append(list(urls))
+        return [
+            FakeResult(
+                url=url,
+                markdown=f"# {url}",
+                links=["https://example.com/b", "https://example.com/old/page", "https://other.example.com/x"],
+                headers={"ETag": '"new"'},
+            )
+            for url in urls
+        ]
+
+    fake_crawler = MagicMock()
+    fake_crawler.__aenter__ = AsyncMock(return_value=fake_crawler)
+    fake_crawler.__aexit__ = AsyncMock(return_value=False)
+    fake_crawler.arun_many = fake_arun_many
+
+    async def collect():
+        return await crawler.recrawl_site(
+            "https://example.com/", validators, max_depth=2, exclude_patterns=["*/old/*"]
+        )
+
+    mock_client = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    with (
+        patch.object(crawler, "AsyncWebCrawler", return_value=fake_crawler),
+        patch.object(crawler.httpx, "AsyncClient", mock_client),
+    ):
+        pages = asyncio.run(collect())
+
+    # Only pages with stored validators get a conditional request.
+    assert conditional_headers == {"https://example.com": '"home"', "https://example.com/a": '"a-old"'}
+    assert rendered == [["https://example.com/a"], ["https://example.com/b"]]
+
+    home, a, b = pages
+    assert (home.url, home.not_modified, home.markdown, home.links) == (
+        "https://example.com/",
+        True,
+        "",
+        ["https://example.com/a"],
+    )
+    assert (a.url, a.not_modified, a.depth, a.etag) == ("https://example.com/a", False, 1, '"new"')
+    assert (b.url, b.depth) == ("https://example.com/b", 2)
+
+
+def _run_sitemap_crawl(handler, fake_arun_many, **kwargs):
+    fake_crawler = MagicMock()
+    fake_crawler.__aenter__ = AsyncMock(return_value=fake_crawler)
+    fake_crawler.__aexit__ = AsyncMock(return_value=False)
+    fake_crawler.arun_many = fake_arun_many
+
+    async def collect():
+        return [page async for page in crawler.crawl_sitemap_stream(**kwargs)]
+
+    mock_client = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    with (
+        patch.object(crawler, "AsyncWebCrawler", return_value=fake_crawler),
+        patch.object(crawler.httpx, "AsyncClient", mock_client),
+    ):
+        return asyncio.run(collect())
+
+
+def test_crawl_sitemap_stream_follows_indexes_and_skips_pages_unchanged_since_last_sync():
+    urlset = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/docs/a</loc><lastmod>2026-10-01T08:00:00+00:00</lastmod></url>
+  <url><loc>https://example.com/docs/b</loc><lastmod>2026-10-12</lastmod></url>
+  <url><loc>https://example.com/docs/c/</loc></url>
+  <url><loc>https://example.com/docs/d</loc><lastmod>2026-10-10</lastmod></url>
+  <url><loc>https://example.com/docs/old/x</loc></url>
+  <url><loc>https://blog.example.com/docs/y</loc></url>
+  <url><loc>https://example.com/docs/a#again</loc></url>
+</urlset>"""
+    index = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-docs.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-missing.xml</loc></sitemap>
+</sitemapindex>"""
+    bodies = {
+        "/robots.txt": b"User-agent: *\nSitemap: https://example.com/sitemap_index.xml\n",
+        "/sitemap_index.xml": index.encode(),
+        "/sitemap-docs.xml.gz": gzip.compress(urlset.encode()),
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = bodies.get(request.url.path)
+        return httpx.Response(200, content=body) if body is not None else httpx.Response(404)
+
+    rendered = []
+
+    async def fake_arun_many(urls, config):
+        rendered.extend(urls)
+        return [FakeResult(url=url, markdown=f"# {url}") for url in urls]
+
+    pages = _run_sitemap_crawl(
+        handler,
+        fake_arun_many,
+        start_url="https://example.com/docs/",
+        exclude_patterns=["*/old/*"],
+        known_urls=["https://example.com/docs/a", "https://example.com/docs/b", "https://example.com/docs/d"],
+        last_synced=datetime(2026, 10, 10, 12, 0),
+    )
+
+    # a is unchanged since the last sync; d's date-only lastmod may be later that day.
+    assert [(page.url, page.not_modified) for page in pages] == [
+        ("https://example.com/docs/a", True),
+        ("https://example.com/docs/b", False),
+        ("https://example.com/docs/c", False),
+        ("https://example.com/docs/d", False),
+    ]
+    assert rendered == ["https://example.com/docs/b", "https://example.com/docs/c", "https://example.com/docs/d"]
+
+
+def test_crawl_sitemap_stream_keeps_listed_pages_outside_the_start_path():
+    urlset = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/docs/a</loc></url>
+  <url><loc>https://example.com/api/b</loc><lastmod>2026-10-01</lastmod></url>
+  <url><loc>https://example.com/changelog</loc></url>
+</urlset>"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, content=urlset.encode())
+        return httpx.Response(404)
+
+    async def fake_arun_many(urls, config):
+        return [FakeResult(url=url, markdown=f"# {url}") for url in urls]
+
+    # Link-following from /docs/ reaches (and stores) any page on the host; the sitemap must not drop them.
+    pages = _run_sitemap_crawl(
+        handler,
+        fake_arun_many,
+        start_url="https://example.com/docs/",
+        known_urls=["https://example.com/docs/a", "https://example.com/api/b"],
+        last_synced=datetime(2026, 10, 10, 12, 0),
+    )
+
+    assert sorted((page.url, page.not_modified) for page in pages) == [
+        ("https://example.com/api/b", True),
+        ("https://example.com/changelog", False),
+        ("https://example.com/docs/a", False),
+    ]
+
+
+def test_crawl_sitemap_stream_yields_nothing_without_a_sitemap():
+    fake_arun_many = AsyncMock(return_value=[])
+
+    pages = _run_sitemap_crawl(lambda request: httpx.Response(404), fake_arun_many, start_url="https://example.com")
+
+    assert pages == []
+    fake_arun_many.assert_not_called()
+
+
+def test_parse_lastmod_treats_dates_as_end_of_day():
+    assert crawler._parse_lastmod("2026-10-10") == datetime(2026, 10, 11, tzinfo=timezone.utc)
+    assert crawler._parse_lastmod("2026-10-10T08:00:00Z") == datetime(2026, 10, 10, 8, tzinfo=timezone.utc)
+    assert crawler._parse_lastmod("yesterday") is None
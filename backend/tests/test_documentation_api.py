@@ -9,7 +9,16 @@ from sqlmodel import Session, SQLModel, create_engine, select
 
 from app.db import get_session
 from app.main import create_app
-from app.models import Documentation, DocumentationSection, IngestionJob, IngestionStatus, RawPage
+from app.models import (
+    Documentation,
+    DocumentationSection,
+    DocumentationSectionChunk,
+    DocumentationTree,
+    DocumentationTreeEntry,
+    IngestionJob,
+    IngestionStatus,
+    RawPage,
+)
 
 
 engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
@@ -32,7 +41,15 @@ def client():
 
 def _reset_data() -> None:
     with Session(engine) as session:
-        for model in [DocumentationSection, IngestionJob, RawPage, Documentation]:
+        for model in [
+            DocumentationTreeEntry,
+            DocumentationTree,
+            DocumentationSectionChunk,
+            DocumentationSection,
+            IngestionJob,
+            RawPage,
+            Documentation,
+        ]:
             for row in session.exec(select(model)).all():
                 session.delete(row)
         session.commit()
@@ -104,6 +121,64 @@ def test_documentation_list_pagination(client: TestClient):
     assert payload["meta"]["total"] == 2
     assert len(payload["items"]) == 1
     assert payload["items"][0]["id"] != str(first_id)
+    assert (payload["meta"]["total_kind"], payload["meta"]["has_more"]) == ("exact", True)
+
+
+def test_total_none_derives_has_more_without_counting(client: TestClient):
+    _reset_data()
+    doc_id = _seed_doc()
+
+    first = client.get(f"/documentation/{doc_id}", params={"limit": 2, "total": "none"}).json()
+    assert first["meta"].pop("next_cursor")
+    assert first["meta"] == {"total": None, "limit": 2, "offset": 0, "total_kind": "none", "has_more": True}
+    assert len(first["items"]) == 2
+
+    # The last page knows its total without a COUNT.
+    last = client.get(f"/documentation/{doc_id}", params={"limit": 2, "offset": 2, "total": "none"}).json()
+    assert last["meta"] == {
+        "total": 3,
+        "limit": 2,
+        "offset": 2,
+        "total_kind": "exact",
+        "has_more": False,
+        "next_cursor": None,
+    }
+
+    # Estimates need the PostgreSQL planner; elsewhere no total is reported.
+    search = client.get(
+        f"/documentation/{doc_id}/search", params={"q": "router", "limit": 1, "total": "estimate", "mode": "keyword"}
+    ).json()
+    assert (search["meta"]["total_kind"], search["meta"]["has_more"], len(search["items"])) == ("none", True, 1)
+
+
+def test_estimate_count_explains_row_query_without_aggregate(monkeypatch):
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.documentation import estimate_count
+
+    executed = []
+
+    class FakeConnection:
+        def exec_driver_sql(self, statement, params):
+            executed.append((statement, params))
+            return SimpleNamespace(scalar=lambda: [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}])
+
+    pg_session = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()), connection=lambda: FakeConnection()
+    )
+    doc_id = uuid.uuid4()
+    count_query = select(func.count()).select_from(DocumentationSection).where(
+        DocumentationSection.documentation_id == doc_id
+    )
+
+    assert estimate_count(pg_session, count_query) == 1234
+    statement, params = executed[0]
+    assert statement.startswith("EXPLAIN (FORMAT JSON) SELECT 1")
+    assert "FROM documentation_section" in statement
+    assert "count(" not in statement
+    assert list(params.values()) == [doc_id]
 
 
 def test_sections_list_with_start_path(client: TestClient):
@@ -153,6 +228,70 @@ def test_get_tree_structure_ordering(client: TestClient):
     assert "/guide/intro" in child_paths
 
 
+def test_tree_is_served_from_the_stored_copy_with_etag(client: TestClient):
+    from app.services.documentation import refresh_documentation_tree
+
+    _reset_data()
+    doc_id = _seed_doc()
+
+    # Built on first request for documentation sets ingested before trees were stored.
+    first = client.get(f"/documentation/{doc_id}/tree")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert first.json()["documentation_id"] == str(doc_id)
+    assert [root["path"] for root in first.json()["roots"]] == ["/guide"]
+
+    unchanged = client.get(f"/documentation/{doc_id}/tree", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert (unchanged.status_code, unchanged.content, unchanged.headers["etag"]) == (304, b"", etag)
+
+    with Session(engine) as session:
+        session.add(DocumentationSection(documentation_id=doc_id, path="/api", title="API", level=1))
+        session.commit()
+        # Served as stored until the next ingestion run rebuilds it.
+        assert client.get(f"/documentation/{doc_id}/tree", headers={"If-None-Match": etag}).status_code == 304
+        assert refresh_documentation_tree(session, doc_id).version != etag.strip('"')
+        # A rebuild over unchanged sections keeps the version.
+        version = session.exec(select(DocumentationTree.version)).one()
+        assert refresh_documentation_tree(session, doc_id).version == version
+
+    rebuilt = client.get(f"/documentation/{doc_id}/tree", headers={"If-None-Match": etag})
+    assert rebuilt.status_code == 200 and rebuilt.headers["etag"] == f'"{version}"'
+    assert [root["path"] for root in rebuilt.json()["roots"]] == ["/api", "/guide"]
+
+    assert client.delete(f"/documentation/{doc_id}").status_code == 204
+    assert client.get(f"/documentation/{doc_id}/tree").status_code == 404
+    with Session(engine) as session:
+        assert session.exec(select(DocumentationTree)).all() == []
+
+
+def test_tree_can_be_read_lazily_by_root_path_and_depth(client: TestClient):
+    _reset_data()
+    doc_id = _seed_doc()
+    with Session(engine) as session:
+        # Parent inferred from the path (no parent_id).
+        session.add(DocumentationSection(documentation_id=doc_id, path="/guide/intro/install", title="Install", level=3))
+        session.commit()
+
+    full = client.get(f"/documentation/{doc_id}/tree")
+    top = client.get(f"/documentation/{doc_id}/tree", params={"depth": 1})
+    assert top.headers["etag"] == full.headers["etag"]
+    [guide] = top.json()["roots"]
+    assert (guide["path"], guide["child_count"], guide["children"]) == ("/guide", 2, [])
+
+    expanded = client.get(f"/documentation/{doc_id}/tree", params={"root_path": "/guide", "depth": 1}).json()
+    assert [(node["path"], node["child_count"], node["children"]) for node in expanded["roots"]] == [
+        ("/guide/advanced", 0, []),
+        ("/guide/intro", 1, []),
+    ]
+    # Without a depth the whole subtree comes back, matching the full tree.
+    subtree = client.get(f"/documentation/{doc_id}/tree", params={"root_path": "/guide"}).json()
+    assert subtree["roots"] == full.json()["roots"][0]["children"]
+    assert subtree["roots"][1]["children"][0]["path"] == "/guide/intro/install"
+
+    missing = client.get(f"/documentation/{doc_id}/tree", params={"root_path": "/nope", "depth": 1})
+    assert missing.status_code == 404
+
+
 def test_keyword_search_relevance_and_mode(client: TestClient):
     _reset_data()
     doc_id = _seed_doc()
@@ -165,9 +304,28 @@ def test_keyword_search_relevance_and_mode(client: TestClient):
     assert payload["items"][0]["score"] >= payload["items"][1]["score"]
 
 
-def test_delete_documentation_cascade(client: TestClient):
+def test_delete_documentation_cascade(client: TestClient, monkeypatch):
     _reset_data()
     doc_id = _seed_doc()
+    dropped_indexes = []
+    monkeypatch.setattr(
+        "app.services.documentation.drop_documentation_vector_indexes",
+        lambda session, documentation_id: dropped_indexes.append(documentation_id),
+    )
+    monkeypatch.setattr("app.services.documentation.settings.search_vector_index_scope", "global")
+    with Session(engine) as session:
+        section = session.exec(select(DocumentationSection).where(DocumentationSection.path == "/guide")).one()
+        session.add(
+            DocumentationSectionChunk(
+                section_id=section.id,
+                documentation_id=doc_id,
+                chunk_index=0,
+                start_offset=0,
+                end_offset=13,
+                embedding=[0.1, 0.2],
+            )
+        )
+        session.commit()
 
     response = client.delete(f"/documentation/{doc_id}")
     assert response.status_code == 204
@@ -177,8 +335,11 @@ def test_delete_documentation_cascade(client: TestClient):
 
     with Session(engine) as session:
         assert session.exec(select(func.count()).select_from(DocumentationSection)).one() == 0
+        assert session.exec(select(func.count()).select_from(DocumentationSectionChunk)).one() == 0
         assert session.exec(select(func.count()).select_from(IngestionJob)).one() == 0
         assert session.exec(select(func.count()).select_from(RawPage)).one() == 0
+    # Partial indexes left from an earlier per-documentation scope are dropped too.
+    assert dropped_indexes == [doc_id]
 
 
 def test_validation_errors(client: TestClient):
@@ -193,3 +354,552 @@ def test_validation_errors(client: TestClient):
 
     bad_id = client.get("/documentation/not-a-uuid")
     assert bad_id.status_code == 422
+
+
+@pytest.mark.parametrize("aggregation, aggregate_sql", [("max", "max(greatest("), ("sum", "sum(greatest(")])
+def test_chunk_search_aggregates_nearest_chunks_per_section(aggregation: str, aggregate_sql: str):
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    from app.db import vector_bindparam
+    from app.services.documentation import _chunk_search_statements
+
+    def compile_for(vector):
+        rows, count = _chunk_search_statements(
+            uuid.uuid4(), vector_bindparam(vector), 10, 20, aggregation=aggregation, candidates=200
+        )
+        return rows.compile(dialect=psycopg.dialect()), count.compile(dialect=psycopg.dialect())
+
+    rows, count = compile_for([0.1, 0.2])
+    sql = str(rows)
+
+    # Nearest chunks first (index-ordered, bounded), then one score per section.
+    assert "ORDER BY documentation_section_chunk.embedding <=> %(query_vector)s" in sql
+    assert rows.params["param_2"] == 200
+    assert aggregate_sql in sql
+    assert "GROUP BY candidate_chunks.section_id" in sql
+    assert "ORDER BY section_scores.score DESC" in sql
+    assert (rows.params["param_3"], rows.params["param_4"]) == (10, 20)
+    assert "count(*)" in str(count)
+    # The query vector is a bound parameter: statement text is identical for every vector.
+    assert str(compile_for([0.9, -0.3])[0]) == sql
+
+
+def test_vector_bindparam_passes_float32_array_through():
+    import numpy as np
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    from app.db import VectorParam, vector_bindparam
+
+    param = vector_bindparam([0.25, 0.5, 1.0])
+
+    assert isinstance(param.type, VectorParam)
+    assert param.type.bind_processor(psycopg.dialect()) is None
+    assert param.value.dtype == np.float32
+    assert param.value.tolist() == [0.25, 0.5, 1.0]
+
+
+def test_keyword_search_uses_fulltext_index_on_postgres():
+    from sqlalchemy.dialects import postgresql
+
+    from app.services.documentation import _fulltext_search_statements
+
+    rows, count = _fulltext_search_statements(uuid.uuid4(), '"route handler" -legacy', 10, 20)
+    sql = str(rows.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    count_sql = str(count.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "documentation_section.search_vector @@ websearch_to_tsquery(CAST('english' AS REGCONFIG)" in sql
+    assert "ts_rank_cd(documentation_section.search_vector" in sql
+    # Headlines are computed outside the ranked page subquery, i.e. only for returned rows.
+    assert sql.index("ts_headline") < sql.index("FROM documentation_section JOIN")
+    assert "LIMIT 10 OFFSET 20) AS ranked" in sql
+    assert "ilike" not in sql.lower()
+    assert "search_vector @@" in count_sql
+
+
+def test_listing_and_search_queries_never_load_section_content():
+    from sqlalchemy.dialects.postgresql import psycopg
+    from sqlalchemy.exc import InvalidRequestError
+
+    from app.db import vector_bindparam
+    from app.services.documentation import _vector_search_statements, list_sections, search_sections_keyword
+
+    _reset_data()
+    doc_id = _seed_doc()
+    with Session(engine) as session:
+        sections, _ = list_sections(session, doc_id, 10, 0, None)
+        with pytest.raises(InvalidRequestError):
+            sections[0].content
+        hits, _ = search_sections_keyword(session, doc_id, "router", 10, 0)
+        # Excerpts are cut from the bounded content prefix fetched alongside the row.
+        assert {hit.excerpt for hit in hits} >= {"router in intro section"}
+        with pytest.raises(InvalidRequestError):
+            hits[0].section.content
+
+    rows, _ = _vector_search_statements(
+        uuid.uuid4(), vector_bindparam([0.1, 0.2]), 10, 0, index_kind="full", rescore_candidates=0, query="Router"
+    )
+    compiled = rows.compile(dialect=psycopg.dialect())
+    match = "strpos(lower(documentation_section.content), lower(%(excerpt_query)s::VARCHAR))"
+    assert str(compiled).startswith(
+        "SELECT documentation_section.id, documentation_section.documentation_id, documentation_section.path, "
+        "documentation_section.title, documentation_section.summary, "
+        "documentation_section.embedding <=> %(query_vector)s AS distance, "
+        f"substr(documentation_section.content, CASE WHEN ({match} > 40) THEN {match} - 40 ELSE 1 END, "
+        "%(substr_1)s::INTEGER) AS content_window \nFROM"
+    )
+    assert (compiled.params["excerpt_query"], compiled.params["substr_1"]) == ("Router", 2000)
+
+
+def test_search_excerpts_come_from_around_a_match_deep_in_the_content():
+    from app.services.documentation import search_sections_keyword
+
+    _reset_data()
+    doc_id = _seed_doc()
+    with Session(engine) as session:
+        section = session.exec(select(DocumentationSection).where(DocumentationSection.path == "/guide")).one()
+        section.content = "filler text " * 1000 + "configure the Dispatcher here"
+        session.add(section)
+        session.commit()
+
+        hits, _ = search_sections_keyword(session, doc_id, "dispatcher", 10, 0)
+
+    assert [hit.section.path for hit in hits] == ["/guide"]
+    assert hits[0].excerpt.endswith("configure the Dispatcher here")
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    from app.services.documentation import SearchHit, reciprocal_rank_fusion
+
+    a, b, c = (DocumentationSection(documentation_id=uuid.uuid4(), path=path) for path in ("/a", "/b", "/c"))
+    semantic = [SearchHit(a, 0.9), SearchHit(b, 0.8)]
+    keyword = [SearchHit(b, 6.0, excerpt="**b** excerpt"), SearchHit(c, 1.0)]
+
+    fused = reciprocal_rank_fusion([semantic, keyword], k=60)
+
+    assert [hit.section.path for hit in fused] == ["/b", "/a", "/c"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0].excerpt == "**b** excerpt"
+    assert fused[1].excerpt is None
+
+
+def test_hybrid_search_fuses_semantic_and_keyword(client: TestClient, monkeypatch):
+    from app.services.documentation import PaginationResult, SearchHit
+
+    _reset_data()
+    doc_id = _seed_doc()
+    with Session(engine) as session:
+        for section in session.exec(select(DocumentationSection)).all():
+            section.embedding = [0.1, 0.2]
+            session.add(section)
+        session.commit()
+
+    async def fake_embed_query(text: str) -> list[float]:
+        return [0.1, 0.2]
+
+    def fake_search_by_vector(session, documentation_id, query_vector, limit, offset, **tuning):
+        # The vector ranking misses the exact "router" match the lexical search finds.
+        by_path = {s.path: s for s in session.exec(select(DocumentationSection)).all()}
+        hits = [SearchHit(by_path[path], 0.9 - i * 0.1) for i, path in enumerate(["/guide", "/guide/advanced", "/guide/intro"])]
+        return hits[offset : offset + limit], PaginationResult(total=len(hits), limit=limit, offset=offset)
+
+    monkeypatch.setattr("app.services.embedding.embed_query", fake_embed_query)
+    monkeypatch.setattr("app.services.documentation._search_by_vector", fake_search_by_vector)
+
+    response = client.get(f"/documentation/{doc_id}/search", params={"q": "router", "mode": "hybrid"})
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["search_mode"] == "hybrid"
+    assert [item["path"] for item in payload["items"]] == ["/guide/intro", "/guide/advanced", "/guide"]
+    assert payload["meta"]["total"] == 3
+
+    page = client.get(f"/documentation/{doc_id}/search", params={"q": "router", "mode": "hybrid", "limit": 1, "offset": 1})
+    assert [item["path"] for item in page.json()["items"]] == ["/guide/advanced"]
+
+    keyword_only = client.get(f"/documentation/{doc_id}/search", params={"q": "router", "mode": "keyword"})
+    assert keyword_only.json()["search_mode"] == "keyword"
+    assert {item["path"] for item in keyword_only.json()["items"]} == {"/guide/intro", "/guide/advanced"}
+
+
+def test_cached_search_skips_embedding(client: TestClient, fake_redis, monkeypatch):
+    from app.services import search_cache
+    from app.services.documentation import PaginationResult, SearchHit
+
+    _reset_data()
+    doc_id = _seed_doc()
+    with Session(engine) as session:
+        for section in session.exec(select(DocumentationSection)).all():
+            section.embedding = [0.1, 0.2]
+            session.add(section)
+        session.commit()
+
+    embed_calls = []
+    tunings = []
+
+    async def fake_embed_query(text: str) -> list[float]:
+        embed_calls.append(text)
+        return [0.1, 0.2]
+
+    def fake_search_by_vector(session, documentation_id, query_vector, limit, offset, **tuning):
+        tunings.append(tuning)
+        section = session.exec(select(DocumentationSection).where(DocumentationSection.path == "/guide")).one()
+        return [SearchHit(section, 0.9)], PaginationResult(total=1, limit=limit, offset=offset)
+
+    monkeypatch.setattr("app.services.embedding.embed_query", fake_embed_query)
+    monkeypatch.setattr("app.services.documentation._search_by_vector", fake_search_by_vector)
+
+    first = client.get(f"/documentation/{doc_id}/search", params={"q": "router"})
+    second = client.get(f"/documentation/{doc_id}/search", params={"q": "router"})
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["search_mode"] == "semantic"
+    assert embed_calls == ["router"]
+
+    search_cache.invalidate_search_cache(doc_id)
+    client.get(f"/documentation/{doc_id}/search", params={"q": "router"})
+    assert embed_calls == ["router", "router"]
+
+    # HNSW tuning is forwarded to the search and is part of the cache key.
+    tuned = client.get(
+        f"/documentation/{doc_id}/search", params={"q": "router", "ef_search": 128, "iterative_scan": "strict_order"}
+    )
+    assert tuned.status_code == 200
+    assert tunings[-1] == {
+        "ef_search": 128,
+        "iterative_scan": "strict_order",
+        "total_mode": "exact",
+        "after": None,
+        "query": "router",
+    }
+    assert len(tunings) == 3
+
+
+@pytest.mark.parametrize(
+    "index_kind, compact_sql",
+    [
+        ("halfvec", "CAST(documentation_section.embedding AS HALFVEC(2)) <=> CAST(%(query_vector)s AS HALFVEC(2))"),
+        ("binary", "CAST(binary_quantize(documentation_section.embedding) AS BIT(2)) <~> binary_quantize(%(query_vector)s)"),
+    ],
+)
+def test_compact_vector_index_search_rescores_candidates(monkeypatch, index_kind: str, compact_sql: str):
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    from app.db import vector_bindparam
+    from app.services import documentation
+
+    monkeypatch.setattr(documentation.settings, "embedding_dimension", 2)
+    rows, _ = documentation._vector_search_statements(
+        uuid.uuid4(), vector_bindparam([0.1, 0.2]), 10, 20, index_kind=index_kind, rescore_candidates=200
+    )
+    compiled = rows.compile(dialect=psycopg.dialect())
+    sql = str(compiled)
+
+    # Candidates come from the compact index expression; the page is ordered by exact distance.
+    assert f"ORDER BY {compact_sql}" in sql
+    assert ") AS candidates ON candidates.id = documentation_section.id" in sql
+    assert "ORDER BY distance" in sql
+    assert compiled.params["param_1"] == 200
+
+
+def test_full_vector_index_search_has_no_rescoring_stage():
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    from app.db import vector_bindparam
+    from app.services.documentation import _vector_search_statements
+
+    rows, _ = _vector_search_statements(
+        uuid.uuid4(), vector_bindparam([0.1, 0.2]), 10, 0, index_kind="full", rescore_candidates=200
+    )
+    sql = str(rows.compile(dialect=psycopg.dialect()))
+
+    assert "candidates" not in sql
+    assert "documentation_section.embedding <=> %(query_vector)s" in sql
+
+
+def test_per_documentation_vector_indexes_are_partial_and_dropped_with_all_kinds(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import vector_index
+
+    statements: list[str] = []
+    monkeypatch.setattr(vector_index, "_execute_autocommit", lambda session, statement: statements.append(statement))
+    monkeypatch.setattr(
+        vector_index, "_query_autocommit", lambda session, statement, **params: [(0,)] if "count" in statement else []
+    )
+    monkeypatch.setattr(vector_index.settings, "embedding_dimension", 2)
+    pg_session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    doc_id = uuid.uuid4()
+
+    assert vector_index.ensure_vector_index(pg_session, "halfvec", documentation_id=doc_id) is True
+    vector_index.drop_documentation_vector_indexes(pg_session, doc_id)
+
+    assert statements[0] == (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_section_embedding_halfvec_{doc_id.hex} "
+        "ON documentation_section USING hnsw ((embedding::halfvec(2)) halfvec_cosine_ops) "
+        f"WHERE documentation_id = '{doc_id}'::uuid"
+    )
+    assert statements[1:] == [
+        f"DROP INDEX CONCURRENTLY IF EXISTS ix_section_embedding_{kind}_{doc_id.hex}"
+        for kind in ("full", "halfvec", "binary")
+    ]
+    assert all(len(statement.split()[-1]) <= 63 for statement in statements[1:])
+
+
+def test_global_vector_index_replaces_the_indexes_of_other_modes(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import vector_index
+
+    statements: list[str] = []
+    monkeypatch.setattr(vector_index, "_execute_autocommit", lambda session, statement: statements.append(statement))
+    monkeypatch.setattr(
+        vector_index, "_query_autocommit", lambda session, statement, **params: [(0,)] if "count" in statement else []
+    )
+    monkeypatch.setattr(vector_index.settings, "embedding_dimension", 2)
+    pg_session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+    assert vector_index.ensure_vector_index(pg_session, "binary") is True
+    assert vector_index.ensure_vector_index(pg_session, "full") is True
+
+    assert statements == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documentation_section_embedding_binary ON documentation_section "
+        "USING hnsw ((binary_quantize(embedding)::bit(2)) bit_hamming_ops)",
+        # The full-precision HNSW index goes only after the compact one is built; the column stays.
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_documentation_section_embedding",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_documentation_section_embedding_halfvec",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documentation_section_embedding ON documentation_section "
+        "USING hnsw (embedding vector_cosine_ops)",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_documentation_section_embedding_halfvec",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_documentation_section_embedding_binary",
+    ]
+
+
+def test_vector_index_left_invalid_by_a_failed_build_is_rebuilt(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.services import vector_index
+
+    statements: list[str] = []
+    monkeypatch.setattr(vector_index, "_execute_autocommit", lambda session, statement: statements.append(statement))
+    # A cancelled CREATE INDEX CONCURRENTLY left the full index behind as INVALID.
+    invalid = {"ix_documentation_section_embedding"}
+    monkeypatch.setattr(
+        vector_index,
+        "_query_autocommit",
+        lambda session, statement, **params: [(False,)] if params["name"] in invalid else [],
+    )
+    pg_session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+    assert vector_index.ensure_vector_index(pg_session, "full") is True
+
+    assert statements[:2] == [
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_documentation_section_embedding",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_documentation_section_embedding ON documentation_section "
+        "USING hnsw (embedding vector_cosine_ops)",
+    ]
+
+
+@pytest.mark.parametrize("existing, created", [(None, False), ((True,), True)])
+def test_per_documentation_vector_indexes_stop_at_the_configured_limit(monkeypatch, existing, created):
+    from types import SimpleNamespace
+
+    from app.services import vector_index
+
+    statements: list[str] = []
+
+    def fake_query(session, statement, **params):
+        if "count" in statement:
+            return [(3,)]
+        return [existing] if existing else []
+
+    monkeypatch.setattr(vector_index, "_execute_autocommit", lambda session, statement: statements.append(statement))
+    monkeypatch.setattr(vector_index, "_query_autocommit", fake_query)
+    monkeypatch.setattr(vector_index.settings, "search_vector_index_max_partial", 3)
+    pg_session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+    # At the limit no new partial index is created, but one that already exists is still maintained.
+    assert vector_index.ensure_vector_index(pg_session, "full", documentation_id=uuid.uuid4()) is created
+    assert len(statements) == int(created)
+
+
+@pytest.mark.parametrize(
+    "kwargs, defaults, expected",
+    [
+        # Nothing requested and the page fits pgvector's default list: leave the server alone.
+        ({"min_ef_search": 20}, (0, "default"), []),
+        # Deep pages / rescoring raise ef_search so the scan can return enough rows.
+        ({"min_ef_search": 200}, (0, "default"), [("hnsw.ef_search", "200")]),
+        # Past pgvector's ef_search limit an iterative scan keeps deep pages full, unless turned off.
+        (
+            {"min_ef_search": 5000},
+            (0, "default"),
+            [("hnsw.ef_search", "1000"), ("hnsw.iterative_scan", "strict_order")],
+        ),
+        ({"min_ef_search": 5000}, (0, "off"), [("hnsw.ef_search", "1000"), ("hnsw.iterative_scan", "off")]),
+        # Per-request values win over settings.
+        (
+            {"ef_search": 64, "iterative_scan": "strict_order", "min_ef_search": 20},
+            (100, "relaxed_order"),
+            [("hnsw.ef_search", "64"), ("hnsw.iterative_scan", "strict_order")],
+        ),
+        ({"min_ef_search": 20}, (100, "relaxed_order"), [("hnsw.ef_search", "100"), ("hnsw.iterative_scan", "relaxed_order")]),
+        # Per-documentation partial indexes are only usable by custom plans.
+        ({"min_ef_search": 20}, (0, "default", "documentation"), [("plan_cache_mode", "force_custom_plan")]),
+    ],
+)
+def test_apply_hnsw_tuning_sets_transaction_local_parameters(monkeypatch, kwargs, defaults, expected):
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import postgresql
+
+    from app.services import documentation
+
+    monkeypatch.setattr(documentation.settings, "search_hnsw_ef_search", defaults[0])
+    monkeypatch.setattr(documentation.settings, "search_hnsw_iterative_scan", defaults[1])
+    monkeypatch.setattr(documentation.settings, "search_vector_index_scope", (*defaults, "global")[2])
+    executed = []
+    pg_session = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        exec=executed.append,
+    )
+
+    documentation.apply_hnsw_tuning(pg_session, **kwargs)
+
+    compiled = [statement.compile(dialect=postgresql.dialect()) for statement in executed]
+    assert all("set_config(" in str(statement) for statement in compiled)
+    assert [tuple(statement.params.values())[:2] for statement in compiled] == expected
+    assert all(tuple(statement.params.values())[2] is True for statement in compiled)
+
+
+def test_cursor_pagination_walks_sections_and_keyword_search(client: TestClient):
+    _reset_data()
+    doc_id = _seed_doc()
+
+    def walk(url: str, params: dict) -> list[str]:
+        paths, cursor = [], None
+        while True:
+            page = client.get(url, params={**params, "limit": 1, **({"cursor": cursor} if cursor else {})})
+            assert page.status_code == 200
+            payload = page.json()
+            paths += [item["path"] for item in payload["items"]]
+            cursor = payload["meta"]["next_cursor"]
+            if cursor is None:
+                assert payload["meta"]["has_more"] is False
+                return paths
+
+    listed = client.get(f"/documentation/{doc_id}", params={"limit": 10}).json()
+    assert walk(f"/documentation/{doc_id}", {}) == [item["path"] for item in listed["items"]]
+
+    searched = client.get(f"/documentation/{doc_id}/search", params={"q": "router", "mode": "keyword"}).json()
+    assert walk(f"/documentation/{doc_id}/search", {"q": "router", "mode": "keyword"}) == [
+        item["path"] for item in searched["items"]
+    ]
+
+    # Cursors report their depth as the page offset.
+    second = client.get(f"/documentation/{doc_id}", params={"limit": 1}).json()["meta"]["next_cursor"]
+    assert client.get(f"/documentation/{doc_id}", params={"limit": 1, "cursor": second}).json()["meta"]["offset"] == 1
+
+
+def test_invalid_cursors_are_rejected(client: TestClient):
+    _reset_data()
+    doc_id = _seed_doc()
+    sections_cursor = client.get(f"/documentation/{doc_id}", params={"limit": 1}).json()["meta"]["next_cursor"]
+
+    assert client.get(f"/documentation/{doc_id}", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(f"/documentation/{doc_id}", params={"cursor": sections_cursor, "offset": 5}).status_code == 400
+    wrong_kind = client.get(
+        f"/documentation/{doc_id}/search", params={"q": "router", "mode": "keyword", "cursor": sections_cursor}
+    )
+    assert wrong_kind.status_code == 400
+
+
+def test_vector_search_cursor_is_a_distance_path_keyset():
+    from sqlalchemy.dialects.postgresql import psycopg
+
+    from app.db import vector_bindparam
+    from app.services.cursor import Cursor, decode_cursor, encode_cursor
+    from app.services.documentation import _vector_search_statements
+
+    cursor = decode_cursor(encode_cursor(Cursor(kind="vector", position=40, path="/guide", value=0.25)))
+    rows, _ = _vector_search_statements(
+        uuid.uuid4(), vector_bindparam([0.1, 0.2]), 10, cursor.position, index_kind="full", rescore_candidates=0, after=cursor
+    )
+    compiled = rows.compile(dialect=psycopg.dialect())
+    sql = str(compiled)
+
+    assert "(documentation_section.embedding <=> %(query_vector)s) > %(param_1)s" in sql
+    assert "documentation_section.path > %(path_1)s" in sql
+    # The HNSW scan is ordered by distance alone; the page is then sorted by the keyset.
+    assert "ORDER BY documentation_section.embedding <=> %(query_vector)s \n LIMIT %(param_3)s" in sql
+    assert sql.endswith(
+        "ORDER BY distance, documentation_section.path \n LIMIT %(param_4)s::INTEGER OFFSET %(param_5)s::INTEGER"
+    )
+    assert compiled.params["param_5"] == 0
+    assert (compiled.params["param_1"], compiled.params["path_1"]) == (0.25, "/guide")
+
+
+def test_vector_search_pages_through_tied_distances_without_skipping():
+    import json
+    import math
+    import re
+
+    from app.db import vector_bindparam
+    from app.services.cursor import Cursor
+    from app.services.documentation import _vector_search_statements
+
+    _reset_data()
+    with Session(engine) as session:
+        doc = Documentation(url="https://ties.example.com", title="Ties", crawl_depth=1)
+        session.add(doc)
+        session.commit()
+        # Identical texts share a distance; inserted so that rowid order is the reverse of path order.
+        embeddings = {"/e": [1.0, 0.0], "/d": [0.0, 1.0], "/c": [0.0, 1.0], "/b": [0.0, 1.0], "/a": [-1.0, 0.0]}
+        for path, embedding in embeddings.items():
+            session.add(
+                DocumentationSection(
+                    documentation_id=doc.id,
+                    path=path,
+                    title=path,
+                    content=path,
+                    level=1,
+                    token_count=1,
+                    checksum=path,
+                    embedding=embedding,
+                )
+            )
+        session.commit()
+        doc_id = doc.id
+
+    def cosine_distance(left: str, right: str) -> float:
+        a, b = json.loads(left), json.loads(right)
+        return 1 - sum(x * y for x, y in zip(a, b)) / (math.hypot(*a) * math.hypot(*b))
+
+    def page(after: Cursor | None) -> list[tuple[str, float]]:
+        rows, _ = _vector_search_statements(
+            doc_id, vector_bindparam([1.0, 0.0]), 2, 0, index_kind="full", rescore_candidates=0, after=after
+        )
+        with Session(engine) as session:
+            connection = session.connection()
+            connection.connection.driver_connection.create_function("cosine_distance", 2, cosine_distance)
+            compiled = rows.compile(dialect=connection.dialect)
+            # SQLite has no <=> operator; run the same statement with the distance as a function.
+            sql = re.sub(r"(documentation_section\.embedding) <=> \?", r"cosine_distance(\1, ?)", str(compiled))
+            params = []
+            for value in (compiled.params[name] for name in compiled.positiontup):
+                if isinstance(value, uuid.UUID):
+                    value = value.hex
+                elif hasattr(value, "tolist"):
+                    value = json.dumps(value.tolist())
+                params.append(value)
+            return [(row.path, row.distance) for row in connection.exec_driver_sql(sql, tuple(params))]
+
+    pages, after = [], None
+    while True:
+        rows = page(after)
+        if not rows:
+            break
+        pages.append([path for path, _ in rows])
+        path, distance = rows[-1]
+        after = Cursor(kind="vector", position=2 * len(pages), path=path, value=distance)
+
+    # The tie at distance 1 spans the first page boundary and is returned in path order, none skipped.
+    assert pages == [["/e", "/b"], ["/c", "/d"], ["/a"]]
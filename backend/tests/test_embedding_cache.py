@@ -0,0 +1,113 @@
+"""Tests for the content-hash embedding cache (app/services/embedding_cache.py)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models import EmbeddingCacheEntry
+from app.services.embedding_cache import EmbeddingCache, evict_embedding_cache
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db_session:
+        yield db_session
+
+
+@pytest.fixture(autouse=True)
+def _reset_embedder():
+    import app.services.embedding as mod
+
+    mod._embedder = None
+    yield
+    mod._embedder = None
+
+
+def test_cache_round_trip_is_scoped_to_model_and_dimension(session):
+    cache = EmbeddingCache(session, model="model-a", dimension=2)
+    key = EmbeddingCache.key("hello")
+    cache.put_many({key: [0.1, 0.2]})
+
+    found = cache.get_many([key, EmbeddingCache.key("other")])
+    assert list(found) == [key]
+    assert found[key].dtype == np.float32
+    assert found[key].tolist() == pytest.approx([0.1, 0.2])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    other_model = EmbeddingCache(session, model="model-b", dimension=2)
+    assert other_model.get_many([key]) == {}
+
+    # Re-putting an existing key is a no-op rather than an integrity error.
+    cache.put_many({key: [0.9, 0.9]})
+    assert cache.get_many([key])[key].tolist() == pytest.approx([0.1, 0.2])
+
+
+def test_cache_writes_are_left_to_the_callers_transaction(session):
+    cache = EmbeddingCache(session, model="model-a", dimension=2)
+    cache.put_many({EmbeddingCache.key("hello"): [0.1, 0.2]})
+    assert cache.get_many([EmbeddingCache.key("hello")])
+
+    session.rollback()
+
+    assert session.exec(select(EmbeddingCacheEntry)).all() == []
+
+
+def test_evict_applies_ttl_then_lru_limit(session):
+    now = datetime.now(timezone.utc)
+    for idx, age_days in enumerate([0, 1, 2, 400]):
+        session.add(
+            EmbeddingCacheEntry(
+                embedding_model="m",
+                dimension=1,
+                text_sha256=f"{idx:064d}",
+                embedding=[float(idx)],
+                last_used_at=now - timedelta(days=age_days),
+            )
+        )
+    session.commit()
+
+    evicted = evict_embedding_cache(session, ttl_days=30, max_entries=2)
+
+    assert evicted == 2
+    remaining = sorted(entry.text_sha256 for entry in session.exec(select(EmbeddingCacheEntry)).all())
+    assert remaining == [f"{0:064d}", f"{1:064d}"]
+
+
+@patch("app.services.embedding.settings")
+@patch("app.services.embedding.Embedder")
+@pytest.mark.anyio
+async def test_embed_sections_only_sends_cache_misses(mock_embedder_cls, mock_settings, session):
+    mock_settings.embedding_model = "test-model"
+    mock_settings.embedding_batch_size = 10
+    mock_settings.embedding_max_batch_tokens = 100_000
+    mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_dimension = 2
+    mock_settings.embedding_token_limit = 8192
+
+    cache = EmbeddingCache(session, model="test-model", dimension=2)
+    cache.put_many({EmbeddingCache.key("cached"): [1.0, 1.0]})
+
+    result = MagicMock()
+    result.embeddings = [[0.5, 0.5]]
+    mock_instance = MagicMock()
+    mock_instance.embed_documents = AsyncMock(return_value=result)
+    mock_embedder_cls.return_value = mock_instance
+
+    from app.services.embedding import embed_sections
+
+    vectors = await embed_sections(["cached", "fresh", "fresh"], cache=cache)
+
+    assert [vector.tolist() for vector in vectors] == [[1.0, 1.0], [0.5, 0.5], [0.5, 0.5]]
+    mock_instance.embed_documents.assert_called_once_with(["fresh"])
+    assert (cache.hits, cache.misses) == (1, 1)
+    # The fresh vector is now cached for the next documentation set.
+    assert EmbeddingCache(session, model="test-model", dimension=2).get_many([EmbeddingCache.key("fresh")])
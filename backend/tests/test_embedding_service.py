@@ -5,6 +5,7 @@ from __future__ import annotations
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 
 
@@ -13,12 +14,15 @@ import pytest
 
 @pytest.fixture(autouse=True)
 def _reset_embedder():
-    """Reset module-level embedder singleton between tests."""
+    """Reset module-level embedder singleton and query embedding cache between tests."""
     import app.services.embedding as mod
+    from app.services.query_embedding_cache import get_query_embedding_cache
 
     mod._embedder = None
+    get_query_embedding_cache().clear()
     yield
     mod._embedder = None
+    get_query_embedding_cache().clear()
 
 
 def _make_embedding_result(vectors: list[list[float]]):
@@ -35,8 +39,13 @@ async def test_embed_sections_single_batch(mock_embedder_cls, mock_settings):
     """Test embedding a small number of texts in a single batch."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 10
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 3
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 4
+    mock_settings.embedding_token_limit = 8192
 
     vectors = [[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]]
     mock_instance = MagicMock()
@@ -48,8 +57,9 @@ async def test_embed_sections_single_batch(mock_embedder_cls, mock_settings):
     result = await embed_sections(["text1", "text2"], doc_id=uuid.uuid4())
 
     assert len(result) == 2
-    assert result[0] == [0.1, 0.2, 0.3, 0.4]
-    assert result[1] == [0.5, 0.6, 0.7, 0.8]
+    assert result[0].dtype == np.float32
+    assert result[0].tolist() == pytest.approx([0.1, 0.2, 0.3, 0.4])
+    assert result[1].tolist() == pytest.approx([0.5, 0.6, 0.7, 0.8])
     mock_instance.embed_documents.assert_called_once()
 
 
@@ -60,8 +70,13 @@ async def test_embed_sections_multiple_batches(mock_embedder_cls, mock_settings)
     """Test that texts are split into batches correctly."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 2
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 3
+    mock_settings.embedding_token_limit = 8192
 
     batch1 = [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]
     batch2 = [[0.7, 0.8, 0.9]]
@@ -87,7 +102,11 @@ async def test_embed_sections_dimension_mismatch(mock_embedder_cls, mock_setting
     """Test that a dimension mismatch raises ValueError."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 10
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 4
 
     wrong_dim = [[0.1, 0.2, 0.3]]  # expected 4, got 3
@@ -108,7 +127,11 @@ async def test_embed_sections_retry_on_transient_error(mock_embedder_cls, mock_s
     """Test that transient errors are retried."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 10
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 3
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 2
 
     good_result = _make_embedding_result([[0.1, 0.2]])
@@ -133,7 +156,11 @@ async def test_embed_sections_max_retries_exhausted(mock_embedder_cls, mock_sett
     """Test that RuntimeError is raised after all retries are exhausted."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 10
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 2
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 2
 
     mock_instance = MagicMock()
@@ -200,7 +227,11 @@ async def test_embed_sections_truncation(mock_embedder_cls, mock_settings):
     """Test that extremely long texts are truncated before embedding."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 1
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 2
     mock_settings.embedding_token_limit = 8192
 
@@ -235,7 +266,11 @@ async def test_embed_sections_truncation_custom_limit(mock_embedder_cls, mock_se
     """Test truncation with a custom token limit (e.g. 4096 for smaller models)."""
     mock_settings.embedding_model = "test-model"
     mock_settings.embedding_batch_size = 1
+    mock_settings.embedding_max_batch_tokens = 100_000
     mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
     mock_settings.embedding_dimension = 2
     mock_settings.embedding_token_limit = 4096
 
@@ -259,3 +294,187 @@ async def test_embed_sections_truncation_custom_limit(mock_embedder_cls, mock_se
     assert len(call_args) == 1
     assert len(call_args[0]) == expected_max_chars
 
+
+
+# ─── concurrent batch executor ───────────────────────────────────
+
+
+class FakeLatencyEmbedder:
+    """Embedder double that sleeps per request and records peak concurrency.
+
+    ``failures`` is a list of exceptions raised by the first calls, in order.
+    """
+
+    def __init__(self, latency_s: float, dimension: int, failures: list[Exception] | None = None):
+        self.latency_s = latency_s
+        self.dimension = dimension
+        self.failures = list(failures or [])
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def embed_documents(self, batch: list[str]):
+        import asyncio
+
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+            if self.failures:
+                raise self.failures.pop(0)
+            # Encode the text's number so callers can check ordering.
+            return _make_embedding_result([[float(text.removeprefix("t"))] * self.dimension for text in batch])
+        finally:
+            self.in_flight -= 1
+
+
+def _configure_concurrency(mock_settings, concurrency: int, batch_size: int = 1) -> None:
+    mock_settings.embedding_model = "test-model"
+    mock_settings.embedding_batch_size = batch_size
+    mock_settings.embedding_max_batch_tokens = 100_000
+    mock_settings.embedding_max_retries = 3
+    mock_settings.embedding_concurrency = concurrency
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
+    mock_settings.embedding_dimension = 2
+    mock_settings.embedding_token_limit = 8192
+
+
+@patch("app.services.embedding.settings")
+@pytest.mark.anyio
+async def test_embed_sections_runs_batches_concurrently_and_keeps_order(mock_settings):
+    import time
+
+    import app.services.embedding as mod
+
+    texts = [f"t{i}" for i in range(16)]
+    timings = {}
+    for concurrency in (1, 4):
+        _configure_concurrency(mock_settings, concurrency)
+        fake = FakeLatencyEmbedder(latency_s=0.02, dimension=2)
+        mod._embedder = fake
+
+        started = time.perf_counter()
+        result = await mod.embed_sections(texts)
+        timings[concurrency] = time.perf_counter() - started
+
+        assert [vector.tolist() for vector in result] == [[float(i)] * 2 for i in range(16)]
+        assert fake.max_in_flight == concurrency
+
+    assert timings[4] < timings[1] / 2
+
+
+@patch("app.services.embedding.settings")
+@pytest.mark.anyio
+async def test_embed_sections_shrinks_concurrency_on_throttling(mock_settings):
+    import app.services.embedding as mod
+
+    _configure_concurrency(mock_settings, concurrency=4)
+
+    class ThrottlingException(Exception):
+        pass
+
+    fake = FakeLatencyEmbedder(
+        latency_s=0.01,
+        dimension=2,
+        failures=[ThrottlingException("Rate exceeded"), ThrottlingException("Rate exceeded")],
+    )
+    mod._embedder = fake
+
+    observed_limits = []
+    original_on_throttle = mod._AdaptiveLimiter.on_throttle
+
+    def recording_on_throttle(self):
+        original_on_throttle(self)
+        observed_limits.append(self.limit)
+
+    with patch.object(mod._AdaptiveLimiter, "on_throttle", recording_on_throttle):
+        result = await mod.embed_sections([f"t{i}" for i in range(8)])
+
+    assert [vector.tolist() for vector in result] == [[float(i)] * 2 for i in range(8)]
+    assert observed_limits == [2, 1]
+    assert fake.calls == 10  # 8 batches + 2 retried throttled attempts
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    import app.services.embedding as mod
+
+    with patch.object(mod, "settings") as mock_settings:
+        mock_settings.embedding_backoff_base_seconds = 1.0
+        mock_settings.embedding_backoff_max_seconds = 5.0
+        delays = [mod._backoff_delay(attempt) for attempt in (1, 2, 3, 10) for _ in range(50)]
+
+    assert all(0 <= delay <= 5.0 for delay in delays)
+    assert max(delays[:50]) <= 1.0
+    assert len(set(delays)) > 1
+
+
+# ─── token-aware batch planning ──────────────────────────────────
+
+
+def test_plan_batches_packs_by_token_budget_and_item_cap():
+    from app.services.embedding import plan_batches
+
+    texts = ["a" * 10, "b" * 10, "c" * 25, "d" * 5, "e" * 5, "f" * 5, "g" * 5, "h" * 5]
+
+    batches = plan_batches(texts, max_tokens=30, max_items=3, estimate=len)
+
+    # 10+10 fits, +25 would overflow; 25+5 fills the budget; then the item cap splits at three.
+    assert batches == [[0, 1], [2, 3], [4, 5, 6], [7]]
+
+
+def test_plan_batches_gives_oversized_text_its_own_batch():
+    from app.services.embedding import plan_batches
+
+    batches = plan_batches(["x" * 5, "y" * 100, "z" * 5], max_tokens=20, max_items=10, estimate=len)
+
+    assert batches == [[0], [1], [2]]
+    assert plan_batches([], max_tokens=20, max_items=10) == []
+
+
+@patch("app.services.embedding.settings")
+@patch("app.services.embedding.Embedder")
+@pytest.mark.anyio
+async def test_embed_sections_uses_token_budget_and_custom_estimator(mock_embedder_cls, mock_settings):
+    mock_settings.embedding_model = "test-model"
+    mock_settings.embedding_batch_size = 64
+    mock_settings.embedding_max_batch_tokens = 10
+    mock_settings.embedding_max_retries = 1
+    mock_settings.embedding_concurrency = 1
+    mock_settings.embedding_backoff_base_seconds = 0
+    mock_settings.embedding_backoff_max_seconds = 0
+    mock_settings.embedding_dimension = 1
+    mock_settings.embedding_token_limit = 8192
+
+    instance = mock_embedder_cls.return_value
+    instance.embed_documents = AsyncMock(
+        side_effect=lambda batch: _make_embedding_result([[float(len(text))] for text in batch])
+    )
+
+    def word_count(text: str) -> int:
+        return len(text.split())
+
+    from app.services.embedding import embed_sections
+
+    texts = ["one two three four", "five six seven", "eight nine", "ten " * 12]
+    result = await embed_sections(texts, estimate=word_count)
+
+    sent = [call.args[0] for call in instance.embed_documents.call_args_list]
+    assert sent == [texts[:3], [texts[3]]]
+    assert result == [[float(len(text))] for text in texts]
+
+
+def test_split_chunks_overlaps_and_covers_text():
+    from app.services.embedding import split_chunks
+
+    text = " ".join(f"w{i}" for i in range(10))
+
+    spans = split_chunks(text, chunk_tokens=4, overlap_tokens=1)
+
+    assert [text[start:end] for start, end in spans] == [
+        "w0 w1 w2 w3",
+        "w3 w4 w5 w6",
+        "w6 w7 w8 w9",
+    ]
+    assert split_chunks("short text", chunk_tokens=4, overlap_tokens=1) == [(0, len("short text"))]
@@ -45,6 +45,8 @@ def test_ingestion_api_start_status_stop(monkeypatch, client: TestClient):
     status_response = client.get(f"/documentation/ingestion/{payload['job_id']}")
     assert status_response.status_code == 200
     assert status_response.json()["job_id"] == payload["job_id"]
+    assert status_response.json()["embedding_cache_hits"] == 0
+    assert status_response.json()["embedding_cache_misses"] == 0
 
     stop_response = client.post("/documentation/ingestion/stop", json={"job_id": payload["job_id"]})
     assert stop_response.status_code == 200
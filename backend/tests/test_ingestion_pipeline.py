@@ -1,12 +1,24 @@
 import asyncio
+import json
 import uuid
+from datetime import datetime, timedelta, timezone
 
+import pytest
 from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, SQLModel, create_engine, select
 
-from app.models import Documentation, DocumentationSection, IngestionJob, IngestionStatus
+from app.models import (
+    Documentation,
+    DocumentationSection,
+    DocumentationSectionChunk,
+    DocumentationTree,
+    IngestionJob,
+    IngestionStatus,
+    PageFingerprint,
+)
 from app.services.crawler import CrawledPage
 from app.services.ingestion import run_ingestion_pipeline
+from app.services import parser
 from app.services.parser import ParsedSection
 
 
@@ -47,7 +59,7 @@ def test_ingestion_pipeline_completes_and_upserts_delta(monkeypatch):
         ]
 
     monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
-    monkeypatch.setattr("app.services.ingestion.parse_sections", fake_parse_sections)
+    monkeypatch.setattr("app.services.parser.parse_sections", fake_parse_sections)
 
     asyncio.run(run_ingestion_pipeline(session, job.id))
     first_sections = session.exec(select(DocumentationSection)).all()
@@ -62,6 +74,10 @@ def test_ingestion_pipeline_completes_and_upserts_delta(monkeypatch):
     assert len(first_sections) == 1
     assert len(second_sections) == 1
 
+    # The tree is stored at the end of the run, ready to be served as is.
+    tree = session.get(DocumentationTree, doc.id)
+    assert [node["path"] for node in json.loads(tree.roots_json)] == ["/example/home"]
+
 
 def test_ingestion_pipeline_marks_stopped_when_requested(monkeypatch):
     session = _make_session()
@@ -145,7 +161,7 @@ def test_ingestion_pipeline_no_changes_still_completes(monkeypatch):
         return []
 
     monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
-    monkeypatch.setattr("app.services.ingestion.parse_sections", fake_parse_sections)
+    monkeypatch.setattr("app.services.parser.parse_sections", fake_parse_sections)
     monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
 
     asyncio.run(run_ingestion_pipeline(session, job.id))
@@ -156,3 +172,527 @@ def test_ingestion_pipeline_no_changes_still_completes(monkeypatch):
         f"Expected COMPLETED but got {refreshed_job.status}; error: {refreshed_job.error_message}"
     )
     assert not embed_called, "embed_sections should NOT be called when no sections changed"
+
+
+def _markdown_page(url: str, title: str) -> CrawledPage:
+    return CrawledPage(url=url, markdown=f"# {title}\n{title} body text", html=None, depth=0)
+
+
+def test_streaming_pipeline_overlaps_stages_and_prunes_stale(monkeypatch):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    stale = DocumentationSection(documentation_id=doc.id, path="/gone", title="Gone", checksum="old")
+    session.add(stale)
+    job = IngestionJob(documentation_id=doc.id)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    first_batch_embedded = asyncio.Event()
+    embedded_texts: list[str] = []
+
+    async def fake_crawl_site_stream(**kwargs):
+        yield _markdown_page("https://example.com/a", "Alpha")
+        # The second page is only produced once the first page's sections have
+        # been embedded, which can only happen if the stages overlap.
+        await asyncio.wait_for(first_batch_embedded.wait(), timeout=5)
+        yield _markdown_page("https://example.com/b", "Beta")
+
+    async def fake_crawl_site(**kwargs):
+        raise AssertionError("batch crawl should not run in streaming mode")
+
+    async def fake_embed_sections(texts, **kwargs):
+        embedded_texts.extend(texts)
+        first_batch_embedded.set()
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion.settings.ingestion_streaming", True)
+    monkeypatch.setattr("app.services.ingestion.crawl_site_stream", fake_crawl_site_stream)
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+
+    asyncio.run(run_ingestion_pipeline(session, job.id))
+
+    refreshed_job = session.get(IngestionJob, job.id)
+    assert refreshed_job.status == IngestionStatus.COMPLETED, refreshed_job.error_message
+    assert refreshed_job.pages_processed == 2
+
+    sections = session.exec(select(DocumentationSection).order_by(DocumentationSection.path)).all()
+    assert [s.path for s in sections] == ["/a", "/b"]
+    assert all(s.embedding == [0.5, 0.5] for s in sections)
+    assert len(embedded_texts) == 2
+
+
+def test_streaming_pipeline_honours_stop_request(monkeypatch):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    job = IngestionJob(documentation_id=doc.id)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    job_id = job.id
+
+    async def fake_crawl_site_stream(**kwargs):
+        stored = session.get(IngestionJob, job_id)
+        stored.stop_requested = True
+        session.add(stored)
+        session.commit()
+        yield _markdown_page("https://example.com/a", "Alpha")
+
+    monkeypatch.setattr("app.services.ingestion.settings.ingestion_streaming", True)
+    monkeypatch.setattr("app.services.ingestion.crawl_site_stream", fake_crawl_site_stream)
+
+    asyncio.run(run_ingestion_pipeline(session, job_id))
+
+    refreshed_job = session.get(IngestionJob, job_id)
+    assert refreshed_job.status == IngestionStatus.STOPPED
+    assert session.exec(select(DocumentationSection)).all() == []
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_reingestion_skips_unchanged_pages(monkeypatch, streaming):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    crawled = [
+        _markdown_page("https://example.com/a", "Alpha"),
+        _markdown_page("https://example.com/b", "Beta"),
+        _markdown_page("https://example.com/c", "Gamma"),
+    ]
+    parsed_urls: list[str] = []
+    embedded_texts: list[str] = []
+    real_parse_sections = parser.parse_sections
+
+    def spy_parse_sections(pages):
+        parsed_urls.extend(page.url for page in pages)
+        return real_parse_sections(pages)
+
+    async def fake_crawl_site(**kwargs):
+        return list(crawled)
+
+    async def fake_crawl_site_stream(**kwargs):
+        for page in list(crawled):
+            yield page
+
+    async def fake_embed_sections(texts, **kwargs):
+        embedded_texts.extend(texts)
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion.settings.ingestion_streaming", streaming)
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.ingestion.crawl_site_stream", fake_crawl_site_stream)
+    monkeypatch.setattr("app.services.parser.parse_sections", spy_parse_sections)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+
+    def run() -> None:
+        job = IngestionJob(documentation_id=doc.id)
+        session.add(job)
+        session.commit()
+        asyncio.run(run_ingestion_pipeline(session, job.id))
+        assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+
+    run()
+    assert sorted(parsed_urls) == [page.url for page in crawled]
+    fingerprints = session.exec(select(PageFingerprint).order_by(PageFingerprint.url)).all()
+    assert [(fp.url, fp.section_paths) for fp in fingerprints] == [
+        ("https://example.com/a", ["/a"]),
+        ("https://example.com/b", ["/b"]),
+        ("https://example.com/c", ["/c"]),
+    ]
+
+    # Nothing changed: no page is parsed or embedded and every section stays.
+    parsed_urls.clear()
+    embedded_texts.clear()
+    run()
+    assert parsed_urls == []
+    assert embedded_texts == []
+    assert len(session.exec(select(DocumentationSection)).all()) == 3
+
+    # One page changed and one disappeared: only the changed page is parsed,
+    # and the missing page's sections and fingerprint are pruned.
+    crawled[1] = _markdown_page("https://example.com/b", "Beta v2")
+    del crawled[2]
+    run()
+    assert parsed_urls == ["https://example.com/b"]
+    assert len(embedded_texts) == 1
+    sections = session.exec(select(DocumentationSection).order_by(DocumentationSection.path)).all()
+    assert [(s.path, s.title) for s in sections] == [("/a", "Alpha"), ("/b", "Beta v2")]
+    fingerprints = session.exec(select(PageFingerprint).order_by(PageFingerprint.url)).all()
+    assert [fp.url for fp in fingerprints] == ["https://example.com/a", "https://example.com/b"]
+
+    # A parser version bump invalidates every fingerprint.
+    parsed_urls.clear()
+    monkeypatch.setattr("app.services.ingestion.PARSER_VERSION", parser.PARSER_VERSION + 1)
+    run()
+    assert sorted(parsed_urls) == ["https://example.com/a", "https://example.com/b"]
+
+
+def test_revalidating_recrawl_carries_not_modified_pages_forward(monkeypatch):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    def crawled(url: str, title: str) -> CrawledPage:
+        page = _markdown_page(url, title)
+        page.etag = f'"{title}"'
+        page.links = ["https://example.com/b"] if url.endswith("/a") else []
+        return page
+
+    parsed_urls: list[str] = []
+    recrawl_validators = {}
+    real_parse_sections = parser.parse_sections
+
+    def spy_parse_sections(pages):
+        parsed_urls.extend(page.url for page in pages)
+        return real_parse_sections(pages)
+
+    async def fake_crawl_site(**kwargs):
+        return [crawled("https://example.com/a", "Alpha"), crawled("https://example.com/b", "Beta")]
+
+    async def fake_recrawl_site(*, validators, concurrency, **kwargs):
+        recrawl_validators.update(validators)
+        not_modified = CrawledPage(
+            url="https://example.com/a", markdown="", html=None, depth=0, etag='"Alpha"', not_modified=True
+        )
+        return [not_modified, crawled("https://example.com/b", "Beta v2")]
+
+    async def fake_embed_sections(texts, **kwargs):
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion.settings.crawl_revalidate", True)
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.ingestion.recrawl_site", fake_recrawl_site)
+    monkeypatch.setattr("app.services.parser.parse_sections", spy_parse_sections)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+
+    for _ in range(2):
+        job = IngestionJob(documentation_id=doc.id)
+        session.add(job)
+        session.commit()
+        asyncio.run(run_ingestion_pipeline(session, job.id))
+        assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+
+    # The second run revalidated with the stored ETags and links, and parsed only the page that changed.
+    assert {url: (v.etag, v.links) for url, v in recrawl_validators.items()} == {
+        "https://example.com/a": ('"Alpha"', ["https://example.com/b"]),
+        "https://example.com/b": ('"Beta"', []),
+    }
+    assert parsed_urls == ["https://example.com/a", "https://example.com/b", "https://example.com/b"]
+    sections = session.exec(select(DocumentationSection).order_by(DocumentationSection.path)).all()
+    assert [(s.path, s.title) for s in sections] == [("/a", "Alpha"), ("/b", "Beta v2")]
+    assert session.get(PageFingerprint, (doc.id, "https://example.com/b")).etag == '"Beta v2"'
+
+
+def test_sitemap_discovery_falls_back_to_link_following(monkeypatch):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    sitemap_calls = []
+    sitemap_pages: list[CrawledPage] = []
+    bfs_calls = []
+
+    async def fake_crawl_sitemap_stream(**kwargs):
+        sitemap_calls.append(kwargs)
+        for page in sitemap_pages:
+            yield page
+
+    async def fake_crawl_site(**kwargs):
+        bfs_calls.append(kwargs)
+        return [_markdown_page("https://example.com/a", "Alpha")]
+
+    async def fake_embed_sections(texts, **kwargs):
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion.settings.crawl_discovery_mode", "sitemap")
+    monkeypatch.setattr("app.services.ingestion.crawl_sitemap_stream", fake_crawl_sitemap_stream)
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+
+    def run() -> None:
+        job = IngestionJob(documentation_id=doc.id)
+        session.add(job)
+        session.commit()
+        asyncio.run(run_ingestion_pipeline(session, job.id))
+        assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+
+    # No sitemap: the BFS crawl runs instead.
+    run()
+    assert len(sitemap_calls) == 1
+    assert len(bfs_calls) == 1
+
+    # With a sitemap, its pages are used; fingerprinted pages and the last sync time are passed along.
+    sitemap_pages.extend(
+        [
+            CrawledPage(url="https://example.com/a", markdown="", html=None, depth=0, not_modified=True),
+            _markdown_page("https://example.com/b", "Beta"),
+        ]
+    )
+    run()
+    assert len(bfs_calls) == 1
+    assert sitemap_calls[1]["known_urls"] == ["https://example.com/a"]
+    assert sitemap_calls[1]["last_synced"] is not None
+    sections = session.exec(select(DocumentationSection).order_by(DocumentationSection.path)).all()
+    assert [s.path for s in sections] == ["/a", "/b"]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_page_edited_during_a_sitemap_sync_is_fetched_by_the_next_one(monkeypatch, streaming: bool):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    clock = iter(datetime(2026, 10, 17, tzinfo=timezone.utc) + timedelta(seconds=tick) for tick in range(10_000))
+    # The page's sitemap lastmod; it is edited while the first sync is crawling.
+    lastmod: dict[str, datetime] = {}
+    titles = iter(["Alpha", "Alpha v2"])
+
+    async def fake_crawl_sitemap_stream(*, last_synced, known_urls, **kwargs):
+        url = "https://example.com/a"
+        if url in known_urls and url in lastmod and lastmod[url] <= last_synced.replace(tzinfo=timezone.utc):
+            yield CrawledPage(url=url, markdown="", html=None, depth=0, not_modified=True)
+            return
+        page = _markdown_page(url, next(titles))
+        lastmod[url] = next(clock)
+        yield page
+
+    async def fake_embed_sections(texts, **kwargs):
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion._utcnow", lambda: next(clock))
+    monkeypatch.setattr("app.services.ingestion.settings.crawl_discovery_mode", "sitemap")
+    monkeypatch.setattr("app.services.ingestion.settings.ingestion_streaming", streaming)
+    monkeypatch.setattr("app.services.ingestion.crawl_sitemap_stream", fake_crawl_sitemap_stream)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+
+    for _ in range(2):
+        job = IngestionJob(documentation_id=doc.id)
+        session.add(job)
+        session.commit()
+        asyncio.run(run_ingestion_pipeline(session, job.id))
+        assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+
+    # last_synced is the start of the sync, so the mid-crawl edit is newer than it.
+    assert [s.title for s in session.exec(select(DocumentationSection)).all()] == ["Alpha v2"]
+
+
+def _parsed(path: str, parent_path: str | None, checksum: str) -> ParsedSection:
+    return ParsedSection(
+        path=path,
+        parent_path=parent_path,
+        title=path,
+        summary="summary",
+        content="content",
+        level=1 if parent_path is None else 2,
+        url="https://example.com" + path,
+        token_count=1,
+        checksum=checksum,
+    )
+
+
+def _section_state(session, doc_id):
+    rows = session.exec(
+        select(DocumentationSection).where(DocumentationSection.documentation_id == doc_id)
+    ).all()
+    by_id = {row.id: row.path for row in rows}
+    return sorted((row.path, row.checksum, by_id.get(row.parent_id)) for row in rows)
+
+
+def test_bulk_delta_writer_matches_orm_writer():
+    from app.services.ingestion import _apply_sections_delta_bulk, _apply_sections_delta_orm
+
+    first_run = [_parsed("/a", None, "1"), _parsed("/a/x", "/a", "2"), _parsed("/b", None, "3")]
+    second_run = [
+        _parsed("/a", None, "1"),  # unchanged
+        _parsed("/a/x", "/a", "2-changed"),
+        _parsed("/c", None, "4"),  # new root
+        _parsed("/c/y", "/c", "5"),  # new child
+    ]
+
+    states = []
+    changed_counts = []
+    for writer in (_apply_sections_delta_orm, _apply_sections_delta_bulk):
+        session = _make_session()
+        doc = Documentation(url="https://example.com")
+        session.add(doc)
+        session.commit()
+
+        assert len(writer(session, doc.id, first_run)) == 3
+        changed_counts.append(len(writer(session, doc.id, second_run)))
+        states.append(_section_state(session, doc.id))
+
+    assert changed_counts == [3, 3]
+    assert states[0] == states[1]
+    assert states[1] == [
+        ("/a", "1", None),
+        ("/a/x", "2-changed", "/a"),
+        ("/c", "4", None),
+        ("/c/y", "5", "/c"),
+    ]
+
+
+def test_bulk_delta_writer_without_prune_keeps_other_pages():
+    from app.services.ingestion import _apply_sections_delta_bulk
+
+    session = _make_session()
+    doc = Documentation(url="https://example.com")
+    session.add(doc)
+    session.commit()
+
+    _apply_sections_delta_bulk(session, doc.id, [_parsed("/a", None, "1")])
+    changed = _apply_sections_delta_bulk(session, doc.id, [_parsed("/b", None, "2")], prune=False)
+
+    assert len(changed) == 1
+    assert [path for path, _, _ in _section_state(session, doc.id)] == ["/a", "/b"]
+
+
+def test_chunking_mode_embeds_overlapping_spans(monkeypatch):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+    job = IngestionJob(documentation_id=doc.id)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+
+    long_content = " ".join(f"word{i}" for i in range(10))
+
+    async def fake_crawl_site(**kwargs):
+        return [CrawledPage(url="https://example.com", markdown="", html=None, depth=0)]
+
+    def fake_parse_sections(pages):
+        return [
+            ParsedSection(
+                path="/long",
+                parent_path=None,
+                title="Long",
+                summary="word0",
+                content=long_content,
+                level=1,
+                url="https://example.com",
+                token_count=10,
+                checksum="long-v1",
+            )
+        ]
+
+    async def fake_embed_sections(texts, **kwargs):
+        return [[float(index), 1.0] for index in range(len(texts))]
+
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.parser.parse_sections", fake_parse_sections)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_cache_enabled", False)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_chunking_enabled", True)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_chunk_tokens", 4)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_chunk_overlap_tokens", 1)
+
+    asyncio.run(run_ingestion_pipeline(session, job.id))
+
+    assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+    section = session.exec(select(DocumentationSection)).one()
+    chunks = session.exec(select(DocumentationSectionChunk).order_by(DocumentationSectionChunk.chunk_index)).all()
+
+    assert [c.chunk_index for c in chunks] == [0, 1, 2]
+    assert all(c.section_id == section.id and c.documentation_id == doc.id for c in chunks)
+    assert [long_content[c.start_offset : c.end_offset].split()[0] for c in chunks] == ["word0", "word3", "word6"]
+    assert chunks[-1].end_offset == len(long_content)
+    assert [c.embedding for c in chunks] == [[0.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    assert section.embedding == chunks[0].embedding
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_chunking_setting_change_re_embeds_every_section(monkeypatch, streaming: bool):
+    session = _make_session()
+    doc = Documentation(url="https://example.com", crawl_depth=2)
+    session.add(doc)
+    session.commit()
+    session.refresh(doc)
+
+    titles = {"a": "Alpha", "b": "Beta"}
+
+    def crawled_pages():
+        return [_markdown_page(f"https://example.com/{name}", title) for name, title in titles.items()]
+
+    async def fake_crawl_site(**kwargs):
+        return crawled_pages()
+
+    async def fake_crawl_site_stream(**kwargs):
+        for page in crawled_pages():
+            yield page
+
+    embedded: list[str] = []
+
+    async def fake_embed_sections(texts, **kwargs):
+        embedded.extend(text.split("\n")[0] for text in texts)
+        return [[0.5, 0.5] for _ in texts]
+
+    monkeypatch.setattr("app.services.ingestion.crawl_site", fake_crawl_site)
+    monkeypatch.setattr("app.services.ingestion.crawl_site_stream", fake_crawl_site_stream)
+    monkeypatch.setattr("app.services.embedding.embed_sections", fake_embed_sections)
+    monkeypatch.setattr("app.services.ingestion.settings.ingestion_streaming", streaming)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_dimension", 2)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_cache_enabled", False)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_chunk_tokens", 4)
+    monkeypatch.setattr("app.services.ingestion.settings.embedding_chunk_overlap_tokens", 1)
+
+    def run(chunking: bool) -> list[str]:
+        monkeypatch.setattr("app.services.ingestion.settings.embedding_chunking_enabled", chunking)
+        embedded.clear()
+        job = IngestionJob(documentation_id=doc.id)
+        session.add(job)
+        session.commit()
+        asyncio.run(run_ingestion_pipeline(session, job.id))
+        assert session.get(IngestionJob, job.id).status == IngestionStatus.COMPLETED
+        return sorted(embedded)
+
+    def chunked_titles() -> set[str]:
+        return {
+            section.title
+            for section in session.exec(
+                select(DocumentationSection).join(
+                    DocumentationSectionChunk, DocumentationSectionChunk.section_id == DocumentationSection.id
+                )
+            ).all()
+        }
+
+    assert run(chunking=False) == ["Alpha", "Beta"]
+    assert chunked_titles() == set()
+
+    # Turning chunking on re-embeds the unchanged page's section too, so search never sees a partial set.
+    titles["b"] = "Beta v2"
+    assert set(run(chunking=True)) == {"Alpha", "Beta v2"}
+    assert chunked_titles() == {"Alpha", "Beta v2"}
+    assert session.get(Documentation, doc.id).embedding_chunking == "4/1"
+
+    # Unchanged settings and pages: nothing is embedded.
+    assert run(chunking=True) == []
+
+    # Turning it off drops every chunk, not only those of changed sections.
+    assert set(run(chunking=False)) == {"Alpha", "Beta v2"}
+    assert chunked_titles() == set()
+    assert session.get(Documentation, doc.id).embedding_chunking == "off"
@@ -9,10 +9,14 @@ Layout for SMALL pages (< MIN_SECTION_TOKENS total):
   • One flat section at root_path (parent_path=None, no children)
 """
 
+import asyncio
+import logging
+
 import pytest
 
+from app.services import parser
 from app.services.crawler import CrawledPage
-from app.services.parser import MIN_SECTION_TOKENS, _SPLIT_LEVELS, parse_sections
+from app.services.parser import MIN_SECTION_TOKENS, _SPLIT_LEVELS, parse_sections, parse_sections_async
 
 
 def _make_page(markdown: str, url: str = "https://docs.example.com/guide") -> CrawledPage:
@@ -173,6 +177,29 @@ def test_large_page_no_headings_becomes_one_child():
     assert any(s.path == "/blog" for s in sections)
 
 
+def test_large_page_line_breaks_do_not_change_sections():
+    """CRLF/CR pages split exactly like their LF equivalent (sections are sliced, not re-joined)."""
+    block = _filler(MIN_SECTION_TOKENS + 10)
+    lf = f"Intro.\n# Title\n## A\n{block}\n#### not a split\n## B\n{block}\n"
+
+    expected = parse_sections([_make_page(lf)])
+    for newline in ("\r\n", "\r"):
+        assert parse_sections([_make_page(lf.replace("\n", newline))]) == expected
+    assert [s.path for s in expected] == ["/guide", "/guide/title", "/guide/b"]
+
+
+def test_token_counts_match_section_content():
+    """Token counts computed once per span equal a fresh count of each emitted section."""
+    block = _filler(MIN_SECTION_TOKENS // 3)
+    md = "\n".join(f"{'#' * (i % 3 + 1)} Part {i}\n{block}\n" for i in range(8))
+    pages = [_make_page(md), _make_page("# Small\none two"), _make_page("  \n")]
+
+    sections = parse_sections(pages)
+    assert len(sections) > 4
+    for section in sections:
+        assert section.token_count == len(section.content.split())
+
+
 # ── Checksum determinism ──────────────────────────────────────────────────────
 
 def test_checksum_is_deterministic():
@@ -190,3 +217,35 @@ def test_permalink_heading_is_cleaned():
     sections = parse_sections([_make_page(md, url="https://fastapi.tiangolo.com/tutorial/dependencies/")])
     assert sections[0].title == "Dependencies"
     assert "httpsfastapi" not in sections[0].path
+
+
+# ── Parallel parsing ──────────────────────────────────────────────────────────
+
+def _site(pages: int) -> list[CrawledPage]:
+    block = _filler(MIN_SECTION_TOKENS)
+    # Same headings on every page: slug counters must restart per page.
+    return [_make_page(f"## Setup\n{block}\n## Setup\n{block}", url=f"https://docs.example.com/p{i}") for i in range(pages)]
+
+
+def test_process_pool_parse_matches_serial_parse():
+    pages = _site(7)
+    parallel = asyncio.run(parse_sections_async(pages, workers=2, chunk_pages=2))
+    assert parallel == parse_sections(pages)
+    assert [s.path for s in parallel[:3]] == ["/p0", "/p0/setup", "/p0/setup-2"]
+
+
+def test_parse_falls_back_to_a_thread_without_process_pools(monkeypatch, caplog):
+    def unavailable(workers):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+    monkeypatch.setattr(parser, "_parse_pool", unavailable)
+    monkeypatch.setattr(parser, "_process_pools_unavailable", False)
+    pages = _site(3)
+
+    with caplog.at_level(logging.WARNING, logger=parser.logger.name):
+        assert asyncio.run(parse_sections_async(pages, workers=4, chunk_pages=1)) == parse_sections(pages)
+        assert asyncio.run(parse_sections_async(pages, workers=4, chunk_pages=1)) == parse_sections(pages)
+    assert parser._process_pools_unavailable is True
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert "--pool=threads" in warnings[0].getMessage()
@@ -0,0 +1,96 @@
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+
+from app.services.query_embedding_cache import QueryEmbeddingCache, get_query_embedding_cache
+
+
+def test_lru_is_bounded_by_entries_and_bytes():
+    cache = QueryEmbeddingCache(max_entries=3, max_bytes=4 * 4 * 2)  # room for two 4-dim float32 vectors
+
+    cache.put("a", [1.0] * 4)
+    cache.put("b", [2.0] * 4)
+    assert cache.get("a") is not None  # "a" is now most recently used
+    cache.put("c", [3.0] * 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a").tolist() == [1.0] * 4
+    assert cache.stats()["bytes"] == 32
+
+    entry_bound = QueryEmbeddingCache(max_entries=2, max_bytes=1 << 20)
+    for key in ("x", "y", "z"):
+        entry_bound.put(key, [0.5])
+    assert entry_bound.stats()["entries"] == 2
+    assert entry_bound.get("x") is None
+
+
+def test_key_normalizes_query_text():
+    assert QueryEmbeddingCache.key("m", "  Route  Handler ") == QueryEmbeddingCache.key("m", "route handler")
+    assert QueryEmbeddingCache.key("m", "route") != QueryEmbeddingCache.key("other-model", "route")
+
+
+def test_redis_tier_serves_compact_float32_vectors(fake_redis):
+    first = QueryEmbeddingCache(max_entries=10, max_bytes=1 << 20, redis=fake_redis)
+    stored = first.put("k", [0.25, 0.5, 0.75])
+    assert stored.dtype == np.float32
+    assert len(next(iter(fake_redis.data.values()))) == 3 * 4
+
+    # A second process: empty in-process tier, shared Redis.
+    second = QueryEmbeddingCache(max_entries=10, max_bytes=1 << 20, redis=fake_redis)
+    vector = second.get("k")
+
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [0.25, 0.5, 0.75]
+    assert second.stats()["redis_hits"] == 1
+    assert second.get("k") is not None  # promoted to the in-process tier
+    assert second.stats()["redis_hits"] == 1
+
+
+@patch("app.services.embedding.settings")
+def test_embed_query_serves_repeats_without_provider_call(mock_settings):
+    import app.services.embedding as mod
+
+    mock_settings.embedding_model = "test-model"
+    mock_settings.embedding_dimension = 2
+    calls = []
+
+    class SlowEmbedder:
+        async def embed_query(self, text):
+            calls.append(text)
+            await asyncio.sleep(0.01)
+
+            class Result:
+                embeddings = [[0.5, -0.5]]
+
+            return Result()
+
+    cache = get_query_embedding_cache()
+    cache.clear()
+    before = cache.stats()
+    mod._embedder = SlowEmbedder()
+    try:
+        first = asyncio.run(mod.embed_query("How do I add a router?"))
+        repeat = asyncio.run(mod.embed_query("how do i add a  router?"))
+    finally:
+        mod._embedder = None
+        cache.clear()
+
+    after = cache.stats()
+    assert first == repeat == [0.5, -0.5]
+    assert calls == ["How do I add a router?"]
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+    assert after["provider_seconds_saved"] > before["provider_seconds_saved"]
+
+
+def test_metrics_endpoint_exposes_cache_stats():
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    response = TestClient(create_app()).get("/metrics")
+
+    assert response.status_code == 200
+    stats = response.json()["query_embedding_cache"]
+    assert {"entries", "bytes", "hits", "misses", "hit_ratio", "provider_seconds_saved"} <= stats.keys()
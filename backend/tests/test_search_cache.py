@@ -0,0 +1,79 @@
+import uuid
+
+from redis import ConnectionError as RedisConnectionError
+
+from app.services import search_cache
+from app.services.search_cache import SearchResultCache, invalidate_search_cache, normalize_query
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise RedisConnectionError("redis is down")
+
+        return fail
+
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert normalize_query("  Route   HANDLER\n") == "route handler"
+
+
+def test_cache_round_trip_and_generation_invalidation(fake_redis, monkeypatch):
+    monkeypatch.setattr(search_cache.settings, "search_cache_ttl_seconds", 120)
+    doc_id = uuid.uuid4()
+    other_doc_id = uuid.uuid4()
+    payload = {"search_mode": "semantic", "items": [], "meta": {"total": 0, "limit": 10, "offset": 0}}
+
+    first = SearchResultCache(doc_id, "auto", "Route handler", 10, 0)
+    assert first.get() is None
+    first.set(payload)
+    assert fake_redis.expiry[first._key] == 120
+
+    assert SearchResultCache(doc_id, "auto", "Route handler", 10, 0).get() == payload
+    assert SearchResultCache(doc_id, "hybrid", "Route handler", 10, 0).get() is None
+    assert SearchResultCache(doc_id, "auto", "Route handler", 10, 10).get() is None
+    assert SearchResultCache(doc_id, "auto", "Route handler", 10, 0, ef_search=200).get() is None
+
+    other = SearchResultCache(other_doc_id, "auto", "route handler", 10, 0)
+    other.get()
+    other.set(payload)
+
+    invalidate_search_cache(doc_id)
+
+    assert SearchResultCache(doc_id, "auto", "Route handler", 10, 0).get() is None
+    assert SearchResultCache(other_doc_id, "auto", "route handler", 10, 0).get() == payload
+
+
+def test_queries_differing_in_case_or_spacing_do_not_share_an_entry(fake_redis):
+    doc_id = uuid.uuid4()
+    payload = {"search_mode": "keyword", "items": [], "meta": {"total": 0, "limit": 10, "offset": 0}}
+
+    cache = SearchResultCache(doc_id, "keyword", "foo  bar", 10, 0)
+    cache.get()
+    cache.set(payload)
+
+    # ILIKE '%foo bar%' and '%foo  bar%' match different sections.
+    assert SearchResultCache(doc_id, "keyword", "foo  bar", 10, 0).get() == payload
+    assert SearchResultCache(doc_id, "keyword", "foo bar", 10, 0).get() is None
+    assert SearchResultCache(doc_id, "auto", "Foo  bar", 10, 0).get() is None
+
+
+def test_result_computed_across_invalidation_is_not_served(fake_redis):
+    doc_id = uuid.uuid4()
+    stale = SearchResultCache(doc_id, "auto", "router", 10, 0)
+    assert stale.get() is None
+
+    invalidate_search_cache(doc_id)  # ingestion commits while the search is running
+    stale.set({"search_mode": "semantic", "items": [], "meta": {"total": 0, "limit": 10, "offset": 0}})
+
+    assert SearchResultCache(doc_id, "auto", "router", 10, 0).get() is None
+
+
+def test_redis_errors_are_treated_as_misses(monkeypatch):
+    monkeypatch.setattr(search_cache, "redis_client", BrokenRedis())
+    monkeypatch.setattr(search_cache.settings, "search_cache_enabled", True)
+
+    cache = SearchResultCache(uuid.uuid4(), "auto", "router", 10, 0)
+    assert cache.get() is None
+    cache.set({"items": []})
+    invalidate_search_cache(uuid.uuid4())
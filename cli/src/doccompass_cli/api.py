@@ -51,12 +51,15 @@ class DocCompassClient:
         # Wait, the backend endpoint is /documentation -> let's map exactly to it.
         return await self._request("GET", "/documentation", params=params)
         
-    async def search_documentation(self, doc_id: str, query: str) -> Dict:
-        params = {"q": query}
+    async def search_documentation(self, doc_id: str, query: str, mode: str = "auto") -> Dict:
+        params = {"q": query, "mode": mode}
         return await self._request("GET", f"/documentation/{doc_id}/search", params=params)
         
-    async def get_documentation_tree(self, doc_id: str) -> Dict:
-        return await self._request("GET", f"/documentation/{doc_id}/tree")
+    async def get_documentation_tree(
+        self, doc_id: str, root_path: Optional[str] = None, depth: Optional[int] = None
+    ) -> Dict:
+        params = {key: value for key, value in {"root_path": root_path, "depth": depth}.items() if value is not None}
+        return await self._request("GET", f"/documentation/{doc_id}/tree", params=params)
         
     async def get_section_content(self, doc_id: str, path: str) -> Dict:
         params = {"path": path}
@@ -43,16 +43,24 @@ def list(
         console.print(f"[red]Failed to list documentations: {e}[/red]")
 
 @app.command()
-def tree(id: str = typer.Argument(..., help="The Documentation ID.")):
+def tree(
+    id: str = typer.Argument(..., help="The Documentation ID."),
+    root_path: Optional[str] = typer.Option(None, "--root-path", help="Show the sections below this path."),
+    depth: Optional[int] = typer.Option(None, "--depth", min=1, help="Levels to expand (default: all)."),
+):
     """View the topic tree of a documentation set."""
     try:
         client = get_client()
-        data = async_run(client.get_documentation_tree(id))
+        data = async_run(client.get_documentation_tree(id, root_path=root_path, depth=depth))
         
         def build_tree(node_data, tree_node):
             for child in node_data.get("children", []):
                 child_node = tree_node.add(f"[blue]{child.get('title', 'Unknown')}[/] ([cyan]{child.get('path', '/')}[/])")
                 build_tree(child, child_node)
+            # Collapsed at the depth limit: only the number of children is known.
+            hidden = node_data.get("child_count", 0) - len(node_data.get("children", []))
+            if hidden > 0:
+                tree_node.add(f"[dim]… {hidden} more[/]")
                 
         root_tree = Tree(f"Documentation {id}")
         roots = data.get("roots", []) if isinstance(data, dict) else (data if isinstance(data, type([])) else [data])
@@ -67,12 +75,13 @@ def tree(id: str = typer.Argument(..., help="The Documentation ID.")):
 @app.command()
 def search(
     id: str = typer.Argument(..., help="The Documentation ID."),
-    query: str = typer.Argument(..., help="The search query.")
+    query: str = typer.Argument(..., help="The search query."),
+    mode: str = typer.Option("auto", "--mode", help="Search mode: auto, semantic, keyword or hybrid.")
 ):
     """Search within a documentation set."""
     try:
         client = get_client()
-        results = async_run(client.search_documentation(id, query))
+        results = async_run(client.search_documentation(id, query, mode))
         items = results.get("items", []) if isinstance(results, dict) else results
         
         if not items:
@@ -70,6 +70,10 @@ def status(id: str = typer.Argument(..., help="The ID of the ingestion job.")):
         console.print(f"[bold magenta]Status:[/] {job.get('status', 'Unknown')}")
         console.print(f"[bold green]Progress:[/] {job.get('progress_percent', 0)}%")
         console.print(f"[bold]Pages Processed:[/] {job.get('pages_processed', 0)}")
+        console.print(
+            f"[bold]Embedding Cache:[/] {job.get('embedding_cache_hits', 0)} hits, "
+            f"{job.get('embedding_cache_misses', 0)} misses"
+        )
         if job.get("error_message"):
             console.print(f"[bold red]Error:[/] {job.get('error_message')}")
     except Exception as e:
@@ -83,6 +83,24 @@ def test_docs_search(mock_get_client, mock_async_run):
     assert "Async Endpoints" in result.stdout
     assert "This is how you do async" in result.stdout
     
+@patch('doccompass_cli.commands.docs.async_run')
+@patch('doccompass_cli.commands.docs.get_client')
+def test_docs_tree_depth(mock_get_client, mock_async_run):
+    mock_client = MagicMock()
+    mock_get_client.return_value = mock_client
+    
+    mock_async_run.return_value = {
+        "roots": [
+            {"title": "Tutorial", "path": "/tutorial", "child_count": 12, "children": []}
+        ]
+    }
+    
+    result = runner.invoke(app, ["docs", "tree", "doc_1", "--root-path", "/", "--depth", "1"])
+    assert result.exit_code == 0
+    mock_client.get_documentation_tree.assert_called_once_with("doc_1", root_path="/", depth=1)
+    assert "Tutorial" in result.stdout
+    assert "12 more" in result.stdout
+    
 @patch('doccompass_cli.main.save_config')
 @patch('doccompass_cli.main.load_config')
 def test_config(mock_load, mock_save):
@@ -9,8 +9,24 @@ export function listDocumentations(limit = 50, offset = 0): Promise<Documentatio
   return apiRequest<DocumentationListResponse>(`/documentation?limit=${limit}&offset=${offset}`);
 }
 
-export function getDocumentationTree(documentationId: string): Promise<DocumentationTreeResponse> {
-  return apiRequest<DocumentationTreeResponse>(`/documentation/${documentationId}/tree`);
+export interface TreeOptions {
+  rootPath?: string;
+  depth?: number;
+}
+
+export function getDocumentationTree(
+  documentationId: string,
+  { rootPath, depth }: TreeOptions = {}
+): Promise<DocumentationTreeResponse> {
+  const params = new URLSearchParams();
+  if (rootPath !== undefined) {
+    params.set("root_path", rootPath);
+  }
+  if (depth !== undefined) {
+    params.set("depth", String(depth));
+  }
+  const query = params.toString();
+  return apiRequest<DocumentationTreeResponse>(`/documentation/${documentationId}/tree${query ? `?${query}` : ""}`);
 }
 
 export function getSectionContent(documentationId: string, sectionPath: string): Promise<SectionContentResponse> {
@@ -9,9 +9,12 @@ export type IngestionStatus =
   | "STOPPED";
 
 export interface PaginationMeta {
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  total_kind: "exact" | "estimate" | "none";
+  has_more: boolean;
+  next_cursor?: string | null;
 }
 
 export interface DocumentationSummary {
@@ -50,6 +53,8 @@ export interface IngestionStatusResponse {
   status: IngestionStatus;
   progress_percent: number;
   pages_processed: number;
+  embedding_cache_hits: number;
+  embedding_cache_misses: number;
   stop_requested: boolean;
   error_message: string | null;
 }
@@ -75,6 +80,7 @@ export interface DocumentationTreeNode {
   parent_id: string | null;
   title: string | null;
   level: number | null;
+  child_count: number;
   children: DocumentationTreeNode[];
 }
 
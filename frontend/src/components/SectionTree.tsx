@@ -1,24 +1,37 @@
 import { useState } from "react";
+import { useQuery } from "@tanstack/react-query";
 
+import { getDocumentationTree } from "../api/documentation";
 import type { DocumentationTreeNode } from "../api/types";
 
 interface SectionTreeProps {
+  documentationId: string;
   roots: DocumentationTreeNode[];
   selectedPath?: string;
   onSelect: (path: string) => void;
 }
 
 interface TreeNodeProps {
+  documentationId: string;
   node: DocumentationTreeNode;
   selectedPath?: string;
   onSelect: (path: string) => void;
   defaultExpanded?: boolean;
 }
 
-function TreeNode({ node, selectedPath, onSelect, defaultExpanded = false }: TreeNodeProps) {
+function TreeNode({ documentationId, node, selectedPath, onSelect, defaultExpanded = false }: TreeNodeProps) {
   const [expanded, setExpanded] = useState(defaultExpanded);
   const isSelected = selectedPath === node.path;
-  const hasChildren = node.children.length > 0;
+  const hasChildren = node.child_count > 0 || node.children.length > 0;
+  // Nodes below the loaded depth arrive collapsed: only their child count is known.
+  const needsChildren = node.children.length < node.child_count;
+
+  const childrenQuery = useQuery({
+    queryKey: ["documentation-tree", documentationId, node.path],
+    queryFn: () => getDocumentationTree(documentationId, { rootPath: node.path, depth: 1 }),
+    enabled: expanded && needsChildren
+  });
+  const children = needsChildren ? childrenQuery.data?.roots ?? [] : node.children;
 
   function handleToggle(event: React.MouseEvent) {
     event.stopPropagation();
@@ -52,9 +65,12 @@ function TreeNode({ node, selectedPath, onSelect, defaultExpanded = false }: Tre
       </div>
       {hasChildren && expanded ? (
         <ul>
-          {node.children.map((child) => (
+          {childrenQuery.isLoading ? <li className="empty-state">Loading...</li> : null}
+          {childrenQuery.isError ? <li className="error">Unable to load sections.</li> : null}
+          {children.map((child) => (
             <TreeNode
               key={child.id}
+              documentationId={documentationId}
               node={child}
               selectedPath={selectedPath}
               onSelect={onSelect}
@@ -66,7 +82,7 @@ function TreeNode({ node, selectedPath, onSelect, defaultExpanded = false }: Tre
   );
 }
 
-export function SectionTree({ roots, selectedPath, onSelect }: SectionTreeProps) {
+export function SectionTree({ documentationId, roots, selectedPath, onSelect }: SectionTreeProps) {
   if (!roots.length) {
     return <p className="empty-state">No sections available.</p>;
   }
@@ -77,6 +93,7 @@ export function SectionTree({ roots, selectedPath, onSelect }: SectionTreeProps)
         {roots.map((root) => (
           <TreeNode
             key={root.id}
+            documentationId={documentationId}
             node={root}
             selectedPath={selectedPath}
             onSelect={onSelect}
@@ -7,6 +7,8 @@ import { DocumentationList } from "../components/DocumentationList";
 import { SectionTree } from "../components/SectionTree";
 import { SectionViewer } from "../components/SectionViewer";
 
+const INITIAL_TREE_DEPTH = 2;
+
 export function ExplorerPage() {
   const { documentationId } = useParams<{ documentationId: string }>();
   const navigate = useNavigate();
@@ -17,9 +19,10 @@ export function ExplorerPage() {
     queryFn: () => listDocumentations()
   });
 
+  // Roots and their children up front; deeper levels are fetched as nodes are expanded.
   const treeQuery = useQuery({
     queryKey: ["documentation-tree", documentationId],
-    queryFn: () => getDocumentationTree(documentationId as string),
+    queryFn: () => getDocumentationTree(documentationId as string, { depth: INITIAL_TREE_DEPTH }),
     enabled: Boolean(documentationId)
   });
 
@@ -62,6 +65,7 @@ export function ExplorerPage() {
           {treeQuery.isError ? <p className="error">Unable to load tree.</p> : null}
           {!treeQuery.isLoading && !treeQuery.isError ? (
             <SectionTree
+              documentationId={documentationId as string}
               roots={treeQuery.data?.roots ?? []}
               selectedPath={selectedSectionPath ?? undefined}
               onSelect={(path) => setSelectedSectionPath(path)}
@@ -18,7 +18,7 @@ export const handlers = [
           last_job_status: "COMPLETED"
         }
       ],
-      meta: { total: 1, limit: 50, offset: 0 }
+      meta: { total: 1, limit: 50, offset: 0, total_kind: "exact", has_more: false }
     });
   }),
   http.post("/api/documentation/ingestion", async ({ request }) => {
@@ -41,6 +41,8 @@ export const handlers = [
       status: "CRAWLING",
       progress_percent: 40,
       pages_processed: 9,
+      embedding_cache_hits: 0,
+      embedding_cache_misses: 0,
       stop_requested: false,
       error_message: null
     });
@@ -56,7 +58,26 @@ export const handlers = [
   http.delete("/api/documentation/:documentationId", () => {
     return new HttpResponse(null, { status: 204 });
   }),
-  http.get("/api/documentation/doc-1/tree", () => {
+  http.get("/api/documentation/doc-1/tree", ({ request }) => {
+    const url = new URL(request.url);
+
+    if (url.searchParams.get("root_path") === "/guide/intro") {
+      return HttpResponse.json({
+        documentation_id: "doc-1",
+        roots: [
+          {
+            id: "section-3",
+            path: "/guide/intro/install",
+            parent_id: "section-2",
+            title: "Install",
+            level: 3,
+            child_count: 0,
+            children: []
+          }
+        ]
+      });
+    }
+
     return HttpResponse.json({
       documentation_id: "doc-1",
       roots: [
@@ -66,6 +87,7 @@ export const handlers = [
           parent_id: null,
           title: "Guide",
           level: 1,
+          child_count: 1,
           children: [
             {
               id: "section-2",
@@ -73,6 +95,7 @@ export const handlers = [
               parent_id: "section-1",
               title: "Intro",
               level: 2,
+              child_count: 1,
               children: []
             }
           ]
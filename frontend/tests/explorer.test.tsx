@@ -21,4 +21,21 @@ describe("Explorer", () => {
       expect(screen.getByText("Introduction content")).toBeInTheDocument();
     });
   });
+
+  it("loads collapsed children when a node is expanded", async () => {
+    const user = userEvent.setup();
+
+    renderWithProviders(<App />, "/explorer/doc-1");
+
+    await waitFor(() => {
+      expect(screen.getByRole("button", { name: "Intro" })).toBeInTheDocument();
+    });
+    expect(screen.queryByRole("button", { name: "Install" })).not.toBeInTheDocument();
+
+    await user.click(screen.getByRole("button", { name: "Intro" }));
+
+    await waitFor(() => {
+      expect(screen.getByRole("button", { name: "Install" })).toBeInTheDocument();
+    });
+  });
 });